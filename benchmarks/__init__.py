@@ -0,0 +1,164 @@
+"""
+Benchmark suite.
+
+Every benchmark measures a matcher against a baseline written in plain Python
+(using ``==``, ``isinstance``, etc.), on workloads of several sizes.
+Run it with ``invoke bench``, or ``python -m benchmarks``.
+"""
+import platform
+import sys
+from timeit import default_timer
+import traceback
+
+
+__all__ = [
+    'SIZES', 'benchmark', 'run',
+]
+
+
+#: Default sizes of the benchmark workloads.
+#: Depending on the benchmark, this is the number of values being matched,
+#: the size of a collection, or the length of a string.
+SIZES = (10, 1000, 100000)
+
+#: Names of the modules with benchmarks, relative to this package.
+MODULES = [
+    'bench_base',
+    'bench_attributes',
+    'bench_collections',
+    'bench_functions',
+    'bench_objects',
+    'bench_operators',
+    'bench_strings',
+    'bench_types',
+]
+
+#: All registered benchmarks, in the order of definition.
+BENCHMARKS = []
+
+
+def benchmark(func):
+    """Decorator for registering a benchmark.
+
+    The decorated function takes the size of the workload
+    and returns a pair of functions taking no arguments:
+    one that uses matchers, and a baseline that does the same work
+    in plain Python.
+
+    Example::
+
+        @benchmark
+        def instance_of(size):
+            values = list(range(size))
+            matcher = InstanceOf(int)
+            return (lambda: [matcher == v for v in values],
+                    lambda: [isinstance(v, int) for v in values])
+    """
+    module = func.__module__.rsplit('.', 1)[-1]
+    if module.startswith('bench_'):
+        module = module[len('bench_'):]
+    func.name = '%s.%s' % (module, func.__name__)
+    BENCHMARKS.append(func)
+    return func
+
+
+def load():
+    """Import all the benchmark modules.
+    :return: List of registered benchmarks
+    """
+    for name in MODULES:
+        __import__('%s.%s' % (__name__, name))
+    return BENCHMARKS
+
+
+def run(names=None, sizes=SIZES, repeat=5, min_time=0.2, log=None):
+    """Run the benchmarks.
+
+    :param names: Optional list of substrings to select the benchmarks by.
+                  By default, all benchmarks are run.
+    :param sizes: Sizes of the workloads
+    :param repeat: How many times to repeat every measurement.
+                   Only the best of them is reported.
+    :param min_time: Minimum time (in seconds) of a single measurement
+    :param log: Optional file object to report the progress to
+
+    :return: Dictionary with the results, suitable for serializing to JSON
+    """
+    results = []
+    for bench in load():
+        if names and not any(name in bench.name for name in names):
+            continue
+        for size in sizes:
+            result = measure(bench, size, repeat, min_time)
+            results.append(result)
+            if log is not None:
+                log.write(format_result(result) + "\n")
+                log.flush()
+
+    import callee
+    return {
+        'callee': callee.__version__,
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'results': results,
+    }
+
+
+def measure(bench, size, repeat, min_time):
+    """Measure a single benchmark on a workload of given size.
+    :return: Dictionary with the result
+    """
+    result = {'name': bench.name, 'size': size}
+    try:
+        subject, baseline = bench(size)
+        result['time'] = best_time(subject, repeat, min_time)
+        result['baseline'] = best_time(baseline, repeat, min_time)
+    except Exception:
+        # report the failure but carry on, so that a single broken matcher
+        # doesn't prevent the comparison of the others
+        result['error'] = traceback.format_exception_only(
+            *sys.exc_info()[:2])[-1].strip()
+        return result
+
+    result['ratio'] = (result['time'] / result['baseline']
+                       if result['baseline'] else None)
+    return result
+
+
+def best_time(func, repeat, min_time):
+    """Return the best time of a single call to given function (in seconds).
+
+    The function is called in a loop, as many times as necessary
+    to take at least ``min_time``; this is repeated ``repeat`` times.
+    """
+    number = 1
+    while True:
+        elapsed = time_loop(func, number)
+        if elapsed >= min_time:
+            break
+        number *= 2 if elapsed <= 0 else min(10, 1.2 * min_time / elapsed)
+        number = int(number) + 1
+
+    timings = [elapsed] + [time_loop(func, number)
+                           for _ in range(repeat - 1)]
+    return min(timings) / number
+
+
+def time_loop(func, number):
+    """Return the time it takes to call given function ``number`` times."""
+    start = default_timer()
+    for _ in range(number):
+        func()
+    return default_timer() - start
+
+
+def format_result(result):
+    """Format the result of a benchmark as a line of text."""
+    prefix = "%-40s %8s" % (result['name'], result['size'])
+    if 'error' in result:
+        return "%s  ERROR: %s" % (prefix, result['error'])
+    ratio = result['ratio']
+    return "%s  %12.3f us  %12.3f us  %s" % (
+        prefix, result['time'] * 1e6, result['baseline'] * 1e6,
+        "x%.2f" % ratio if ratio is not None else "-")
@@ -0,0 +1,47 @@
+"""
+Command line interface of the benchmark suite.
+
+Usage::
+
+    python -m benchmarks [--output FILE] [--sizes 10,1000] [--quick] [NAME...]
+"""
+from argparse import ArgumentParser
+import json
+import sys
+
+import benchmarks
+
+
+def main(argv=None):
+    parser = ArgumentParser(prog='python -m benchmarks',
+                            description="Run the benchmarks of callee.")
+    parser.add_argument('names', nargs='*', metavar='NAME',
+                        help="only run the benchmarks whose names "
+                             "contain one of these strings")
+    parser.add_argument('-o', '--output', metavar='FILE',
+                        help="write the results as JSON to this file")
+    parser.add_argument('-s', '--sizes', metavar='SIZES',
+                        default=','.join(map(str, benchmarks.SIZES)),
+                        help="comma-separated sizes of the workloads "
+                             "(default: %(default)s)")
+    parser.add_argument('-q', '--quick', action='store_true',
+                        help="measure only once, and briefly")
+    parser.add_argument('-l', '--label',
+                        help="label to include in the results, "
+                             "e.g. a commit hash")
+    args = parser.parse_args(argv)
+
+    sizes = [int(size) for size in args.sizes.split(',') if size]
+    options = dict(repeat=1, min_time=0.02) if args.quick else {}
+    results = benchmarks.run(args.names, sizes, log=sys.stderr, **options)
+    if args.label:
+        results['label'] = args.label
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,31 @@
+"""
+Benchmarks for attribute matchers.
+"""
+from callee.attributes import Attrs, HasAttrs
+from callee.numbers import Integer
+
+from benchmarks import benchmark
+
+
+class Object(object):
+    def __init__(self, i):
+        self.foo = i
+        self.bar = str(i)
+
+
+@benchmark
+def attrs(size):
+    objects = [Object(i) for i in range(size)]
+    matcher = Attrs(foo=Integer(), bar='1')
+    return (lambda: [matcher == o for o in objects],
+            lambda: [isinstance(o.foo, int) and o.bar == '1'
+                     for o in objects])
+
+
+@benchmark
+def has_attrs(size):
+    objects = [Object(i) for i in range(size)] + [object()] * size
+    matcher = HasAttrs('foo', 'bar')
+    return (lambda: [matcher == o for o in objects],
+            lambda: [hasattr(o, 'foo') and hasattr(o, 'bar')
+                     for o in objects])
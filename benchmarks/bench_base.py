@@ -0,0 +1,71 @@
+"""
+Benchmarks for matcher base classes.
+"""
+from callee.base import Eq, Matcher
+from callee.general import Any
+from callee.numbers import Integer
+from callee.operators import Greater
+
+from benchmarks import benchmark
+
+
+@benchmark
+def eq(size):
+    """Equality comparison through :class:`Eq`, i.e. ``BaseMatcher.__eq__``.
+    """
+    values = list(range(size))
+    matcher = Eq(size // 2)
+    ref = size // 2
+    return (lambda: [matcher == v for v in values],
+            lambda: [ref == v for v in values])
+
+
+@benchmark
+def and_(size):
+    values = list(range(-size // 2, size // 2))
+    matcher = Integer() & Greater(0)
+    return (lambda: [matcher == v for v in values],
+            lambda: [isinstance(v, int) and v > 0 for v in values])
+
+
+@benchmark
+def or_(size):
+    values = list(range(size))
+    matcher = Eq(-1) | Eq(-2) | Any()
+    return (lambda: [matcher == v for v in values],
+            lambda: [v == -1 or v == -2 or True for v in values])
+
+
+@benchmark
+def not_(size):
+    values = list(range(size))
+    matcher = ~Eq(0)
+    return (lambda: [matcher == v for v in values],
+            lambda: [not (v == 0) for v in values])
+
+
+class Point(Matcher):
+    def __init__(self, x, y):
+        self.x = x
+        self.y = y
+
+    def match(self, value):
+        return value == (self.x, self.y)
+
+
+class PlainPoint(object):
+    def __init__(self, x, y):
+        self.x = x
+        self.y = y
+
+    def __repr__(self):
+        return "<PlainPoint(x=%r, y=%r)>" % (self.x, self.y)
+
+
+@benchmark
+def matcher_repr(size):
+    """Default representation of custom matchers, ``Matcher.__repr__``."""
+    matchers = [Point(i, -i) for i in range(size)]
+    objects = [PlainPoint(i, -i) for i in range(size)]
+    return (lambda: [repr(m) for m in matchers],
+            lambda: [repr(o) for o in objects])
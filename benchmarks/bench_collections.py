@@ -0,0 +1,122 @@
+"""
+Benchmarks for collection matchers.
+"""
+from callee.collections import (
+    ContainsSequence, Dict, Iterable, List, Mapping, Set, Shape, Tuple,
+    Unordered)
+from callee.numbers import Integer
+from callee.operators import Longer
+from callee.strings import String
+
+from benchmarks import benchmark
+
+
+@benchmark
+def iterable(size):
+    values = [list(range(10)), 'foo', 42] * size
+    matcher = Iterable()
+    return (lambda: [matcher == v for v in values],
+            lambda: [hasattr(v, '__iter__') for v in values])
+
+
+@benchmark
+def list_of(size):
+    value = list(range(size))
+    matcher = List(of=Integer())
+    return (lambda: matcher == value,
+            lambda: isinstance(value, list) and
+            all(isinstance(v, int) for v in value))
+
+
+@benchmark
+def set_of(size):
+    value = set(range(size))
+    matcher = Set(Integer())
+    return (lambda: matcher == value,
+            lambda: isinstance(value, set) and
+            all(isinstance(v, int) for v in value))
+
+
+@benchmark
+def set_contains_all(size):
+    value = set(range(size))
+    expected = list(range(0, size, 10))
+    matcher = Set(contains_all=expected)
+    return (lambda: matcher == value,
+            lambda: isinstance(value, set) and
+            all(v in value for v in expected))
+
+
+@benchmark
+def tuple_of(size):
+    value = tuple(range(size))
+    matcher = Tuple(of=int)
+    return (lambda: matcher == value,
+            lambda: isinstance(value, tuple) and
+            all(isinstance(v, int) for v in value))
+
+
+@benchmark
+def unordered(size):
+    value = list(range(size))
+    expected = list(reversed(value))
+    matcher = Unordered(expected)
+    return (lambda: matcher == value,
+            lambda: sorted(value) == sorted(expected))
+
+
+@benchmark
+def contains_sequence(size):
+    value = [0, 1] * size + [0, 1, 2]
+    pattern = [0, 1, 0, 1, 2]
+    matcher = ContainsSequence(pattern)
+    return (lambda: matcher == value,
+            lambda: any(value[i:i + len(pattern)] == pattern
+                        for i in range(len(value) - len(pattern) + 1)))
+
+
+@benchmark
+def dict_keys_values(size):
+    """Matching of mappings, i.e. ``MappingMatcher.match``."""
+    value = dict((str(i), i) for i in range(size))
+    matcher = Dict(String(), Integer())
+    return (lambda: matcher == value,
+            lambda: isinstance(value, dict) and
+            all(isinstance(k, str) and isinstance(v, int)
+                for k, v in value.items()))
+
+
+@benchmark
+def mapping_of_items(size):
+    value = dict((i, i) for i in range(size))
+    matcher = Mapping(of=Longer(1))
+    return (lambda: matcher == value,
+            lambda: all(len(item) > 1 for item in value.items()))
+
+
+@benchmark
+def dict_required(size):
+    value = dict((str(i), i) for i in range(size))
+    value.update(id=1, name='foo')
+    matcher = Dict(required={'id': Integer(), 'name': String()},
+                   extra=Integer())
+    return (lambda: matcher == value,
+            lambda: isinstance(value, dict) and
+            isinstance(value.get('id'), int) and
+            isinstance(value.get('name'), str) and
+            all(isinstance(v, int) for k, v in value.items()
+                if k not in ('id', 'name')))
+
+
+@benchmark
+def shape(size):
+    """Matching of nested structures, i.e. ``Shape.match``."""
+    value = {'users': [{'id': i, 'tags': ['foo', 'bar']}
+                       for i in range(size)]}
+    matcher = Shape({'users': [{'id': Integer(), 'tags': [String()]}]})
+    return (lambda: matcher == value,
+            lambda: isinstance(value, dict) and list(value) == ['users'] and
+            all(isinstance(user, dict) and len(user) == 2 and
+                isinstance(user['id'], int) and
+                all(isinstance(tag, str) for tag in user['tags'])
+                for user in value['users']))
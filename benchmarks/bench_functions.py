@@ -0,0 +1,43 @@
+"""
+Benchmarks for function matchers.
+"""
+import inspect
+
+from callee.functions import Callable, Function, GeneratorFunction
+
+from benchmarks import benchmark
+
+
+def function():
+    pass
+
+
+def generator_function():
+    yield
+
+
+VALUES = [function, generator_function, len, object(), 42, str]
+
+
+@benchmark
+def callable_(size):
+    values = VALUES * size
+    matcher = Callable()
+    return (lambda: [matcher == v for v in values],
+            lambda: [callable(v) for v in values])
+
+
+@benchmark
+def function_(size):
+    values = VALUES * size
+    matcher = Function()
+    return (lambda: [matcher == v for v in values],
+            lambda: [inspect.isfunction(v) for v in values])
+
+
+@benchmark
+def generator_function_(size):
+    values = VALUES * size
+    matcher = GeneratorFunction()
+    return (lambda: [matcher == v for v in values],
+            lambda: [inspect.isgeneratorfunction(v) for v in values])
@@ -0,0 +1,42 @@
+"""
+Benchmarks for object matchers.
+"""
+import io
+import tempfile
+
+from callee.objects import Bytes, FileContent, FileLike
+from callee.strings import StartsWith
+
+from benchmarks import benchmark
+
+
+@benchmark
+def bytes_(size):
+    values = [b'foo', u'foo', 42] * size
+    matcher = Bytes()
+    return (lambda: [matcher == v for v in values],
+            lambda: [isinstance(v, bytes) for v in values])
+
+
+@benchmark
+def file_like(size):
+    values = [io.BytesIO(), io.StringIO(), 42] * size
+    matcher = FileLike()
+    return (lambda: [matcher == v for v in values],
+            lambda: [hasattr(v, 'read') and hasattr(v, 'write')
+                     for v in values])
+
+
+@benchmark
+def file_content(size):
+    tmp = tempfile.NamedTemporaryFile(suffix='.pdf')
+    tmp.write(b'%PDF-1.4\n' + b'x' * (size * 1000))
+    tmp.flush()
+
+    def read_header():
+        with open(tmp.name, 'rb') as f:
+            return f.read().startswith(b'%PDF-')
+
+    # a new matcher every time, so that the result isn't cached
+    return (lambda: FileContent(StartsWith(b'%PDF-')) == tmp.name,
+            read_header)
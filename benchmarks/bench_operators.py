@@ -0,0 +1,49 @@
+"""
+Benchmarks for operator matchers.
+"""
+from callee.operators import Contains, Greater, In, Longer
+
+from benchmarks import benchmark
+
+
+@benchmark
+def greater(size):
+    values = list(range(size))
+    matcher = Greater(size // 2)
+    ref = size // 2
+    return (lambda: [matcher == v for v in values],
+            lambda: [v > ref for v in values])
+
+
+@benchmark
+def longer(size):
+    values = [[0] * (i % 10) for i in range(size)]
+    matcher = Longer(5)
+    return (lambda: [matcher == v for v in values],
+            lambda: [len(v) > 5 for v in values])
+
+
+@benchmark
+def in_set(size):
+    values = list(range(size))
+    ref = set(range(0, size, 2))
+    matcher = In(ref)
+    return (lambda: [matcher == v for v in values],
+            lambda: [v in ref for v in values])
+
+
+@benchmark
+def contains(size):
+    value = list(range(size))
+    matcher = Contains(size - 1)
+    return (lambda: matcher == value,
+            lambda: size - 1 in value)
+
+
+@benchmark
+def match_many(size):
+    values = list(range(size))
+    matcher = Greater(size // 2)
+    ref = size // 2
+    return (lambda: matcher.match_many(values),
+            lambda: [v > ref for v in values])
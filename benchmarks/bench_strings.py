@@ -0,0 +1,89 @@
+"""
+Benchmarks for string matchers.
+"""
+import fnmatch
+import re
+
+from callee.strings import AnyOf, EndsWith, Glob, Regex, StartsWith, String
+
+from benchmarks import benchmark
+
+
+@benchmark
+def string(size):
+    values = ['foo', b'foo', 42] * size
+    matcher = String()
+    return (lambda: [matcher == v for v in values],
+            lambda: [isinstance(v, str) for v in values])
+
+
+@benchmark
+def starts_with(size):
+    value = 'x' * size
+    prefix = 'x' * (size // 2)
+    matcher = StartsWith(prefix)
+    return (lambda: matcher == value,
+            lambda: value.startswith(prefix))
+
+
+@benchmark
+def ends_with(size):
+    value = 'x' * size
+    suffix = 'x' * (size // 2)
+    matcher = EndsWith(suffix)
+    return (lambda: matcher == value,
+            lambda: value.endswith(suffix))
+
+
+@benchmark
+def starts_with_buffer(size):
+    value = memoryview(b'x' * size * 1000)
+    prefix = b'x' * 16
+    matcher = StartsWith(prefix)
+    return (lambda: matcher == value,
+            lambda: bytes(value).startswith(prefix))
+
+
+@benchmark
+def regex(size):
+    value = 'foo' * size + 'bar'
+    pattern = r'(foo)+bar$'
+    matcher = Regex(pattern)
+    regex = re.compile(pattern)
+    return (lambda: matcher == value,
+            lambda: bool(regex.match(value)))
+
+
+@benchmark
+def regex_search(size):
+    values = ['x' * i + 'needle' for i in range(size)]
+    patterns = [r'needle\d*$', r'(?:hay|needle)+$', r'n[aeiou]+dle$']
+    return (lambda: [Regex(p, mode='search') == v
+                     for p in patterns for v in values],
+            lambda: [bool(re.compile(p).search(v))
+                     for p in patterns for v in values])
+
+
+@benchmark
+def glob(size):
+    values = ['file%d.txt' % i for i in range(size)]
+    matcher = Glob('file*1.txt')
+    return (lambda: [matcher == v for v in values],
+            lambda: [fnmatch.fnmatch(v, 'file*1.txt') for v in values])
+
+
+@benchmark
+def any_of(size):
+    routes = ['/api/v%d/' % i for i in range(100)]
+    patterns = [r'/user/%d/\d+$' % i for i in range(20)]
+    matcher = AnyOf(*([StartsWith(route) for route in routes] +
+                      [Regex(pattern) for pattern in patterns] +
+                      [Glob('/static/*.js')]))
+    values = ['/user/19/%d' % i for i in range(size)]
+
+    prefixes = tuple(routes)
+    regexes = [re.compile(pattern) for pattern in patterns]
+    return (lambda: [matcher == v for v in values],
+            lambda: [v.startswith(prefixes) or
+                     any(r.match(v) for r in regexes) or
+                     fnmatch.fnmatch(v, '/static/*.js') for v in values])
@@ -0,0 +1,41 @@
+"""
+Benchmarks for type matchers.
+"""
+from callee.types import InstanceOf, SubclassOf, Type
+
+from benchmarks import benchmark
+
+
+VALUES = [42, 'foo', 3.14, None, [], int, str]
+
+
+@benchmark
+def instance_of(size):
+    values = VALUES * size
+    matcher = InstanceOf(int)
+    return (lambda: [matcher == v for v in values],
+            lambda: [isinstance(v, int) for v in values])
+
+
+@benchmark
+def instance_of__exact(size):
+    values = VALUES * size
+    matcher = InstanceOf(int, exact=True)
+    return (lambda: [matcher == v for v in values],
+            lambda: [type(v) is int for v in values])
+
+
+@benchmark
+def subclass_of(size):
+    values = [int, bool, str, object] * size
+    matcher = SubclassOf(int)
+    return (lambda: [matcher == v for v in values],
+            lambda: [issubclass(v, int) for v in values])
+
+
+@benchmark
+def type_(size):
+    values = VALUES * size
+    matcher = Type()
+    return (lambda: [matcher == v for v in values],
+            lambda: [isinstance(v, type) for v in values])
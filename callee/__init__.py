@@ -10,14 +10,16 @@ __license__ = "BSD"
 from callee.attributes import Attrs, Attr, HasAttrs, HasAttr
 from callee.base import \
     And, Either, Eq, Is, IsNot, OneOf, Or, Matcher, Not, Xor
-from callee.collections import \
-    Dict, Generator, Iterable, List, Mapping, OrderedDict, Sequence, Set
-from callee.general import Any, ArgThat, Captor, Matching
+from callee.collections import (
+    ContainsSequence, ContainsSubsequence, Dict, FrozenSet, Generator,
+    Iterable, List, Mapping, OrderedDict, Sequence, Set, Shape, Tuple,
+    Unordered)
+from callee.general import Any, ArgThat, Cached, Captor, Matching
 from callee.functions import \
     Callable, CoroutineFunction, Function, GeneratorFunction
 from callee.numbers import (Complex, Float, Fraction, Int, Integer, Integral,
                             Long, Number, Rational, Real)
-from callee.objects import Bytes, Coroutine, FileLike
+from callee.objects import Bytes, Coroutine, FileContent, FileLike
 from callee.operators import (
     Contains,
     Ge, Greater, GreaterOrEqual, GreaterOrEqualTo, GreaterThan, Gt,
@@ -25,8 +27,10 @@ from callee.operators import (
     Le, Less, LessOrEqual, LessOrEqualTo, LessThan,
     Longer, LongerOrEqual, LongerOrEqualTo, LongerThan, Lt,
     Shorter, ShorterOrEqual, ShorterOrEqualTo, ShorterThan)
+from callee.profiling import instrument
+from callee.recorders import CallRecorder
 from callee.strings import \
-    EndsWith, Glob, Regex, StartsWith, String, Unicode
+    AnyOf, EndsWith, Glob, Regex, StartsWith, String, Unicode
 from callee.types import InstanceOf, IsA, SubclassOf, Inherits, Type, Class
 
 
@@ -38,10 +42,12 @@ __all__ = [
     'Attrs', 'Attr', 'HasAttrs', 'HasAttr',
 
     'Iterable', 'Generator',
-    'Sequence', 'List', 'Set',
+    'Sequence', 'List', 'Set', 'FrozenSet', 'Tuple', 'Unordered',
+    'ContainsSequence', 'ContainsSubsequence',
     'Mapping', 'Dict', 'OrderedDict',
+    'Shape',
 
-    'Any', 'Matching', 'ArgThat', 'Captor',
+    'Any', 'Matching', 'ArgThat', 'Captor', 'Cached',
 
     'Callable', 'Function', 'GeneratorFunction',
     'CoroutineFunction',
@@ -52,7 +58,7 @@ __all__ = [
 
     'Bytes',
     'Coroutine',
-    'FileLike',
+    'FileLike', 'FileContent',
 
     'Less', 'LessThan', 'Lt',
     'LessOrEqual', 'LessOrEqualTo', 'Le',
@@ -62,8 +68,12 @@ __all__ = [
     'Longer', 'LongerThan', 'LongerOrEqual', 'LongerOrEqualTo',
     'Contains', 'In',
 
+    'CallRecorder',
+
+    'instrument',
+
     'String', 'Unicode',
-    'StartsWith', 'EndsWith', 'Glob', 'Regex',
+    'StartsWith', 'EndsWith', 'Glob', 'Regex', 'AnyOf',
 
     'InstanceOf', 'IsA', 'SubclassOf', 'Inherits', 'Type', 'Class',
 ]
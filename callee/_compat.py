@@ -7,6 +7,10 @@ try:
     import asyncio
 except ImportError:
     asyncio = None
+try:
+    from concurrent import futures  # Python 3.2+, or the futures backport
+except ImportError:
+    futures = None
 try:
     from collections import OrderedDict  # Python 2.7+
 except ImportError:
@@ -15,16 +19,23 @@ except ImportError:
     except ImportError:
         OrderedDict = None
 import inspect
+try:
+    import reprlib
+except ImportError:
+    import repr as reprlib  # Python 2
 import sys
 
 
 __all__ = [
     'asyncio',
+    'futures',
     'OrderedDict',
+    'reprlib',
     'IS_PY3',
     'STRING_TYPES', 'casefold',
     'metaclass',
     'getargspec',
+    'numpy_for',
 ]
 
 
@@ -98,7 +109,7 @@ def getargspec(obj):
     argnames = []
     varargname, kwargname = None, None
     defaults = []
-    for name, param in inspect.signature(obj):
+    for name, param in inspect.signature(obj).parameters.items():
         if param.kind == inspect.Parameter.VAR_POSITIONAL:
             varargname = name
         elif param.kind == inspect.Parameter.VAR_KEYWORD:
@@ -110,3 +121,17 @@ def getargspec(obj):
     defaults = defaults or None
 
     return argnames, varargname, kwargname, defaults
+
+
+def numpy_for(obj):
+    """Return the NumPy module if given object is a NumPy array.
+
+    NumPy is an optional dependency, so it is never imported here.
+    If it hasn't been imported already, the object can't be an array anyway.
+
+    :return: :mod:`numpy` module, or ``None`` if ``obj`` isn't an array
+    """
+    numpy = sys.modules.get('numpy')
+    if numpy is not None and isinstance(obj, numpy.ndarray):
+        return numpy
+    return None
@@ -62,6 +62,37 @@ class Attrs(BaseMatcher):
 
         return True
 
+    def _describe_mismatch(self, value):
+        missing = object()
+        for name in self.attr_names:
+            if getattr(value, name, missing) is missing:
+                return "missing attribute %r" % (name,)
+        for name, matcher in self.attr_dict.items():
+            attrvalue = getattr(value, name, missing)
+            if attrvalue is missing:
+                return "missing attribute %r" % (name,)
+            if not matcher.match(attrvalue):
+                return "attribute %r: %s" % (
+                    name, matcher._describe_mismatch(attrvalue))
+        return super(Attrs, self)._describe_mismatch(value)
+
+    def _match_many(self, values):
+        names = self.attr_names
+        matchers = list(self.attr_dict.items())
+        missing = object()
+
+        def match(value):
+            for name in names:
+                if getattr(value, name, missing) is missing:
+                    return False
+            for name, matcher in matchers:
+                attrvalue = getattr(value, name, missing)
+                if attrvalue is missing or not matcher.match(attrvalue):
+                    return False
+            return True
+
+        return [match(value) for value in values]
+
     def __repr__(self):
         """Return a representation of the matcher."""
         # get both the names-only and valued attributes and sort them by name
@@ -1,10 +1,20 @@
 """
 Base classes for argument matchers.
 """
+from __future__ import absolute_import
+
+from collections import namedtuple
+import functools
 import inspect
+from itertools import count
 from operator import itemgetter
+import re
+from timeit import default_timer
+from types import BuiltinFunctionType, FunctionType
+from weakref import WeakValueDictionary
 
-from callee._compat import IS_PY3, metaclass
+from callee._compat import \
+    IS_PY3, OrderedDict, getargspec, metaclass, numpy_for, reprlib
 
 
 __all__ = [
@@ -14,6 +24,33 @@ __all__ = [
 ]
 
 
+def cache_repr(func):
+    """Wrap the ``__repr__`` method of a matcher class,
+    so that its result is remembered by every matcher object.
+
+    The result is stored in the object's ``__dict__``, so matchers
+    without one (like those which only use ``__slots__``) aren't affected.
+    Neither are matchers that refer to mutable objects (like lists),
+    whose representation may change along with them.
+    """
+    @functools.wraps(func)
+    def __repr__(self):
+        # only the representation of the object's own class is cached,
+        # not the partial ones computed by overridden superclass methods
+        method = type(self).__repr__
+        cacheable = getattr(method, '__func__', method) is __repr__ and \
+            self._is_immutable()
+        attrs = getattr(self, '__dict__', None)
+        if cacheable and attrs is not None:
+            result = attrs.get('_repr')
+            if result is None:
+                result = attrs['_repr'] = func(self)
+            return result
+        return func(self)
+
+    return __repr__
+
+
 class BaseMatcherMetaclass(type):
     """Metaclass for :class:`BaseMatcher`."""
 
@@ -31,6 +68,8 @@ class BaseMatcherMetaclass(type):
     def __new__(meta, classname, bases, dict_):
         """Create a new matcher class."""
         meta._validate_class_definition(classname, bases, dict_)
+        if inspect.isfunction(dict_.get('__repr__')):
+            dict_['__repr__'] = cache_repr(dict_['__repr__'])
         return super(BaseMatcherMetaclass, meta) \
             .__new__(meta, classname, bases, dict_)
 
@@ -106,12 +145,230 @@ class BaseMatcher(object):
     """
     __slots__ = ()
 
+    #: Rough estimate of how expensive a :meth:`match` call is.
+    #:
+    #: When matchers are combined using :class:`And` or :class:`Or`,
+    #: the cheaper ones are checked first. Matchers with equal cost
+    #: retain the order in which they were given.
+    #:
+    #: Built-in matchers use the following values:
+    #:
+    #:     * 0 for trivial checks that cannot fail, like :class:`Is`
+    #:     * 1 for checks of the value's type, like ``InstanceOf``
+    #:     * 10 for everything else (the default)
+    #:
+    #: Lowering the cost of a matcher is only safe if its :meth:`match`
+    #: doesn't raise exceptions for values of unexpected types.
+    COST = 10
+
+    #: Whether the result of :meth:`__repr__` can be remembered
+    #: by the matcher object (if it has a ``__dict__``
+    #: and its state is immutable, see :meth:`_is_immutable`).
+    #:
+    #: Matchers that change their representation after being created
+    #: should either set this to ``False``, or call :meth:`_forget_repr`
+    #: whenever that happens.
+    CACHE_REPR = True
+
+    #: Names of attributes where matchers remember computed values,
+    #: which aren't part of their state
+    CACHED_ATTRS = ('_repr', '_fingerprint', '_immutable')
+
     def match(self, value):
         raise NotImplementedError("matching not implemented")
 
+    def describe_mismatch(self, value):
+        """Explain why given value doesn't match.
+
+        This is meant for diagnosing failed assertions:
+        the explanation is only computed when it's asked for,
+        and can be more precise than the matcher's ``repr()``.
+        For example, a collection matcher describes which of the elements
+        didn't match, and why::
+
+            >>> List(of=Integer()).describe_mismatch([1, 2, 'foo'])
+            "element [2]: expected <Integer>, got 'foo'"
+
+        :return: Description of the mismatch,
+                 or ``None`` if the value actually matches
+        """
+        if self.match(value):
+            return None
+        return self._describe_mismatch(value)
+
+    def _describe_mismatch(self, value):
+        """Explain why given value doesn't match,
+        assuming that it's already known not to.
+
+        Subclasses may override this to provide a more detailed explanation,
+        typically using the :meth:`_describe_mismatch` of nested matchers.
+        """
+        return "expected %r, got %s" % (self, describe_value(value))
+
+    def match_many(self, values):
+        """Match multiple values at once.
+
+        This is equivalent to calling :meth:`match` for every value,
+        but built-in matchers implement it more efficiently.
+
+        :param values: Iterable of values to match, or a NumPy array
+        :return: List of booleans with the results for each value.
+                 If ``values`` is a NumPy array, the result is
+                 a boolean array of the same shape.
+        """
+        numpy = numpy_for(values)
+        if numpy is not None:
+            return self._match_array(values, numpy)
+        return self._match_many(values)
+
+    def _match_many(self, values):
+        """Match an iterable of values.
+        :return: List of booleans
+        """
+        match = self.match
+        return [bool(match(value)) for value in values]
+
+    def _match_array(self, array, numpy):
+        """Match every element of a NumPy array.
+
+        Subclasses may override this to provide a vectorized implementation.
+
+        :param numpy: The :mod:`numpy` module
+        :return: Boolean array of the same shape as ``array``
+        """
+        match = self.match
+        result = numpy.fromiter((bool(match(value)) for value in array.flat),
+                                dtype=bool, count=array.size)
+        return result.reshape(array.shape)
+
+    def compile(self):
+        """Compile the matcher into a plain Python predicate function.
+
+        The whole tree of matchers (including any logical combinators
+        like :class:`And` or :class:`Or`) is turned into a single function
+        where checks are inlined as Python expressions, rather than dispatched
+        through nested :meth:`match` calls.
+
+        Matchers that don't know how to compile themselves are still supported;
+        the resulting function simply calls their :meth:`match` method.
+
+        :return: Function taking a single argument and returning a boolean,
+                 equivalent to calling :meth:`match`
+        """
+        return Compiler().build(self)
+
+    def _compile(self, compiler, arg):
+        """Return a Python expression equivalent to ``self.match(arg)``.
+
+        Subclasses may override this to provide an inlined version
+        of their matching logic.
+
+        :param compiler: :class:`Compiler` to bind any necessary objects with
+        :param arg: Name of the variable holding the value to match
+        """
+        return "%s(%s)" % (compiler.bind(self.match), arg)
+
+    def fingerprint(self):
+        """Return a hashable value identifying the matcher by its structure.
+
+        Two matchers have equal fingerprints if they are of the same class
+        and their state is equivalent, even if they are separate objects.
+        For example, every ``InstanceOf(int) & Greater(0)`` has
+        the same fingerprint.
+
+        Unlike the matchers themselves, fingerprints can be compared
+        and used as dictionary keys, e.g. to cache the results of matching.
+
+        :return: Hashable fingerprint
+        """
+        # fingerprints of matchers that cannot change are remembered,
+        # since computing them can take a while for large collections
+        if not self._is_immutable():
+            return (self.__class__, self._fingerprint_state())
+        attrs = getattr(self, '__dict__', None)
+        result = None if attrs is None else attrs.get('_fingerprint')
+        if result is None:
+            result = (self.__class__, self._fingerprint_state())
+            if attrs is not None:
+                attrs['_fingerprint'] = result
+        return result
+
+    def _fingerprint_state(self):
+        """Return the part of the fingerprint that describes matcher's state.
+
+        By default, this is made of all the matcher's attributes.
+        Subclasses whose state changes as they are matching values
+        (like :class:`~callee.general.Captor`) should override this
+        to return something unique to the instance, like its ``id()``.
+        """
+        state = self._state()
+        return tuple((name, fingerprint_of(state[name]))
+                     for name in sorted(state))
+
+    def _is_immutable(self):
+        """Check whether the matcher's state can never change.
+
+        This is the case if all the matcher's attributes are immutable
+        (see :func:`is_immutable`). Only then can its fingerprint
+        and ``repr()`` be remembered, or the matcher be treated as
+        equivalent to others with the same fingerprint.
+
+        Subclasses that override :meth:`_fingerprint_state`
+        should override this method accordingly.
+        """
+        if not self.CACHE_REPR:
+            return False  # e.g. user-defined matchers
+        attrs = getattr(self, '__dict__', None)
+        result = None if attrs is None else attrs.get('_immutable')
+        if result is None:
+            result = all(map(is_immutable, self._state().values()))
+            if attrs is not None:
+                attrs['_immutable'] = result
+        return result
+
+    def _state(self):
+        """Return a dictionary of all the matcher's attributes,
+        except for those used to remember computed values.
+        """
+        state = dict(getattr(self, '__dict__', ()))
+        for name in self.CACHED_ATTRS:
+            state.pop(name, None)
+        for class_ in self.__class__.__mro__:
+            slots = class_.__dict__.get('__slots__', ())
+            for name in [slots] if isinstance(slots, str) else slots:
+                if name not in ('__dict__', '__weakref__') \
+                        and hasattr(self, name):
+                    state[name] = getattr(self, name)
+        return state
+
+    def intern(self):
+        """Return the canonical instance of matchers with this fingerprint.
+
+        The first matcher to be interned becomes the canonical one,
+        and is returned for all the subsequent :meth:`intern` calls
+        on equivalent matchers, for as long as it's in use.
+        This allows many identical matchers to share a single object.
+
+        Matchers whose state may change (see :meth:`_is_immutable`),
+        like those referring to lists or user-defined matchers,
+        are never shared, so they are returned unchanged.
+
+        :return: Interned matcher
+        """
+        if not self._is_immutable():
+            return self
+        try:
+            return _interned.setdefault(self.fingerprint(), self)
+        except TypeError:
+            return self  # matcher class doesn't support weak references
+
     def __repr__(self):
         return "<unspecified matcher>"
 
+    def _forget_repr(self):
+        """Forget the cached result of :meth:`__repr__`."""
+        getattr(self, '__dict__', {}).pop('_repr', None)
+
     def __eq__(self, other):
         if isinstance(other, BaseMatcher):
             raise TypeError(
@@ -120,16 +377,20 @@ class BaseMatcher(object):
 
     # TODO: make matcher objects callable
 
+    def _cost(self):
+        """Return the estimated cost of a :meth:`match` call.
+        See :attr:`COST` for details.
+        """
+        return self.COST
+
     def __invert__(self):
         return Not(self)
 
     def __and__(self, other):
-        matchers = other._matchers if isinstance(other, And) else [other]
-        return And(self, *matchers)
+        return And(self, other)
 
     def __or__(self, other):
-        matchers = other._matchers if isinstance(other, Or) else [other]
-        return Or(self, *matchers)
+        return Or(self, other)
 
     def __xor__(self, other):
         matchers = other._matchers if isinstance(other, Either) else [other]
@@ -146,6 +407,9 @@ class Matcher(BaseMatcher):
     you may also  want to provide a :meth:`__repr__` method implementation
     for better error messages.
     """
+    # custom matchers may change their attributes after being created
+    CACHE_REPR = False
+
     def __repr__(self):
         """Provides a default ``repr``\ esentation for custom matchers.
 
@@ -155,16 +419,10 @@ class Matcher(BaseMatcher):
         """
         args = ""
 
-        # check if the matcher class has a parametrized constructor
-        has_argful_ctor = False
-        if '__init__' in self.__class__.__dict__:
-            argnames, vargargs, kwargs, _ = inspect.getargspec(
-                self.__class__.__init__)
-            has_argful_ctor = bool(argnames[1:] or vargargs or kwargs)
-
-        # if so, then it probably means it has some interesting state
-        # in its attributes which we can include in the default representation
-        if has_argful_ctor:
+        # if the matcher class has a parametrized constructor,
+        # then it probably means it has some interesting state in its
+        # attributes which we can include in the default representation
+        if has_argful_ctor(self.__class__):
             # TODO: __getstate__ instead of __dict__?
             fields = [(name, value) for name, value in self.__dict__.items()
                       if not name.startswith('_')]
@@ -213,6 +471,9 @@ class Eq(BaseMatcher):
     def match(self, value):
         return self.value == value
 
+    def _compile(self, compiler, arg):
+        return "(%s == %s)" % (compiler.bind(self.value), arg)
+
     def __eq__(self, other):
         return self.match(other)
 
@@ -225,12 +486,20 @@ class Eq(BaseMatcher):
 class Is(BaseMatcher):
     """Matches a value using the identity (``is``) operator."""
 
+    COST = 0
+
     def __init__(self, value):
         self.value = value
 
     def match(self, value):
         return value is self.value
 
+    def _compile(self, compiler, arg):
+        return "(%s is %s)" % (arg, compiler.bind(self.value))
+
+    def _fingerprint_state(self):
+        return id(self.value)
+
     def __eq__(self, other):
         return self.match(other)
 
@@ -243,12 +512,20 @@ class Is(BaseMatcher):
 class IsNot(BaseMatcher):
     """Matches a value using the negated identity (``is not``) operator."""
 
+    COST = 0
+
     def __init__(self, value):
         self.value = value
 
     def match(self, value):
         return value is not self.value
 
+    def _compile(self, compiler, arg):
+        return "(%s is not %s)" % (arg, compiler.bind(self.value))
+
+    def _fingerprint_state(self):
+        return id(self.value)
+
     def __eq__(self, other):
         return self.match(other)
 
@@ -272,6 +549,15 @@ class Not(BaseMatcher):
     def match(self, value):
         return not self._matcher.match(value)
 
+    def _describe_mismatch(self, value):
+        return "%s matches %r" % (describe_value(value), self._matcher)
+
+    def _compile(self, compiler, arg):
+        return "(not %s)" % compiler.expr(self._matcher, arg)
+
+    def _cost(self):
+        return self._matcher._cost()
+
     def __repr__(self):
         return "not %r" % (self._matcher,)
 
@@ -282,49 +568,158 @@ class Not(BaseMatcher):
         # convert (~a) & (~b) into ~(a | b) which is one operation less
         # but still equivalent as per de Morgan laws
         if isinstance(other, Not):
-            return Not(self.matcher | other.matcher)
+            return Not(self._matcher | other._matcher)
         return super(Not, self).__and__(other)
 
     def __or__(self, other):
         # convert (~a) | (~b) into ~(a & b) which is one operation less
         # but still equivalent as per de Morgan laws
         if isinstance(other, Not):
-            return Not(self.matcher & other.matcher)
+            return Not(self._matcher & other._matcher)
         return super(Not, self).__or__(other)
 
 
-class And(BaseMatcher):
-    """Matches the argument only if all given matchers do."""
+class Combinator(BaseMatcher):
+    """Base class for combinators that can short-circuit, like :class:`And`.
+    This class shouldn't be used directly.
+    """
+    #: Result of a single operand that decides the result of the combinator,
+    #: so that remaining operands don't have to be checked.
+    #: Must be overridden in subclasses.
+    SHORT_CIRCUIT = None
 
-    def __init__(self, *matchers):
-        assert matchers, "And() expects at least one matcher"
+    def __init__(self, *matchers, **kwargs):
+        """
+        :param adaptive:
+
+            Whether the combinator should learn the best order of its operands
+            by measuring how often each one decides the result,
+            and how long it takes to do so.
+
+            If ``True``, the operands are reordered every
+            :attr:`AdaptiveOrder.DEFAULT_INTERVAL` matches.
+            A number can be passed to use a different interval.
+
+            This is mostly useful for matchers that are created once
+            (e.g. at module level) and then reused in many tests.
+            Use :meth:`freeze` to stop the learning process.
+        """
+        name = self.__class__.__name__
+        assert self.SHORT_CIRCUIT is not None, \
+            "must specify the short-circuiting result"
+        assert matchers, "%s() expects at least one matcher" % name
         assert all(isinstance(m, BaseMatcher)
-                   for m in matchers), "And() expects matchers"
-        self._matchers = list(matchers)
+                   for m in matchers), "%s() expects matchers" % name
+
+        adaptive = kwargs.pop('adaptive', False)
+        if kwargs:
+            raise TypeError("unexpected keyword arguments: %s" % (
+                ", ".join(sorted(kwargs)),))
+
+        #: Operands as given. They are normalized only when first needed,
+        #: so that chaining many matchers with ``&`` or ``|`` doesn't
+        #: normalize the growing list of operands over and over.
+        self._operands = matchers
+        self._normalized = None
+        self._adaptive = None
+        if adaptive:
+            interval = None if adaptive is True else adaptive
+            self._adaptive = AdaptiveOrder(self, interval)
+
+    @property
+    def _matchers(self):
+        """List of normalized operands (see :func:`normalize_operands`)."""
+        if self._normalized is None:
+            self._normalized = normalize_operands(self.__class__,
+                                                  self._operands)
+            self._operands = None  # may refer to a long chain of combinators
+        return self._normalized
+
+    @_matchers.setter
+    def _matchers(self, value):
+        self._normalized = value
+
+    def freeze(self):
+        """Stop adjusting the order of operands in adaptive mode.
+
+        Afterwards, the operands are always checked in the order
+        that has been learned so far, making the results deterministic.
+
+        :return: ``self``
+        """
+        if self._adaptive is not None:
+            self._adaptive.reorder()
+            self._adaptive = None
+        return self
+
+    def report(self):
+        """Report the statistics gathered for operands in adaptive mode.
+
+        :return: List of :class:`OperandStats` tuples,
+                 in the order the operands are currently checked
+        :raise ValueError: If the combinator isn't in adaptive mode
+        """
+        if self._adaptive is None:
+            raise ValueError("%s is not adaptive" % self.__class__.__name__)
+        return self._adaptive.report()
+
+    def _cost(self):
+        return max(m._cost() for m in self._matchers)
+
+    def _fingerprint_state(self):
+        # adaptive combinators gather statistics while matching,
+        # so each of them is unique
+        if self._adaptive is not None:
+            return id(self)
+        return fingerprint_of(self._matchers)
+
+    def _is_immutable(self):
+        result = self.__dict__.get('_immutable')
+        if result is None:
+            result = self.__dict__['_immutable'] = \
+                self._adaptive is None and \
+                all(m._is_immutable() for m in self._matchers)
+        return result
+
+
+class And(Combinator):
+    """Matches the argument only if all given matchers do."""
 
-    # TODO: coalesce a & b & c into single And(a, b, c)
+    SHORT_CIRCUIT = False
 
     def match(self, value):
+        if self._adaptive is not None:
+            return self._adaptive.match(value)
         return all(matcher.match(value) for matcher in self._matchers)
 
+    def _describe_mismatch(self, value):
+        for matcher in self._matchers:
+            if not matcher.match(value):
+                return matcher._describe_mismatch(value)
+        return super(And, self)._describe_mismatch(value)
+
+    def _compile(self, compiler, arg):
+        return "(%s)" % " and ".join(compiler.expr(m, arg)
+                                     for m in self._matchers)
+
     def __repr__(self):
         return "<%s>" % " and ".join(map(repr, self._matchers))
 
 
-class Or(BaseMatcher):
+class Or(Combinator):
     """Matches the argument only if at least one given matcher does."""
 
-    def __init__(self, *matchers):
-        assert matchers, "Or() expects at least one matcher"
-        assert all(isinstance(m, BaseMatcher)
-                   for m in matchers), "Or() expects matchers"
-        self._matchers = list(matchers)
-
-    # TODO: coalesce a | b | c into single Or(a, b, c)
+    SHORT_CIRCUIT = True
 
     def match(self, value):
+        if self._adaptive is not None:
+            return self._adaptive.match(value)
         return any(matcher.match(value) for matcher in self._matchers)
 
+    def _compile(self, compiler, arg):
+        return "(%s)" % " or ".join(compiler.expr(m, arg)
+                                    for m in self._matchers)
+
     def __repr__(self):
         return "<%s>" % " or ".join(map(repr, self._matchers))
 
@@ -356,3 +751,299 @@ class Either(BaseMatcher):
 OneOf = Either
 #: Alias for :class:`Either`.
 Xor = Either
+
+
+# Utility functions
+
+#: Representation of values used in descriptions of mismatches,
+#: abbreviated so that large values don't take ages to format.
+_value_repr = reprlib.Repr()
+_value_repr.maxstring = _value_repr.maxother = 64
+
+
+def describe_value(value):
+    """Return an abbreviated representation of a value,
+    for use in descriptions of mismatches.
+    """
+    return _value_repr.repr(value)
+
+
+_argful_ctors = {}
+
+
+def has_argful_ctor(class_):
+    """Check if the matcher class has a parametrized constructor."""
+    try:
+        return _argful_ctors[class_]
+    except KeyError:
+        pass
+    result = False
+    if '__init__' in class_.__dict__:
+        argnames, vargargs, kwargs, _ = getargspec(class_.__init__)
+        result = bool(argnames[1:] or vargargs or kwargs)
+    _argful_ctors[class_] = result
+    return result
+
+
+def normalize_operands(class_, matchers):
+    """Normalize the operands of a logical combinator.
+
+    This flattens any nested combinators of the same kind
+    (so that e.g. ``a & b & c`` becomes a single ``And(a, b, c)``),
+    removes double negations and duplicate matchers,
+    and finally puts the cheapest matchers first.
+
+    :param class_: Combinator class, like :class:`And` or :class:`Or`
+    :param matchers: Iterable of operand matchers
+    :return: List of matchers
+    """
+    operands = []
+    stack = list(reversed(matchers))
+    while stack:
+        operand = stack.pop()
+        # adaptive combinators have to retain their own operands
+        # since they collect statistics about them
+        if type(operand) is class_ and operand._adaptive is None:
+            # nested combinators may not have been normalized yet,
+            # which is only done here once for the whole chain
+            nested = operand._normalized
+            if nested is None:
+                nested = operand._operands
+            stack.extend(reversed(nested))
+            continue
+
+        while isinstance(operand, Not) and isinstance(operand._matcher, Not):
+            operand = operand._matcher._matcher
+        operands.append(operand)
+
+    # only matchers of the same class can be equivalent, so fingerprints
+    # (which may be costly for large collections) are computed just for those
+    class_counts = {}
+    for operand in operands:
+        class_ = type(operand)
+        class_counts[class_] = class_counts.get(class_, 0) + 1
+
+    result = []
+    seen = set()
+    for operand in operands:
+        # matchers whose state may change (e.g. user-defined ones)
+        # are only duplicates if they are the very same object
+        if class_counts[type(operand)] > 1 and operand._is_immutable():
+            key = operand.fingerprint()
+        else:
+            key = (_IDENTITY, id(operand))
+        if key in seen:
+            continue
+        seen.add(key)
+        result.append(operand)
+
+    # sort() is stable, so matchers of equal cost retain their relative order
+    result.sort(key=lambda m: m._cost())
+    return result
+
+
+# Structural identity of matchers
+
+#: Canonical matcher instances, keyed by their fingerprints.
+#: See :meth:`BaseMatcher.intern`.
+_interned = WeakValueDictionary()
+
+#: Marker for fingerprints of unhashable objects that are identified
+#: by their ``id()``, since their structure is unknown.
+_IDENTITY = object()
+
+
+def fingerprint_of(value):
+    """Compute a hashable fingerprint of a value that's part of a matcher.
+
+    Matchers are represented by their own :meth:`BaseMatcher.fingerprint`,
+    while built-in collections are fingerprinted item by item.
+    Other hashable values are used directly (along with their type,
+    so that e.g. ``1`` and ``True`` are kept apart).
+    Remaining unhashable objects are identified by their ``id()``.
+    """
+    if isinstance(value, BaseMatcher):
+        return value.fingerprint()
+
+    if isinstance(value, (list, tuple)):
+        return (type(value), tuple(map(fingerprint_of, value)))
+    if isinstance(value, (frozenset, set)):
+        return (type(value), frozenset(map(fingerprint_of, value)))
+    if isinstance(value, dict):
+        items = ((fingerprint_of(k), fingerprint_of(v))
+                 for k, v in value.items())
+        ordered = OrderedDict is not None and isinstance(value, OrderedDict)
+        return (type(value), (tuple if ordered else frozenset)(items))
+
+    try:
+        hash(value)
+    except TypeError:
+        return (_IDENTITY, id(value))
+    return (type(value), value)
+
+
+#: Types of values that cannot change once created
+IMMUTABLE_TYPES = frozenset([
+    type(None), bool, int, float, complex, str, bytes,
+    BuiltinFunctionType, FunctionType, type(re.compile('')),
+] + ([] if IS_PY3 else [long, unicode]))  # noqa
+
+
+def is_immutable(value):
+    """Check whether a value that's part of a matcher can never change.
+
+    Besides the values of :data:`IMMUTABLE_TYPES` and classes,
+    this includes tuples and frozensets of immutable items,
+    as well as matchers whose state is immutable.
+    Notably, lists, dictionaries and sets are mutable.
+    """
+    if type(value) in IMMUTABLE_TYPES or isinstance(value, type):
+        return True
+    if isinstance(value, BaseMatcher):
+        return value._is_immutable()
+    if type(value) in (tuple, frozenset):
+        return all(map(is_immutable, value))
+    return False
+
+
+# Matcher compilation
+
+class Compiler(object):
+    """Compiles a tree of matchers into a single Python function.
+
+    Matchers take part in the compilation by implementing the ``_compile``
+    method, which returns a Python expression equivalent to their
+    :meth:`~BaseMatcher.match`.
+    Any objects these expressions refer to (types, reference values, etc.)
+    have to be bound to names through :meth:`bind`.
+
+    This class shouldn't be used directly.
+    Call :meth:`BaseMatcher.compile` instead.
+    """
+    #: Name of the argument of the compiled function.
+    ARG = 'value'
+
+    def __init__(self):
+        self.namespace = {}
+        self._ids = {}
+        self._counter = count()
+
+    def bind(self, obj):
+        """Make given object available to the compiled code.
+        :return: Name that the object can be referred to with
+        """
+        # bind each object only once, so that e.g. a type used
+        # by multiple matchers will be referred to by the same name
+        key = id(obj)
+        if key in self._ids:
+            return self._ids[key]
+
+        name = '_%s' % next(self._counter)
+        self.namespace[name] = obj
+        self._ids[key] = name
+        return name
+
+    def expr(self, matcher, arg):
+        """Return the Python expression for given (sub)matcher."""
+        return matcher._compile(self, arg)
+
+    def build(self, matcher):
+        """Compile given matcher into a predicate function."""
+        source = "def match(%s):\n    return bool(%s)\n" % (
+            self.ARG, self.expr(matcher, self.ARG))
+        code = compile(source, '<compiled %s>' % matcher.__class__.__name__,
+                       'exec')
+        exec(code, self.namespace)
+
+        func = self.namespace['match']
+        func.source = source
+        return func
+
+
+# Adaptive ordering of operands
+
+#: Statistics about an operand of an adaptive :class:`Combinator`.
+OperandStats = namedtuple('OperandStats', [
+    'matcher',  # operand matcher
+    'checks',  # number of times the operand has been checked
+    'decisions',  # how many times it has decided the combinator's result
+    'time',  # total time spent checking the operand (in seconds)
+])
+
+
+class AdaptiveOrder(object):
+    """Learns the optimal order of operands of a :class:`Combinator`.
+
+    The optimal order is one that minimizes the expected time
+    until the result is decided. It is approximated by sorting the operands
+    on their average check time divided by their probability
+    of short-circuiting the combinator.
+
+    This class shouldn't be used directly.
+    Pass ``adaptive=True`` to :class:`And` or :class:`Or` instead.
+    """
+    #: Default number of matches between reorderings of operands.
+    DEFAULT_INTERVAL = 100
+
+    def __init__(self, combinator, interval=None):
+        if interval is None:
+            interval = self.DEFAULT_INTERVAL
+        if not (isinstance(interval, int) and interval > 0):
+            raise ValueError(
+                "adaptive= must be True or a positive integer, got %r" % (
+                    interval,))
+
+        self.combinator = combinator
+        self.interval = interval
+        self.matches = 0
+
+        #: Statistics for each operand, as mutable [checks, decisions, time]
+        #: lists keyed by ``id()`` of the operand
+        self.stats = dict((id(m), [0, 0, 0.0])
+                          for m in combinator._matchers)
+
+    def match(self, value):
+        """Match the value while collecting statistics about operands."""
+        short_circuit = self.combinator.SHORT_CIRCUIT
+        result = not short_circuit
+
+        for matcher in self.combinator._matchers:
+            start = default_timer()
+            is_match = bool(matcher.match(value))
+            elapsed = default_timer() - start
+
+            stats = self.stats[id(matcher)]
+            stats[0] += 1
+            stats[2] += elapsed
+            if is_match is short_circuit:
+                stats[1] += 1
+                result = short_circuit
+                break
+
+        self.matches += 1
+        if self.matches % self.interval == 0:
+            self.reorder()
+        return result
+
+    def reorder(self):
+        """Reorder operands of the combinator based on their statistics."""
+        def expected_cost(matcher):
+            checks, decisions, time = self.stats[id(matcher)]
+            if not checks:
+                return 0.0  # so that it gets checked & measured next time
+            # use additive smoothing for the short-circuit probability,
+            # so that operands which haven't decided anything yet still
+            # get a finite cost
+            probability = (decisions + 1.0) / (checks + 2.0)
+            return (time / checks) / probability
+
+        # the operands may be iterated by other threads at the same time,
+        # so they are replaced with a new list rather than sorted in place
+        self.combinator._matchers = sorted(self.combinator._matchers,
+                                           key=expected_cost)
+        self.combinator._forget_repr()
+
+    def report(self):
+        """Return the statistics as list of :class:`OperandStats`."""
+        return [OperandStats(m, *self.stats[id(m)])
+                for m in self.combinator._matchers]
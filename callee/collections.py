@@ -11,17 +11,26 @@ except ImportError:
     abc = collections
 
 import inspect
-
-from callee._compat import OrderedDict as _OrderedDict
-from callee.base import BaseMatcher
+from itertools import islice
+import pickle
+import random
+import re
+
+from callee._compat import \
+    IS_PY3, OrderedDict as _OrderedDict, STRING_TYPES, futures
+from callee.base import \
+    BaseMatcher, Eq, describe_value, fingerprint_of, is_immutable
 from callee.general import Any
+from callee.operators import In
 from callee.types import InstanceOf
 
 
 __all__ = [
     'Iterable', 'Generator',
-    'Sequence', 'List', 'Set',
+    'Sequence', 'List', 'Set', 'FrozenSet', 'Tuple', 'Unordered',
+    'ContainsSequence', 'ContainsSubsequence',
     'Mapping', 'Dict', 'OrderedDict',
+    'Shape',
 ]
 
 
@@ -33,13 +42,91 @@ class CollectionMatcher(BaseMatcher):
     #: Must be overridden in subclasses.
     CLASS = None
 
-    def __init__(self, of=None):
+    #: Ways of choosing the elements to check when ``sample=`` is given.
+    SAMPLING_MODES = ('random', 'first', 'last')
+
+    #: Number of elements checked together by a single parallel task.
+    #: Collections that aren't larger than this are always checked serially.
+    CHUNK_SIZE = 256
+
+    def __init__(self, of=None, sample=None, sampling='random', seed=0,
+                 parallel=None, executor=None):
         """
         :param of: Optional matcher for the elements,
                    or the expected type of the elements.
+        :param sample:
+
+            Optional number of elements to check against ``of``,
+            for when checking all of them would take too long.
+            By default, all elements are checked.
+
+        :param sampling:
+
+            How to choose the elements to check if ``sample`` is given:
+
+                * ``'random'`` (default) picks them at random, but
+                  deterministically for a given ``seed`` and collection size
+                * ``'first'`` checks the first ``sample`` elements
+                * ``'last'`` checks the last ``sample`` elements
+
+        :param seed: Seed for the ``'random'`` sampling
+
+        :param parallel:
+
+            Optional number of threads to check the elements in,
+            split into chunks of :attr:`CHUNK_SIZE`. This helps only
+            if ``of`` spends its time outside of Python code (e.g. in I/O,
+            or in C extensions which release the GIL).
+            Checking stops as soon as any chunk fails to match.
+
+        :param executor:
+
+            Optional :class:`concurrent.futures.Executor` to check
+            the elements with, in chunks. Unlike ``parallel``, this allows
+            to use a process pool, which is effective for matchers
+            running plain Python code. If the matchers cannot be pickled,
+            though, the elements are checked serially.
+
+        Without :mod:`concurrent.futures` (i.e. on Python 2 without
+        the backport), elements are always checked serially.
+
+        .. versionchanged:: 0.4
+           The ``sample``, ``sampling``, ``seed``, ``parallel``,
+           and ``executor`` arguments.
         """
         assert self.CLASS, "must specify collection type to match"
         self.of = self._validate_argument(of)
+        self._initialize_sampling(sample, sampling, seed)
+        self._initialize_parallelism(parallel, executor)
+
+    def _initialize_sampling(self, sample, sampling, seed):
+        """Validate and store the arguments for sampling of elements."""
+        if not (sample is None or isinstance(sample, int) and sample > 0):
+            raise ValueError(
+                "sample must be None or a positive integer, got %r" % (
+                    sample,))
+        if sampling not in self.SAMPLING_MODES:
+            raise ValueError("sampling must be one of %s, got %r" % (
+                ", ".join(map(repr, self.SAMPLING_MODES)), sampling))
+
+        self.sample = sample
+        self.sampling = sampling
+        self.seed = seed
+
+    def _initialize_parallelism(self, parallel, executor):
+        """Validate and store the arguments for parallel checking."""
+        if parallel is not None and executor is not None:
+            raise ValueError("expected parallel= or executor=, not both")
+        if not (parallel is None or
+                isinstance(parallel, int) and parallel > 0):
+            raise ValueError(
+                "parallel must be None or a positive integer, got %r" % (
+                    parallel,))
+        if not (executor is None or hasattr(executor, 'submit')):
+            raise TypeError("expected an executor, got %r" % (executor,))
+
+        self.parallel = parallel
+        self.executor = executor
 
     def _validate_argument(self, arg):
         """Validate a type or matcher argument to the constructor."""
@@ -59,9 +146,110 @@ class CollectionMatcher(BaseMatcher):
         if not isinstance(value, self.CLASS):
             return False
         if self.of is not None:
-            return all(self.of == item for item in value)
+            return self._check(all_match, (self.of,), self._sample(value))
         return True
 
+    def _describe_mismatch(self, value):
+        if isinstance(value, self.CLASS) and self.of is not None:
+            description = self._describe_element_mismatch(value)
+            if description is not None:
+                return description
+        return super(CollectionMatcher, self)._describe_mismatch(value)
+
+    def _describe_element_mismatch(self, collection):
+        """Describe the first element of a collection that doesn't match.
+        :return: Description, or ``None`` if all elements match
+        """
+        for i, item in self._indexed_elements(collection):
+            if not self.of.match(item):
+                return "%s: %s" % ("element" if i is None else
+                                   "element [%s]" % (i,),
+                                   self.of._describe_mismatch(item))
+        return None
+
+    def _indexed_elements(self, collection):
+        """Return the elements of a collection that are checked by
+        :meth:`match`, as (position, element) pairs.
+
+        Positions are ``None`` if they aren't meaningful for the collection.
+        """
+        if self.sample is None:
+            return enumerate(collection)
+        is_sequence = isinstance(collection, abc.Sequence)
+        return ((i if is_sequence else None, item)
+                for i, item in self._sample_indexed(collection))
+
+    def _check(self, func, matchers, items):
+        """Check all the items using one of the ``all_*`` functions,
+        in parallel if requested.
+
+        :param func: Function to call as ``func(*(matchers + (items,)))``
+                     for every chunk of items
+        :param matchers: Tuple of matchers to pass to ``func``
+        :param items: Iterable of elements to check
+        """
+        parallel = self.parallel is not None or self.executor is not None
+        if parallel and futures is not None:
+            items = list(items)
+            if len(items) > self.CHUNK_SIZE:
+                return self._check_in_parallel(func, matchers, items)
+        return func(*(matchers + (items,)))
+
+    def _check_in_parallel(self, func, matchers, items):
+        """Check chunks of items as separate tasks of an executor."""
+        executor = self.executor
+        if isinstance(executor, futures.ProcessPoolExecutor) \
+                and not is_picklable(matchers):
+            return func(*(matchers + (items,)))
+
+        chunks = [items[i:i + self.CHUNK_SIZE]
+                  for i in range(0, len(items), self.CHUNK_SIZE)]
+        if executor is None:
+            with futures.ThreadPoolExecutor(self.parallel) as executor:
+                return run_chunks(executor, func, matchers, chunks)
+        return run_chunks(executor, func, matchers, chunks)
+
+    def _sample(self, collection):
+        """Choose the elements of a collection that should be checked.
+
+        :param collection: Collection with a length,
+                           like a list, a set, or a mapping's items view
+        :return: Iterable of elements
+        """
+        if self.sample is None:
+            return collection
+        indices = self._sample_indices(len(collection))
+        if indices is None:
+            return collection
+        if self.sampling == 'first':
+            return islice(collection, self.sample)
+        if isinstance(collection, abc.Sequence):
+            return (collection[i] for i in indices)
+        return pick(collection, indices)
+
+    def _sample_indexed(self, collection):
+        """Like :meth:`_sample`, but yield (position, element) pairs."""
+        indices = self._sample_indices(len(collection))
+        if indices is None:
+            return enumerate(collection)
+        return zip(indices, self._sample(collection))
+
+    def _sample_indices(self, size):
+        """Choose the positions of elements that should be checked
+        in a collection of given size.
+
+        :return: Sorted iterable of positions,
+                 or ``None`` if all elements should be checked
+        """
+        if self.sample >= size:
+            return None
+        if self.sampling == 'first':
+            return range(self.sample)
+        if self.sampling == 'last':
+            return range(size - self.sample, size)
+        return sorted(
+            random.Random(self.seed).sample(range(size), self.sample))
+
     def __repr__(self):
         """Return a readable representation of the matcher.
         Used mostly for AssertionError messages in failed tests.
@@ -71,27 +259,208 @@ class CollectionMatcher(BaseMatcher):
             <List[<Integer>]>
         """
         of = "" if self.of is None else "[%r]" % (self.of,)
-        return "<%s%s>" % (self.__class__.__name__, of)
+        return "<%s%s%s>" % (self.__class__.__name__, of, self._repr_sample())
 
+    def _repr_sample(self):
+        """Return the part of matcher's representation describing sampling."""
+        if self.sample is None:
+            return ""
+        if self.sampling == 'random':
+            return " (random sample of %s, seed=%r)" % (self.sample,
+                                                        self.seed)
+        return " (%s %s)" % (self.sampling, self.sample)
 
-class Iterable(CollectionMatcher):
-    """Matches any iterable."""
 
+class Iterable(CollectionMatcher):
+    """Matches any iterable.
+
+    Elements of the iterable can be checked as well, using the ``of=``
+    argument. However, a one-off iterable (e.g. a generator comprehension)
+    can't be iterated upon more than once safely, since it's exhausted
+    after a single pass. Checking its elements would alter the very object
+    we're trying to match, and potentially cause all sorts of unexpected
+    behaviors (e.g. tests passing/failing depending on the order
+    of assertions).
+
+    Therefore, elements of one-off iterables can only be checked
+    if the calls were recorded with
+    :class:`~callee.recorders.CallRecorder`\ ``(tee_iterators=True)``.
+    The recorder passes such arguments to the code under test through
+    a proxy which remembers their first elements, so that they can be
+    inspected afterwards::
+
+        recorder = CallRecorder(process_rows, tee_iterators=True)
+        # ... call recorder(rows) in the tested code ...
+        recorder.assert_any_call(Iterable(of=Row, max_items=100))
+    """
     CLASS = abc.Iterable
 
-    def __init__(self):
-        # Unfortunately, we can't allow an ``of`` argument to this matcher.
-        #
-        # An otherwise unspecified iterable can't be iterated upon
-        # more than once safely, because it could be a one-off iterable
-        # (e.g. generator comprehension) that's exhausted after a single pass.
-        #
-        # Thus the sole act of checking the element types would alter
-        # the object we're trying to match, and potentially cause all sorts
-        # of unexpected behaviors (e.g. tests passing/failing depending on
-        # the order of assertions).
-        #
-        super(Iterable, self).__init__(of=None)
+    def __init__(self, of=None, max_items=None):
+        """
+        :param of: Optional matcher for the elements,
+                   or the expected type of the elements.
+        :param max_items: Optional maximum number of elements to check.
+                          Only this many first elements have to match.
+
+        .. versionchanged:: 0.4
+           The ``of`` and ``max_items`` arguments.
+        """
+        super(Iterable, self).__init__(of=of)
+        if not (max_items is None or
+                isinstance(max_items, int) and max_items > 0):
+            raise ValueError(
+                "max_items must be None or a positive integer, got %r" % (
+                    max_items,))
+        self.max_items = max_items
+
+    def match(self, value):
+        if not isinstance(value, self.CLASS):
+            return False
+        if self.of is None:
+            return True
+
+        # ``all`` stops at the first mismatch,
+        # so no more elements than necessary are retrieved
+        return all(self.of == item for item in self._elements(value))
+
+    def _elements(self, value):
+        """Return the elements of an iterable that should be checked."""
+        if isinstance(value, TeeProxy):
+            return value.peek(self.max_items)
+        if iter(value) is value:
+            raise ValueError(
+                "cannot check the elements of a one-off iterable %r "
+                "without consuming it; use CallRecorder(tee_iterators=True) "
+                "to record the calls" % (value,))
+        return value if self.max_items is None \
+            else islice(value, self.max_items)
+
+    def _indexed_elements(self, value):
+        return enumerate(self._elements(value))
+
+    def __repr__(self):
+        result = super(Iterable, self).__repr__()
+        if self.max_items is not None:
+            result = "%s (first %s)>" % (result[:-1], self.max_items)
+        return result
+
+
+class TeeProxy(object):
+    """Proxy for a one-off iterator that remembers its first elements,
+    so that they can be checked by matchers after (or before)
+    the iterator has been consumed by the code under test.
+
+    Elements retrieved by matchers are buffered and then returned
+    to the code under test, which thus sees the exact same sequence
+    as if it were iterating over the original iterator.
+
+    Other attributes are forwarded to the source iterator.
+    For generators, this includes :meth:`send`, :meth:`throw`,
+    and :meth:`close`.
+
+    This class shouldn't be used directly.
+    Pass ``tee_iterators=True`` to :class:`~callee.recorders.CallRecorder`.
+    """
+    #: Default maximum number of remembered elements.
+    DEFAULT_MAX_ITEMS = 1000
+
+    def __init__(self, source, max_items=DEFAULT_MAX_ITEMS):
+        """
+        :param source: Iterator to wrap
+        :param max_items: Maximum number of elements to remember
+        """
+        #: Original iterator
+        self.source = source
+        self.max_items = max_items
+
+        #: First elements of the source iterator, up to ``max_items``
+        self._buffer = []
+        #: Position of the code under test in the sequence of elements
+        self._position = 0
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self._position < len(self._buffer):
+            item = self._buffer[self._position]
+            self._position += 1
+            return item
+        return self._record(next(self.source))
+
+    next = __next__  # Python 2
+
+    def send(self, value):
+        """Send a value into the source generator,
+        like :meth:`generator.send` does.
+
+        :raise ValueError: When trying to send anything but ``None``
+                           while elements retrieved by matchers are pending,
+                           as the generator has already moved past them
+        """
+        if self._position < len(self._buffer):
+            if value is not None:
+                self._raise_pending()
+            return self.__next__()
+        return self._record(self.source.send(value))
+
+    def throw(self, *args):
+        """Raise an exception in the source generator,
+        like :meth:`generator.throw` does.
+        :raise ValueError: If elements retrieved by matchers are pending
+        """
+        if self._position < len(self._buffer):
+            self._raise_pending()
+        return self._record(self.source.throw(*args))
+
+    def _record(self, item):
+        """Remember an element the code under test got from the source."""
+        if self._position == len(self._buffer) \
+                and len(self._buffer) < self.max_items:
+            self._buffer.append(item)
+        self._position += 1
+        return item
+
+    def _raise_pending(self):
+        raise ValueError("the generator has already moved past elements "
+                         "retrieved by a matcher")
+
+    def close(self):
+        """Close the source generator."""
+        self.source.close()
+
+    def __getattr__(self, name):
+        # only called for attributes not found the usual way
+        source = self.__dict__.get('source')
+        if source is None:
+            raise AttributeError(name)
+        return getattr(source, name)
+
+    def peek(self, limit=None):
+        """Iterate over the first elements of the source iterator,
+        without consuming them.
+
+        If the code under test has already consumed more elements
+        than are remembered, only the remembered ones are returned.
+
+        :param limit: Optional maximum number of elements to return
+        """
+        if limit is None or limit > self.max_items:
+            limit = self.max_items
+        for i in range(limit):
+            if i == len(self._buffer):
+                # elements past the buffer are either still in the source,
+                # or have been irrevocably consumed by the code under test
+                if self._position > i:
+                    return
+                try:
+                    self._buffer.append(next(self.source))
+                except StopIteration:
+                    return
+            yield self._buffer[i]
+
+    def __repr__(self):
+        return "<TeeProxy %r>" % (self.source,)
 
 
 class Generator(BaseMatcher):
@@ -105,7 +474,11 @@ class Generator(BaseMatcher):
         To match a *generator function* itself, you should use the
         :class:`~callee.functions.GeneratorFunction` matcher instead.
     """
+    COST = 1
+
     def match(self, value):
+        if isinstance(value, TeeProxy):
+            value = value.source
         return inspect.isgenerator(value)
 
     def __repr__(self):
@@ -128,14 +501,423 @@ class List(CollectionMatcher):
     CLASS = list
 
 
-class Set(CollectionMatcher):
-    """Matches a :class:`set` of given items."""
+class SetMatcher(CollectionMatcher):
+    """Base class for set matchers.
+    This class shouldn't be used directly.
+    """
+    def __init__(self, of=None, contains_all=None, contains_any=None,
+                 subset_of=None, **kwargs):
+        """
+        :param of: Optional matcher for the elements,
+                   or the expected type of the elements.
+        :param contains_all: Optional iterable of elements (or matchers)
+                             that must all be in the set
+        :param contains_any: Optional iterable of elements (or matchers)
+                             of which at least one must be in the set
+        :param subset_of: Optional iterable of elements (or matchers)
+                          that all the set's elements must be among
+
+        Elements given as plain values are checked using set operations,
+        without going through the whole set. Matchers have to be checked
+        against the set's elements, though. In ``contains_all``,
+        every one of them needs a different element to match.
+
+        Other arguments are described in :class:`List`.
+
+        .. versionchanged:: 0.4
+           The ``contains_all``, ``contains_any``, and ``subset_of``
+           arguments.
+        """
+        super(SetMatcher, self).__init__(of, **kwargs)
+        self.contains_all = self._split_elements('contains_all', contains_all)
+        self.contains_any = self._split_elements('contains_any', contains_any)
+        self.subset_of = self._split_elements('subset_of', subset_of)
+
+    def _split_elements(self, name, elements):
+        """Split the elements given as a constructor argument
+        into a set of plain values and a tuple of matchers.
+        """
+        if elements is None:
+            return None
+
+        values = set()
+        matchers = []
+        for elem in elements:
+            if isinstance(elem, BaseMatcher):
+                matchers.append(elem)
+                continue
+            try:
+                values.add(elem)
+            except TypeError:
+                raise TypeError(
+                    "%s must contain hashable values or matchers, got %r" % (
+                        name, elem))
+        return frozenset(values), tuple(matchers)
+
+    def match(self, value):
+        if not isinstance(value, self.CLASS):
+            return False
+
+        # set operations come first, as they don't depend on the set's size
+        if self.contains_all is not None:
+            values, matchers = self.contains_all
+            if not all(elem in value for elem in values):
+                return False
+            if matchers and not self._contains_all_matchers(value):
+                return False
+        if self.contains_any is not None:
+            values, matchers = self.contains_any
+            if value.isdisjoint(values) and not any(
+                    matcher == elem for matcher in matchers for elem in value):
+                return False
+        if self.subset_of is not None:
+            values, matchers = self.subset_of
+            if not matchers:
+                if not value <= values:
+                    return False
+            elif not all(any(matcher == elem for matcher in matchers)
+                         for elem in value if elem not in values):
+                return False
+
+        return super(SetMatcher, self).match(value)
+
+    def _contains_all_matchers(self, value):
+        """Check whether every matcher in ``contains_all``
+        can be paired with a different element of the set.
+        """
+        values, matchers = self.contains_all
+        elements = [elem for elem in value if elem not in values]
+        if len(elements) < len(matchers):
+            return False
+
+        graph = [[i for i, elem in enumerate(elements) if matcher == elem]
+                 for matcher in matchers]
+        if not all(graph):
+            return False
+        return maximum_matching(graph, len(elements)) == len(matchers)
+
+    def __repr__(self):
+        """Return a readable representation of the matcher.
+        Used mostly for AssertionError messages in failed tests.
+
+        Example::
+
+            <Set[<Integer>] containing all of [1, 2]>
+        """
+        of = "" if self.of is None else "[%r]" % (self.of,)
+        conditions = "".join(
+            " %s %s" % (label, repr_elements(elements))
+            for label, elements in (("containing all of", self.contains_all),
+                                    ("containing any of", self.contains_any),
+                                    ("subset of", self.subset_of))
+            if elements is not None)
+        return "<%s%s%s%s>" % (self.__class__.__name__, of, conditions,
+                               self._repr_sample())
+
+
+class Set(SetMatcher):
+    """Matches a set (including a :class:`frozenset`) of given items."""
 
     CLASS = abc.Set
 
 
-# TODO: Tuple matcher, with of= that accepts a tuple of matchers
-# so that tuple elements can be also matched on
+class FrozenSet(SetMatcher):
+    """Matches a :class:`frozenset` of given items.
+
+    .. versionadded:: 0.4
+    """
+    CLASS = frozenset
+
+
+class Tuple(CollectionMatcher):
+    """Matches a :class:`tuple` of given items.
+
+    Like with other collections, ``of=`` can be a single matcher
+    (or type) for all the elements, no matter how many of them are there::
+
+        Tuple(of=Integer())  # tuple of any number of integers
+
+    It can also be a tuple of matchers, one for every position::
+
+        Tuple(of=(String(), Integer()))  # pair of a string & an integer
+
+    and then the matched tuple must have exactly as many elements.
+
+    If all elements should be of a particular type, i.e. ``of`` is just
+    a type or :class:`~callee.types.InstanceOf`, only the distinct types
+    of the elements are checked, rather than every one of them.
+
+    .. versionadded:: 0.4
+    """
+    CLASS = tuple
+
+    def __init__(self, of=None, **kwargs):
+        """
+        :param of: Optional matcher for the elements, the expected type
+                   of the elements, or a tuple of matchers (or types)
+                   for consecutive elements
+
+        Other arguments are described in :class:`List`,
+        but can only be passed if ``of`` is not a tuple.
+        """
+        if not isinstance(of, tuple):
+            super(Tuple, self).__init__(of, **kwargs)
+            self.positional = False
+            self._element_type = element_type(self.of)
+            return
+
+        if kwargs:
+            raise TypeError(
+                "%s can't be passed along with a tuple of matchers" % (
+                    ", ".join(sorted(kwargs)),))
+        # not `None in of`, as that would try to match None with matchers
+        if any(m is None for m in of):
+            raise TypeError("expected a tuple of matchers/types, got %r" % (
+                of,))
+        super(Tuple, self).__init__()
+        self.of = tuple(map(self._validate_argument, of))
+        self.positional = True
+        self._element_type = None
+
+    def match(self, value):
+        if not isinstance(value, self.CLASS):
+            return False
+
+        if self.positional:
+            if len(value) != len(self.of):
+                return False
+            for matcher, item in zip(self.of, value):
+                if not matcher == item:
+                    return False
+            return True
+
+        if self._element_type is not None and self.sample is None:
+            type_, exact = self._element_type
+            types = set(map(type, value))
+            if exact:
+                return types <= set([type_])
+            if all(issubclass(t, type_) for t in types):
+                return True
+            # objects may still pass isinstance() by faking their __class__
+            # (like mocks with spec=), so they need to be checked one by one
+
+        return super(Tuple, self).match(value)
+
+    def _describe_mismatch(self, value):
+        if self.positional and isinstance(value, self.CLASS):
+            if len(value) != len(self.of):
+                return "expected %s elements, got %s" % (len(self.of),
+                                                         len(value))
+            for i, (matcher, item) in enumerate(zip(self.of, value)):
+                if not matcher.match(item):
+                    return "element [%s]: %s" % (
+                        i, matcher._describe_mismatch(item))
+        return super(Tuple, self)._describe_mismatch(value)
+
+
+class Unordered(BaseMatcher):
+    """Matches a sequence with given elements, in any order.
+
+    Example::
+
+        Unordered([1, 2, String()])  # e.g. [2, 'foo', 1]
+
+    The sequence must have exactly as many elements as given,
+    with every one of them paired to a different element of the sequence.
+
+    Elements given as plain values (like numbers or strings) are paired
+    with equal elements of the same type by looking them up in a dictionary.
+    Only the rest of the elements have to be compared with every matcher,
+    and the pairing is then found with the Hopcroft-Karp algorithm.
+    If that fails, every element is compared with every matcher,
+    in case some of them can tell equal plain values apart
+    (like :class:`~callee.base.Is`).
+
+    .. versionadded:: 0.4
+    """
+    def __init__(self, elements):
+        """
+        :param elements: Iterable of expected elements, or matchers for them
+        """
+        self.elements = list(elements)
+
+        #: Numbers of occurrences of the plain values
+        #: (see :attr:`SequencePatternMatcher.PLAIN_TYPES`),
+        #: keyed by ``(type, value)`` pairs
+        self._counts = {}
+        self._matchers = []
+        for elem in self.elements:
+            if isinstance(elem, BaseMatcher):
+                self._matchers.append(elem)
+            elif type(elem) in SequencePatternMatcher.PLAIN_TYPES:
+                key = (type(elem), elem)
+                self._counts[key] = self._counts.get(key, 0) + 1
+            else:
+                self._matchers.append(Eq(elem))
+
+    def match(self, value):
+        if not isinstance(value, abc.Sequence):
+            return False
+        if len(value) != len(self.elements):
+            return False
+
+        counts = dict(self._counts)
+        rest = []
+        for item in value:
+            count = None
+            if type(item) in SequencePatternMatcher.PLAIN_TYPES:
+                key = (type(item), item)
+                count = counts.get(key)
+            if count:
+                counts[key] = count - 1
+            else:
+                rest.append(item)
+        if not rest:
+            return True
+
+        # values that haven't been paired with an element of the same type
+        # may still be equal to some other element (e.g. 1 == 1.0)
+        matchers = list(self._matchers)
+        for (_, elem), count in counts.items():
+            matchers.extend([Eq(elem)] * count)
+        if self._pair(matchers, rest):
+            return True
+
+        # the values paired above may have been the only ones
+        # accepted by some matchers (or other objects), so try again
+        # without any shortcuts, unless there is nothing to tell them apart
+        if len(rest) == len(value):
+            return False
+        if not self._matchers and all(
+                type(item) in SequencePatternMatcher.PLAIN_TYPES
+                for item in rest):
+            return False
+        matchers = [elem if isinstance(elem, BaseMatcher) else Eq(elem)
+                    for elem in self.elements]
+        return self._pair(matchers, value)
+
+    def _pair(self, matchers, items):
+        """Check if every matcher can be paired with a different item
+        that it matches.
+        """
+        graph = [[i for i, item in enumerate(items) if matcher == item]
+                 for matcher in matchers]
+        if not all(graph):
+            return False
+        return maximum_matching(graph, len(items)) == len(matchers)
+
+    def __repr__(self):
+        return "<Unordered %r>" % (self.elements,)
+
+
+class SequencePatternMatcher(BaseMatcher):
+    """Base class for matchers looking for a pattern of elements
+    in a sequence.
+
+    This class shouldn't be used directly.
+    """
+    #: Types of values whose equality is well-behaved (i.e. reflexive,
+    #: symmetric, and transitive), so that comparisons can be skipped
+    #: based on results of the previous ones.
+    #: Arbitrary objects (like ``mock.ANY``) may compare equal to anything.
+    PLAIN_TYPES = frozenset([
+        type(None), bool, int, float, complex, bytes,
+    ] + list(STRING_TYPES) + ([] if IS_PY3 else [long]))  # noqa
+
+    def __init__(self, pattern):
+        """
+        :param pattern: Sequence of expected elements, or matchers for them
+        """
+        if isinstance(pattern, abc.Iterator):
+            pattern = list(pattern)
+        if not isinstance(pattern, abc.Sequence):
+            raise TypeError("%s requires a sequence, got %r" % (
+                self.__class__.__name__, type(pattern)))
+        self.pattern = pattern
+
+    def __repr__(self):
+        return "<%s %r>" % (self.__class__.__name__, self.pattern)
+
+
+class ContainsSequence(SequencePatternMatcher):
+    """Matches a sequence that contains given elements
+    as a contiguous run, somewhere within it.
+
+    Example::
+
+        ContainsSequence([1, 2, 3])  # e.g. [0, 1, 2, 3, 4]
+        ContainsSequence([Integer(), String()])
+        ContainsSequence(b'\\r\\n')  # e.g. b'foo\\r\\nbar'
+
+    Patterns of plain values are searched for in linear time:
+    using :meth:`bytes.find` for byte strings, a regular expression
+    for :class:`memoryview`\ s of bytes (so that they aren't copied),
+    ``in`` for strings, or with the Knuth-Morris-Pratt algorithm
+    for other sequences.
+    Patterns with matchers are checked at every position of the sequence.
+
+    .. versionadded:: 0.4
+    """
+    def __init__(self, pattern):
+        super(ContainsSequence, self).__init__(pattern)
+        self._bytes = as_bytes(self.pattern)
+        self._bytes_regex = (None if self._bytes is None
+                             else re.compile(re.escape(self._bytes)))
+        self._string = (self.pattern
+                        if isinstance(self.pattern, STRING_TYPES) else None)
+
+        #: Table of the Knuth-Morris-Pratt algorithm,
+        #: or ``None`` if the pattern has matchers (or other objects
+        #: with unusual equality)
+        self._kmp_table = None
+        if all(type(elem) in self.PLAIN_TYPES for elem in self.pattern):
+            self._kmp_table = kmp_table(self.pattern)
+
+    def match(self, value):
+        if not isinstance(value, abc.Sequence):
+            return False
+        if not self.pattern:
+            return True
+
+        if self._bytes is not None:
+            if isinstance(value, (bytes, bytearray)):
+                return value.find(self._bytes) >= 0
+            if is_byte_view(value):
+                return self._bytes_regex.search(value) is not None
+        if self._string is not None and isinstance(value, STRING_TYPES):
+            return self._string in value
+
+        if self._kmp_table is not None:
+            return kmp_search(self.pattern, self._kmp_table, value)
+
+        pattern = self.pattern
+        first, size = pattern[0], len(pattern)
+        for start in range(len(value) - size + 1):
+            if first == value[start] and all(
+                    pattern[i] == value[start + i] for i in range(1, size)):
+                return True
+        return False
+
+
+class ContainsSubsequence(SequencePatternMatcher):
+    """Matches a sequence that contains given elements in the same order,
+    though not necessarily next to each other.
+
+    Example::
+
+        ContainsSubsequence([1, 3])  # e.g. [0, 1, 2, 3, 4]
+
+    Elements of the sequence are checked in a single pass,
+    taking the first one that matches every consecutive pattern element.
+
+    .. versionadded:: 0.4
+    """
+    def match(self, value):
+        if not isinstance(value, abc.Sequence):
+            return False
+        items = iter(value)
+        return all(any(expected == item for item in items)
+                   for expected in self.pattern)
 
 
 # Mappings
@@ -162,17 +944,45 @@ class MappingMatcher(CollectionMatcher):
                    Cannot be provided if either ``keys`` or ``values``
                    is also passed.
 
+        Alternatively, particular keys can be required::
+
+            Dict(required={'id': Integer(), 'name': String()})
+
+        :param required: Dictionary of keys that have to be present,
+                         mapped to matchers (or types, or exact values)
+                         for their values.
+                         Those keys are looked up directly, so the number
+                         of other items in the dictionary doesn't matter.
+        :param extra: Matcher for the values of any other keys,
+                      or a tuple of matchers for their keys & values.
+                      By default, no other keys are allowed.
+                      Pass ``Any()`` to allow any.
+
+        Items can be also sampled using the ``sample``, ``sampling``,
+        and ``seed`` arguments, and checked in parallel using
+        ``parallel`` or ``executor``, as described in :class:`List`.
         """
         assert self.CLASS, "must specify mapping type to match"
         self._initialize(*args, **kwargs)
 
     def _initialize(self, *args, **kwargs):
         """Initiaize the mapping matcher with constructor arguments."""
+        self._initialize_sampling(kwargs.pop('sample', None),
+                                  kwargs.pop('sampling', 'random'),
+                                  kwargs.pop('seed', 0))
+        self._initialize_parallelism(kwargs.pop('parallel', None),
+                                     kwargs.pop('executor', None))
         self.items = None
         self.keys = None
         self.values = None
-
-        if args:
+        self.required = None
+        self.extra = None
+
+        if 'required' in kwargs:
+            self._initialize_required(*args, **kwargs)
+        elif 'extra' in kwargs:
+            raise TypeError("extra= can only be passed along with required=")
+        elif args:
             if len(args) != 2:
                 raise TypeError("expected exactly two positional arguments, "
                                 "got %s" % len(args))
@@ -213,18 +1023,141 @@ class MappingMatcher(CollectionMatcher):
                     # got of= as a single matcher
                     self.items = self._validate_argument(of)
 
+    def _initialize_required(self, *args, **kwargs):
+        """Initialize the mapping matcher with ``required=`` argument."""
+        required = kwargs.pop('required')
+        extra = kwargs.pop('extra', None)
+        if args or kwargs:
+            raise TypeError("expected required= and extra= arguments, "
+                            "not keys/values or items matchers")
+        if not isinstance(required, abc.Mapping):
+            raise TypeError("required= must be a mapping, got %r" % (
+                type(required),))
+
+        self.required = dict(
+            (key, self._validate_argument(value)
+             if isinstance(value, (BaseMatcher, type)) else Eq(value))
+            for key, value in required.items())
+
+        if extra is not None:
+            if isinstance(extra, tuple):
+                try:
+                    keys, values = map(self._validate_argument, extra)
+                except ValueError:
+                    raise TypeError(
+                        "extra= tuple has to be a pair of matchers/types")
+            else:
+                keys, values = Any(), self._validate_argument(extra)
+            self.extra = (keys, values)
+
     def match(self, value):
         if not isinstance(value, self.CLASS):
             return False
 
+        if self.required is not None:
+            return self._match_required(value)
+        if self._rejected_by_size(value):
+            return False
+
         if self.items is not None:
-            return all(self.items == i for i in value.items())
+            return self._check(all_match, (self.items,),
+                               self._sample(value.items()))
         if self.keys is not None and self.values is not None:
-            return all(self.keys == k and self.values == v
-                       for k, v in value.items())
+            return self._check(all_pairs_match, (self.keys, self.values),
+                               self._sample(value.items()))
 
         return True
 
+    def _match_required(self, value):
+        """Match a mapping against ``required`` keys & the ``extra`` items."""
+        for key, matcher in self.required.items():
+            # not using value[key] alone, since for some mappings
+            # (like defaultdict) it would add the key if it's missing
+            if key not in value or not matcher == value[key]:
+                return False
+
+        # required keys are all present, so they're the only ones
+        # if their number is the same as the size of the mapping
+        if len(value) == len(self.required):
+            return True
+        if self.extra is None:
+            return False
+
+        keys, values = self.extra
+        if isinstance(keys, Any) and isinstance(values, Any):
+            return True
+        required = self.required
+        return self._check(all_pairs_match, self.extra,
+                           (item for item in value.items()
+                            if item[0] not in required))
+
+    def _describe_mismatch(self, value):
+        if isinstance(value, self.CLASS):
+            if self.required is not None:
+                description = self._describe_required_mismatch(value)
+            elif self.items is not None:
+                description = self._describe_items_mismatch(
+                    self._sample(value.items()))
+            else:
+                description = self._describe_pairs_mismatch(
+                    self.keys, self.values, self._sample(value.items()))
+            if description is not None:
+                return description
+        return super(MappingMatcher, self)._describe_mismatch(value)
+
+    def _describe_required_mismatch(self, value):
+        """Describe how a mapping doesn't match ``required`` & ``extra``."""
+        for key, matcher in self.required.items():
+            if key not in value:
+                return "missing key %r" % (key,)
+            if not matcher.match(value[key]):
+                return "value for key %r: %s" % (
+                    key, matcher._describe_mismatch(value[key]))
+
+        others = (item for item in value.items()
+                  if item[0] not in self.required)
+        if self.extra is None:
+            return "unexpected keys %s" % ", ".join(
+                sorted(repr(key) for key, _ in others))
+        return self._describe_pairs_mismatch(self.extra[0], self.extra[1],
+                                             others)
+
+    def _describe_items_mismatch(self, items):
+        for item in items:
+            if not self.items.match(item):
+                return "item %s: %s" % (describe_value(item),
+                                        self.items._describe_mismatch(item))
+        return None
+
+    def _describe_pairs_mismatch(self, keys, values, items):
+        for key, value in items:
+            if keys is not None and not keys.match(key):
+                return "key %s: %s" % (describe_value(key),
+                                       keys._describe_mismatch(key))
+            if values is not None and not values.match(value):
+                return "value for key %s: %s" % (
+                    describe_value(key), values._describe_mismatch(value))
+        return None
+
+    def _rejected_by_size(self, value):
+        """Check whether the keys matcher rules out a mapping of this size,
+        without looking at the actual keys.
+
+        Since keys of a mapping are all different, only as many of them
+        can be equal to the values accepted by the matcher -- as long as
+        those are plain values, rather than e.g. ``mock.ANY``.
+        """
+        plain_types = SequencePatternMatcher.PLAIN_TYPES
+        keys = self.keys
+        if isinstance(keys, Eq):
+            return len(value) > 1 and type(keys.value) in plain_types
+        if isinstance(keys, In) and keys.elementwise is None \
+                and isinstance(keys.ref, (abc.Set, abc.Mapping)):
+            # only checked when it matters, since the values may be many
+            return len(value) > len(keys.ref) and \
+                all(type(item) in plain_types for item in keys.ref)
+        return False
+
     def __repr__(self):
         """Return a readable representation of the matcher
         Used mostly for AssertionError messages in failed tests.
@@ -233,6 +1166,10 @@ class MappingMatcher(CollectionMatcher):
 
             <Dict[<String> => <Any>]>
         """
+        if self.required is not None:
+            return "<%s%s%s>" % (self.__class__.__name__,
+                                 self._repr_required(), self._repr_sample())
+
         of = ""
 
         if self.items is not None:
@@ -243,7 +1180,20 @@ class MappingMatcher(CollectionMatcher):
             values = repr(Any() if self.values is None else self.values)
             of = "[%s => %s]" % (keys, values)
 
-        return "<%s%s>" % (self.__class__.__name__, of)
+        return "<%s%s%s>" % (self.__class__.__name__, of, self._repr_sample())
+
+    def _repr_required(self):
+        """Return the part of matcher's representation
+        describing ``required`` keys & ``extra`` items.
+
+        Example::
+
+            {'id' => <Integer>, <String> => <Any>}
+        """
+        items = sorted("%r => %r" % item for item in self.required.items())
+        if self.extra is not None:
+            items.append("%r => %r" % self.extra)
+        return "{%s}" % ", ".join(items)
 
 
 class Mapping(MappingMatcher):
@@ -280,3 +1230,429 @@ class OrderedDict(MappingMatcher):
         if self.CLASS is None:
             return False
         return super(OrderedDict, self).match(value)
+
+
+# Nested structures
+
+class Shape(BaseMatcher):
+    """Matches a nested structure of dictionaries & lists,
+    such as a decoded JSON payload, against a template.
+
+    Example::
+
+        Shape({'user': {'id': Integer(), 'tags': [String()]}})
+
+    The template can contain:
+
+        * dictionaries, which match mappings with the same keys
+          (and values matching the corresponding templates)
+        * one-element lists, which match lists (and other sequences
+          that aren't strings) whose every element matches the template
+        * tuples, which match sequences of the same length,
+          whose elements match the templates at the same positions
+        * matchers and types
+        * any other values, which are compared with ``==``
+
+    The template is compiled once, and checked with a single loop
+    that doesn't recurse (so arbitrarily deep structures can be matched)
+    and stops at the first failure. To find out where that was,
+    use :meth:`explain`.
+
+    .. versionadded:: 0.4
+    """
+    def __init__(self, template, exact=True):
+        """
+        :param template: Template of the structure, as described above
+        :param exact: Whether dictionaries must not have any keys
+                      besides those in the template
+        """
+        self.template = template
+        self.exact = exact
+        self._root = compile_shape(template)
+
+    def match(self, value):
+        return self._find_mismatch(value) is None
+
+    def _describe_mismatch(self, value):
+        return self.explain(value)
+
+    def explain(self, value):
+        """Describe why the value doesn't match the template.
+
+        :return: Description of the first mismatch, starting with its path
+                 (e.g. ``"['user']['tags'][2]: expected <String>, got 42"``),
+                 or ``None`` if the value matches
+        """
+        mismatch = self._find_mismatch(value)
+        if mismatch is None:
+            return None
+        path, node, value = mismatch
+        return "%s: %s" % (format_path(path),
+                           describe_shape_mismatch(node, value))
+
+    def _find_mismatch(self, value):
+        """Traverse the value along with the compiled template.
+
+        :return: Tuple of (path, node, value) for the first mismatch,
+                 or ``None``. The reason for it is only described
+                 when asked for, by :func:`describe_shape_mismatch`.
+        """
+        # stack of iterators over (node, value, path) triples;
+        # paths are linked lists of (parent path, key) pairs,
+        # so that they don't have to be copied for every node
+        stack = [iter([(self._root, value, None)])]
+        exact = self.exact
+        while stack:
+            for node, value, path in stack[-1]:
+                break
+            else:
+                stack.pop()
+                continue
+
+            kind, arg = node
+            if kind is SHAPE_LEAF:
+                if not arg == value:
+                    return path, node, value
+
+            elif kind is SHAPE_MAPPING:
+                if not isinstance(value, abc.Mapping):
+                    return path, node, value
+                for key, _ in arg:
+                    if key not in value:
+                        return path, node, value
+                if exact and len(value) != len(arg):
+                    return path, node, value
+                stack.append(iter_shape_children(arg, value, path))
+
+            else:
+                if not is_shape_sequence(value):
+                    return path, node, value
+                if kind is SHAPE_SEQUENCE:
+                    stack.append(iter_shape_elements(arg, value, path))
+                else:
+                    if len(value) != len(arg):
+                        return path, node, value
+                    stack.append(iter_shape_children(
+                        enumerate(arg), value, path))
+
+        return None
+
+    def _fingerprint_state(self):
+        return (fingerprint_of(self.template), self.exact)
+
+    def _is_immutable(self):
+        return is_immutable(self.template)
+
+    def __repr__(self):
+        return "<Shape %r%s>" % (self.template,
+                                 "" if self.exact else " (inexact)")
+
+
+#: Kinds of nodes in a compiled :class:`Shape` template
+SHAPE_LEAF = 'leaf'
+SHAPE_MAPPING = 'mapping'
+SHAPE_SEQUENCE = 'sequence'
+SHAPE_TUPLE = 'tuple'
+
+#: Sequence types that aren't matched by list & tuple templates
+SHAPE_STRING_TYPES = STRING_TYPES + (bytes,)
+
+
+def compile_shape(template):
+    """Compile a :class:`Shape` template into a tree of nodes.
+
+    Every node is a ``[kind, arg]`` pair, where the argument is:
+    the matcher (for leaves), a list of ``[key, child node]`` pairs
+    (for mappings), the node for all elements (for sequences),
+    or a list of nodes for consecutive elements (for tuples).
+    """
+    root = [None]
+    queue = [(template, root, 0)]  # (template, container, index) triples
+    while queue:
+        template, container, index = queue.pop()
+        if isinstance(template, dict):
+            children = [[key, None] for key in template]
+            node = [SHAPE_MAPPING, children]
+            queue.extend((template[key], pair, 1)
+                         for key, pair in zip(template, children))
+        elif isinstance(template, list):
+            if len(template) != 1:
+                raise TypeError(
+                    "list in a shape template must have exactly one element "
+                    "(a template for all elements), got %r" % (template,))
+            node = [SHAPE_SEQUENCE, None]
+            queue.append((template[0], node, 1))
+        elif isinstance(template, tuple):
+            children = [None] * len(template)
+            node = [SHAPE_TUPLE, children]
+            queue.extend((t, children, i) for i, t in enumerate(template))
+        elif isinstance(template, BaseMatcher):
+            node = [SHAPE_LEAF, template]
+        elif isinstance(template, type):
+            node = [SHAPE_LEAF, InstanceOf(template)]
+        else:
+            node = [SHAPE_LEAF, Eq(template)]
+        container[index] = node
+    return root[0]
+
+
+def iter_shape_children(children, value, path):
+    """Yield the (node, value, path) triples for children of a mapping
+    or tuple node of a :class:`Shape` template.
+
+    :param children: Iterable of (key or index, child node) pairs
+    """
+    for key, child in children:
+        yield child, value[key], (path, key)
+
+
+def iter_shape_elements(node, value, path):
+    """Yield the (node, value, path) triples for elements of a sequence
+    matched by a single node of a :class:`Shape` template.
+    """
+    for i, item in enumerate(value):
+        yield node, item, (path, i)
+
+
+def is_shape_sequence(value):
+    """Check if the value can be matched by a list or tuple node
+    of a :class:`Shape` template.
+    """
+    return isinstance(value, abc.Sequence) and \
+        not isinstance(value, SHAPE_STRING_TYPES)
+
+
+def describe_shape_mismatch(node, value):
+    """Describe why a value doesn't match a node of a :class:`Shape`
+    template, assuming that its children (if any) weren't checked yet.
+    """
+    kind, arg = node
+    if kind is SHAPE_LEAF:
+        return "expected %r, got %s" % (arg, describe_value(value))
+
+    if kind is SHAPE_MAPPING:
+        if not isinstance(value, abc.Mapping):
+            return "expected a mapping, got %s" % describe_value(value)
+        for key, _ in arg:
+            if key not in value:
+                return "missing key %r" % (key,)
+        keys = set(key for key, _ in arg)
+        return "unexpected keys %s" % ", ".join(
+            sorted(repr(key) for key in value if key not in keys))
+
+    if not is_shape_sequence(value):
+        return "expected a sequence, got %s" % describe_value(value)
+    return "expected %s elements, got %s" % (len(arg), len(value))
+
+
+def format_path(path):
+    """Format a path within a nested structure, given as a linked list
+    of ``(parent path, key)`` pairs, e.g. as ``['user']['tags'][2]``.
+    """
+    keys = []
+    while path is not None:
+        path, key = path
+        keys.append(key)
+    if not keys:
+        return "<root>"
+    return "".join("[%r]" % (key,) for key in reversed(keys))
+
+
+# Utility functions
+
+def element_type(matcher):
+    """Return the type that a matcher checks for, if that's all it does.
+
+    :return: Tuple of the type and whether it must be exact,
+             or ``None`` if the matcher isn't a plain type check
+    """
+    if type(matcher) is InstanceOf:
+        return matcher.type_, matcher.exact
+    return None
+
+
+def repr_elements(elements):
+    """Format the elements of a set condition, given as a pair
+    of a set of values and a tuple of matchers.
+    """
+    values, matchers = elements
+    return "[%s]" % ", ".join(sorted(map(repr, values)) +
+                              list(map(repr, matchers)))
+
+
+def maximum_matching(graph, right_size):
+    """Find the size of a maximum matching in a bipartite graph,
+    using the Hopcroft-Karp algorithm.
+
+    :param graph: List of the left vertices' neighbors,
+                  given as lists of right vertices
+                  (integers from ``0`` to ``right_size - 1``)
+    :param right_size: Number of the right vertices
+    :return: Number of edges in the maximum matching
+    """
+    left_size = len(graph)
+    match_left = [None] * left_size
+    match_right = [None] * right_size
+    size = 0
+
+    while True:
+        # breadth-first search from the unmatched left vertices,
+        # splitting the left vertices into layers of alternating paths
+        layer = [None] * left_size
+        queue = [u for u in range(left_size) if match_left[u] is None]
+        for u in queue:
+            layer[u] = 0
+        found_path = False
+        for u in queue:  # (the queue grows as it's being iterated over)
+            for v in graph[u]:
+                w = match_right[v]
+                if w is None:
+                    found_path = True
+                elif layer[w] is None:
+                    layer[w] = layer[u] + 1
+                    queue.append(w)
+        if not found_path:
+            return size
+
+        # depth-first search for vertex-disjoint augmenting paths
+        # along the layers, done iteratively to avoid recursion limits
+        next_edge = [0] * left_size
+        for root in range(left_size):
+            if match_left[root] is not None:
+                continue
+            path = [root]
+            while path:
+                u = path[-1]
+                if next_edge[u] == len(graph[u]):
+                    layer[u] = None  # dead end
+                    path.pop()
+                    continue
+                v = graph[u][next_edge[u]]
+                next_edge[u] += 1
+                w = match_right[v]
+                if w is None:
+                    # flip the edges along the path, where every left vertex
+                    # gets matched with the right one it was last trying
+                    for u in path:
+                        v = graph[u][next_edge[u] - 1]
+                        match_left[u] = v
+                        match_right[v] = u
+                        layer[u] = None  # the paths must be disjoint
+                    size += 1
+                    break
+                if layer[w] is not None and layer[w] == layer[u] + 1:
+                    path.append(w)
+
+
+def as_bytes(pattern):
+    """Convert a pattern of :class:`ContainsSequence` to :class:`bytes`,
+    if it consists only of bytes.
+
+    :return: Bytes, or ``None``
+    """
+    if isinstance(pattern, (bytes, bytearray)) and \
+            not isinstance(pattern, STRING_TYPES):
+        return bytes(pattern)
+    if all(type(elem) is int and 0 <= elem < 256 for elem in pattern):
+        return bytes(bytearray(pattern))
+    return None
+
+
+def is_byte_view(value):
+    """Check if a value is a contiguous :class:`memoryview` of bytes
+    (as opposed to e.g. a view of an array of integers).
+    """
+    return isinstance(value, memoryview) and value.format == 'B' \
+        and value.ndim == 1 and getattr(value, 'c_contiguous', False)
+
+
+def kmp_table(pattern):
+    """Compute the table of the Knuth-Morris-Pratt algorithm for a pattern.
+
+    :return: List where every element is the length of the longest proper
+             prefix of the pattern which is also a suffix of the pattern's
+             prefix ending at that position
+    """
+    table = [0] * len(pattern)
+    length = 0
+    for i in range(1, len(pattern)):
+        while length and not pattern[i] == pattern[length]:
+            length = table[length - 1]
+        if pattern[i] == pattern[length]:
+            length += 1
+        table[i] = length
+    return table
+
+
+def kmp_search(pattern, table, items):
+    """Check whether a (non-empty) pattern occurs among the items,
+    using the Knuth-Morris-Pratt algorithm.
+
+    :param table: Table of the pattern, as computed by :func:`kmp_table`
+    """
+    length = 0
+    for item in items:
+        while length and not pattern[length] == item:
+            length = table[length - 1]
+        if pattern[length] == item:
+            length += 1
+            if length == len(pattern):
+                return True
+    return False
+
+
+def pick(iterable, indices):
+    """Yield the elements of an iterable at given positions.
+
+    :param indices: Sorted iterable of positions.
+                    The iterable isn't advanced past the last of them.
+    """
+    iterator = iter(iterable)
+    position = 0
+    for index in indices:
+        yield next(islice(iterator, index - position, None))
+        position = index + 1
+
+
+def all_match(matcher, items):
+    """Check whether all the items match given matcher."""
+    return all(matcher == item for item in items)
+
+
+def all_pairs_match(keys, values, items):
+    """Check whether all the items of a mapping
+    match given matchers for keys & values.
+    """
+    return all(keys == k and values == v for k, v in items)
+
+
+def run_chunks(executor, func, matchers, chunks):
+    """Check chunks of items as separate tasks of an executor.
+
+    As soon as any chunk fails to match (or raises an exception),
+    the tasks for remaining chunks are cancelled.
+
+    :return: Whether all the chunks have matched
+    """
+    pending = set(executor.submit(func, *(matchers + (chunk,)))
+                  for chunk in chunks)
+    try:
+        while pending:
+            done, pending = futures.wait(
+                pending, return_when=futures.FIRST_COMPLETED)
+            for future in done:
+                if not future.result():
+                    return False
+        return True
+    finally:
+        for future in pending:
+            future.cancel()
+
+
+def is_picklable(obj):
+    """Check whether an object can be sent to another process."""
+    try:
+        pickle.dumps(obj)
+    except Exception:
+        return False
+    return True
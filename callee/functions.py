@@ -16,6 +16,8 @@ class FunctionMatcher(BaseMatcher):
     """Matches values of callable types.
     This class shouldn't be used directly.
     """
+    COST = 1
+
     def __repr__(self):
         return "<%s>" % (self.__class__.__name__,)
 
@@ -4,14 +4,18 @@ General matchers.
 These don't belong to any broader category, and include matchers for common
 Python objects, like functions or classes.
 """
+from __future__ import absolute_import
+
+from collections import namedtuple
 import inspect
+import weakref
 
-from callee._compat import IS_PY3, STRING_TYPES
-from callee.base import BaseMatcher
+from callee._compat import IS_PY3, OrderedDict, STRING_TYPES
+from callee.base import BaseMatcher, fingerprint_of
 
 
 __all__ = [
-    'Any', 'Matching', 'ArgThat', 'Captor',
+    'Any', 'Matching', 'ArgThat', 'Captor', 'Cached',
 ]
 
 
@@ -24,9 +28,14 @@ __all__ = [
 class Any(BaseMatcher):
     """Matches any object."""
 
+    COST = 0
+
     def match(self, value):
         return True
 
+    def _compile(self, compiler, arg):
+        return "True"
+
     def __repr__(self):
         return "<Any>"
 
@@ -81,6 +90,9 @@ class Matching(BaseMatcher):
         # TODO: translate exceptions from the predicate into our own
         # exception type to not clutter user-visible stracktraces with our code
 
+    def _compile(self, compiler, arg):
+        return "%s(%s)" % (compiler.bind(self.predicate), arg)
+
     def __repr__(self):
         """Return a representation of the matcher."""
         name = getattr(self.predicate, '__name__', None)
@@ -139,7 +151,7 @@ class Captor(BaseMatcher):
 
     .. versionadded:: 0.2
     """
-    __slots__ = ('matcher', 'value')
+    __slots__ = ('matcher', 'value', '__weakref__')
 
     def __init__(self, matcher=None):
         """
@@ -176,7 +188,142 @@ class Captor(BaseMatcher):
         self.value = value
         return True
 
+    def _fingerprint_state(self):
+        # captors are stateful, so each of them is unique
+        return id(self)
+
+    def _is_immutable(self):
+        return False
+
     def __repr__(self):
         """Return a representation of the captor."""
         return "<Captor %r%s>" % (self.matcher,
                                   " (*)" if self.has_value() else "")
+
+
+# Caching
+
+#: Statistics of a :class:`Cached` matcher,
+#: analogous to those of :func:`functools.lru_cache`.
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'maxsize', 'currsize'])
+
+
+class Cached(BaseMatcher):
+    """Remembers the results of another matcher for recently seen values.
+
+    This is useful for expensive matchers -- like :class:`Matching`
+    with a slow predicate, or a :class:`~callee.strings.Regex`
+    run over a long string -- when the same argument objects
+    are checked repeatedly, e.g. by many ``assert_called_with``
+    or ``assert_has_calls`` on the same mock.
+
+    Hashable values are looked up by their hash & equality (and type).
+    Unhashable ones are looked up by their identity: such entries are
+    invalidated when the value is garbage collected or, if it doesn't
+    support weak references, retain the value until they're evicted.
+
+    Note that the values are assumed not to change between the checks.
+    If the argument objects are mutated, the cached results would be stale.
+
+    Example::
+
+        mock_foo.assert_called_with(Cached(Matching(is_valid_document)))
+
+    .. versionadded:: 0.4
+    """
+    #: Default maximum number of cached results.
+    DEFAULT_MAXSIZE = 128
+
+    def __init__(self, matcher, maxsize=DEFAULT_MAXSIZE):
+        """
+        :param matcher: Matcher whose results should be cached
+        :param maxsize: Maximum number of cached results.
+                        When exceeded, the least recently used ones
+                        are evicted. Pass ``None`` for an unbounded cache.
+        """
+        if not isinstance(matcher, BaseMatcher):
+            raise TypeError("expected a matcher, got %r" % (type(matcher),))
+        if not (maxsize is None or
+                isinstance(maxsize, int) and maxsize > 0):
+            raise ValueError(
+                "maxsize must be None or a positive integer, got %r" % (
+                    maxsize,))
+
+        self.matcher = matcher
+        self.maxsize = maxsize
+        self.cache_clear()
+
+    def match(self, value):
+        try:
+            hash(value)
+        except TypeError:
+            key = (Cached, id(value))
+            is_hashable = False
+        else:
+            key = (type(value), value)
+            is_hashable = True
+
+        entry = self._cache.pop(key, None)
+        if entry is not None:
+            holder, result = entry
+            if is_hashable or self._resolve(holder) is value:
+                self._cache[key] = entry  # move to the end as most recent
+                self.hits += 1
+                return result
+
+        self.misses += 1
+        result = self.matcher.match(value)
+        holder = None if is_hashable else self._hold(key, value)
+        self._cache[key] = (holder, result)
+        if self.maxsize is not None and len(self._cache) > self.maxsize:
+            self._cache.popitem(last=False)
+        return result
+
+    def _hold(self, key, value):
+        """Return an object that keeps track of an unhashable value
+        identified by given key.
+        """
+        cache = self._cache
+
+        def invalidate(ref):
+            entry = cache.get(key)
+            if entry is not None and entry[0] is ref:
+                del cache[key]
+
+        try:
+            return weakref.ref(value, invalidate)
+        except TypeError:
+            # keep the value alive, so that its ID cannot be reused
+            # by some other object while it's still in the cache
+            return value
+
+    @staticmethod
+    def _resolve(holder):
+        """Return the value tracked by the result of :meth:`_hold`."""
+        return holder() if isinstance(holder, weakref.ref) else holder
+
+    def cache_info(self):
+        """Return statistics of the cache.
+        :return: :class:`CacheInfo` tuple
+        """
+        return CacheInfo(self.hits, self.misses,
+                         self.maxsize, len(self._cache))
+
+    def cache_clear(self):
+        """Clear the cache and its statistics."""
+        self._cache = OrderedDict()
+        self.hits = self.misses = 0
+
+    def _cost(self):
+        return self.matcher._cost()
+
+    def _fingerprint_state(self):
+        # cached results don't affect the outcome of matching,
+        # so equivalent caches may share a single instance
+        return (fingerprint_of(self.matcher), self.maxsize)
+
+    def _is_immutable(self):
+        return self.matcher._is_immutable()
+
+    def __repr__(self):
+        return "<Cached %r>" % (self.matcher,)
@@ -25,12 +25,17 @@ class NumericMatcher(BaseMatcher):
     #: Must be overridden in subclasses.
     CLASS = None
 
+    COST = 1
+
     def __init__(self):
         assert self.CLASS, "must specify number type to match"
 
     def match(self, value):
         return isinstance(value, self.CLASS)
 
+    def _compile(self, compiler, arg):
+        return "isinstance(%s, %s)" % (arg, compiler.bind(self.CLASS))
+
     def __repr__(self):
         return "<%s>" % (self.__class__.__name__,)
 
@@ -2,13 +2,18 @@
 Matchers for various common kinds of objects.
 """
 import inspect
+import mmap
+import os
+import stat
 import sys
 
-from callee._compat import asyncio, getargspec
-from callee.base import BaseMatcher
+from callee._compat import (
+    IS_PY3, OrderedDict, STRING_TYPES, asyncio, getargspec)
+from callee.base import \
+    BaseMatcher, describe_value, fingerprint_of, is_immutable
 
 
-__all__ = ['Bytes', 'Coroutine', 'FileLike']
+__all__ = ['Bytes', 'Coroutine', 'FileLike', 'FileContent']
 
 
 class ObjectMatcher(BaseMatcher):
@@ -29,9 +34,14 @@ class Bytes(ObjectMatcher):
     | On Python 2, :class:`bytes` class is identical to :class:`str` class.
     | On Python 3, byte strings are separate class, distinct from :class:`str`.
     """
+    COST = 1
+
     def match(self, value):
         return isinstance(value, bytes)
 
+    def _compile(self, compiler, arg):
+        return "isinstance(%s, bytes)" % (arg,)
+
 
 class Coroutine(ObjectMatcher):
     """Matches an asynchronous coroutine.
@@ -110,8 +120,239 @@ class FileLike(ObjectMatcher):
         return "<FileLike %s>" % "(%s)" % ",".join(requirements)
 
 
+class FileContent(BaseMatcher):
+    """Matches a file whose size and/or contents match given criteria.
+
+    Example::
+
+        FileContent(StartsWith(b'%PDF-'), size=Less(10 * 1024 * 1024))
+
+    The file can be given as a path, a file descriptor,
+    or a file object (which is flushed first, if possible).
+    In-memory binary files (:class:`io.BytesIO`) are also supported.
+
+    Rather than being read into memory, the file is mapped with :mod:`mmap`,
+    and the content matcher receives a :class:`memoryview` of its bytes.
+    Use matchers that accept such buffers without copying them, like
+    :class:`~callee.strings.StartsWith`, :class:`~callee.strings.EndsWith`,
+    :class:`~callee.strings.Regex` (with a pattern given as bytes),
+    or :class:`~callee.collections.ContainsSequence`.
+    The view is only valid while the matcher runs, and the position
+    of file objects is not changed. Files have to be opened for reading.
+
+    Results are cached by the file's device, inode, modification time,
+    and size, so checking the same unchanged file again doesn't map it again.
+    If a file may be rewritten (with the same size) quicker than
+    the resolution of its modification time, call :meth:`cache_clear`.
+
+    .. versionadded:: 0.4
+    """
+    #: Default maximum number of cached results.
+    DEFAULT_MAXSIZE = 128
+
+    def __init__(self, content=None, size=None, maxsize=DEFAULT_MAXSIZE):
+        """
+        :param content: Matcher for the contents of the file,
+                        or the exact contents as bytes
+        :param size: Matcher for the size of the file (in bytes),
+                     or the exact size
+        :param maxsize: Maximum number of cached results.
+                        Pass ``None`` for an unbounded cache.
+        """
+        if content is None and size is None:
+            raise ValueError("FileContent() requires content= or size=")
+        if not (content is None or
+                isinstance(content, (BaseMatcher, bytes, bytearray))):
+            raise TypeError(
+                "content must be a matcher or bytes, got %r" % (
+                    type(content),))
+        if not (size is None or isinstance(size, BaseMatcher) or
+                is_integer(size) and size >= 0):
+            raise TypeError(
+                "size must be a matcher or a non-negative integer, got %r" % (
+                    size,))
+        if not (maxsize is None or is_integer(maxsize) and maxsize > 0):
+            raise ValueError(
+                "maxsize must be None or a positive integer, got %r" % (
+                    maxsize,))
+
+        self.content = content
+        self.size = size
+        self.maxsize = maxsize
+        self.cache_clear()
+
+    def match(self, value):
+        return self._check(value) is None
+
+    def _describe_mismatch(self, value):
+        return self._check(value)
+
+    def _check(self, value):
+        """Check a file against the expected size & contents.
+        :return: ``None`` if it matches, or a description of the mismatch
+        """
+        if hasattr(value, 'getbuffer'):  # io.BytesIO
+            buf = value.getbuffer()
+            try:
+                return self._check_buffer(buf, len(buf))
+            finally:
+                if IS_PY3:
+                    buf.release()  # so that the BytesIO can be resized
+
+        try:
+            fd, path = file_descriptor(value)
+        except TypeError:
+            return "expected a file, got %s" % describe_value(value)
+
+        try:
+            info = os.fstat(fd) if path is None else os.stat(path)
+        except (OSError, IOError, ValueError) as e:
+            return "cannot read %s: %s" % (describe_value(value), e)
+        if not stat.S_ISREG(info.st_mode):
+            return "%s is not a regular file" % describe_value(value)
+
+        key = (info.st_dev, info.st_ino,
+               getattr(info, 'st_mtime_ns', info.st_mtime), info.st_size)
+        try:
+            result = self._cache.pop(key)
+        except KeyError:
+            size = info.st_size
+            result = self._check_file_size(size)
+            if result is None and self.content is not None and size > 0:
+                # failures to read the file are mismatches (which aren't
+                # cached), but errors of the content matcher are propagated
+                try:
+                    mapped = map_file(fd, path)
+                except (OSError, IOError, ValueError) as e:
+                    return "cannot read %s: %s" % (describe_value(value), e)
+                result = self._check_mapped(mapped, size)
+        self._cache[key] = result  # moved to the end as most recent
+        if self.maxsize is not None and len(self._cache) > self.maxsize:
+            self._cache.popitem(last=False)
+        return result
+
+    def _check_file_size(self, size):
+        """Check the size of a file that's been ``stat()``-ed,
+        and its contents if they can be told apart by the size alone.
+        """
+        mismatch = self._check_size(size)
+        if mismatch is not None or self.content is None:
+            return mismatch
+        if isinstance(self.content, (bytes, bytearray)) \
+                and len(self.content) != size:
+            return "content differs in size: expected %s bytes, got %s" % (
+                len(self.content), size)
+        if size == 0:
+            return self._check_buffer(b'', 0)  # empty files can't be mapped
+        return None
+
+    def _check_mapped(self, mapped, size):
+        """Check the contents of a file mapped with :func:`map_file`,
+        unmapping it afterwards.
+        """
+        # on Python 2, mmap objects don't support the string methods
+        # (and comparisons), so the content has to be copied
+        view = memoryview(mapped) if IS_PY3 else mapped[:]
+        try:
+            return self._check_buffer(view, size)
+        finally:
+            if IS_PY3:
+                view.release()
+            try:
+                mapped.close()
+            except BufferError:
+                # the content matcher has kept a view of the file,
+                # so it will be unmapped once that view is gone
+                pass
+
+    def _check_size(self, size):
+        if self.size is None or self.size == size:
+            return None
+        return "size: expected %r, got %s" % (self.size, size)
+
+    def _check_buffer(self, buf, size):
+        mismatch = self._check_size(size)
+        if mismatch is not None:
+            return mismatch
+        if self.content is None or self.content == buf:
+            return None
+        if isinstance(self.content, BaseMatcher):
+            return "content doesn't match %r" % (self.content,)
+        return "content differs from %s" % describe_value(self.content)
+
+    def cache_clear(self):
+        """Forget the results for all the files checked so far."""
+        self._cache = OrderedDict()
+
+    def _fingerprint_state(self):
+        return (fingerprint_of(self.content), fingerprint_of(self.size),
+                self.maxsize)
+
+    def _is_immutable(self):
+        return is_immutable(self.content) and is_immutable(self.size)
+
+    def __repr__(self):
+        args = []
+        if self.content is not None:
+            args.append(describe_value(self.content)
+                        if isinstance(self.content, (bytes, bytearray))
+                        else repr(self.content))
+        if self.size is not None:
+            args.append("size=%r" % (self.size,))
+        return "<FileContent %s>" % " ".join(args)
+
+
 # Utility functions
 
+def is_integer(value):
+    """Check if the value is an integer (but not a boolean)."""
+    return isinstance(value, int if IS_PY3 else (int, long)) \
+        and not isinstance(value, bool)  # noqa
+
+
+def map_file(fd, path):
+    """Map a file, given as a descriptor or a path, into memory.
+
+    :return: :class:`mmap.mmap` object for reading the file
+    :raise OSError: If the file cannot be opened or mapped
+    """
+    if path is not None:
+        fd = os.open(path, os.O_RDONLY | getattr(os, 'O_BINARY', 0))
+    try:
+        return mmap.mmap(fd, 0, access=mmap.ACCESS_READ)
+    finally:
+        if path is not None:
+            os.close(fd)  # the mapping remains valid
+
+
+def file_descriptor(value):
+    """Get the file descriptor, or the path, of a file argument.
+
+    :return: Tuple of the descriptor and ``None``,
+             or of ``None`` and the path
+    :raise TypeError: If the value isn't a path, a file descriptor,
+                      or a file object with a descriptor
+    """
+    if is_integer(value):
+        return value, None
+    if isinstance(value, STRING_TYPES + (bytes,)):
+        return None, value
+    fspath = getattr(value, '__fspath__', None)  # e.g. pathlib.Path
+    if fspath is not None:
+        return None, fspath()
+
+    fileno = getattr(value, 'fileno', None)
+    if fileno is None:
+        raise TypeError("not a file: %r" % (value,))
+    flush = getattr(value, 'flush', None)
+    if flush is not None and not getattr(value, 'closed', False):
+        flush()  # so that the buffered writes are seen
+    try:
+        return fileno(), None
+    except (IOError, OSError, ValueError):  # e.g. a closed file
+        raise TypeError("not a file with a descriptor: %r" % (value,))
+
+
 def is_method(arg, min_arity=None, max_arity=None):
     """Check if argument is a method.
 
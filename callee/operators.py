@@ -6,6 +6,7 @@ from __future__ import absolute_import
 from numbers import Number
 import operator
 
+from callee._compat import STRING_TYPES, numpy_for
 from callee.base import BaseMatcher, Eq, Is, IsNot
 
 
@@ -25,6 +26,20 @@ __all__ = [
 ]
 
 
+#: Mapping from operator functions to their symbols in Python.
+#:
+#: There is no point in including ``operator.contains`` due to lack of
+#: equivalent ``operator.in_``.
+#: These are handled by membership matchers directly.
+OPERATOR_SYMBOLS = {
+    operator.eq: '==',
+    operator.ge: '>=',
+    operator.gt: '>',
+    operator.le: '<=',
+    operator.lt: '<',
+}
+
+
 class OperatorMatcher(BaseMatcher):
     """Matches values based on comparison operator and a reference object.
     This class shouldn't be used directly.
@@ -36,6 +51,9 @@ class OperatorMatcher(BaseMatcher):
     #: Transformation function to apply to given value before comparison.
     TRANSFORM = None
 
+    #: Possible values of the ``elementwise=`` argument.
+    ELEMENTWISE_MODES = ('all', 'any')
+
     def __init__(self, *args, **kwargs):
         """Accepts a single argument: the reference object to compare against.
 
@@ -44,9 +62,25 @@ class OperatorMatcher(BaseMatcher):
         for example::
 
             some_mock.assert_called_with(Number() & LessOrEqual(to=42))
+
+        Additionally, an ``elementwise=`` keyword argument may be passed
+        to make the matcher compare every element of a NumPy array value,
+        rather than the array as a whole::
+
+            some_mock.assert_called_with(Less(10, elementwise='all'))
+
+        With ``'all'``, every element has to satisfy the comparison,
+        while ``'any'`` requires just one element to do so.
+        Values that aren't arrays are compared as usual.
         """
         assert self.OP, "must specify comparison operator to use"
 
+        elementwise = kwargs.pop('elementwise', None)
+        if not (elementwise is None or
+                elementwise in self.ELEMENTWISE_MODES):
+            raise ValueError("invalid elementwise= argument: %r" % (
+                elementwise,))
+
         # check that we've received exactly one argument,
         # either positional or keyword
         argcount = len(args) + len(kwargs)
@@ -68,8 +102,18 @@ class OperatorMatcher(BaseMatcher):
 
         #: Reference object to compare given values to.
         self.ref = ref
+        #: How to reduce results of elementwise comparison (if at all).
+        self.elementwise = elementwise
 
     def match(self, value):
+        if self.elementwise is not None:
+            # NumPy is only needed if it's been already imported,
+            # for otherwise we cannot have received an array
+            numpy = numpy_for(value)
+            if numpy is not None:
+                results = self._match_array(value, numpy)
+                return bool(getattr(results, self.elementwise)())
+
         # Note that any possible exceptions from either ``TRANSFORM`` or ``OP``
         # are intentionally let through, to make it easier to diagnose errors
         # than a plain "no match" response would.
@@ -77,24 +121,41 @@ class OperatorMatcher(BaseMatcher):
             value = self.TRANSFORM(value)
         return self.OP(value, self.ref)
 
+    def _match_many(self, values):
+        if self.elementwise is not None:
+            return super(OperatorMatcher, self)._match_many(values)
+
+        op, ref, transform = self.OP, self.ref, self.TRANSFORM
+        if transform is None:
+            return [bool(op(value, ref)) for value in values]
+        return [bool(op(transform(value), ref)) for value in values]
+
+    def _match_array(self, array, numpy):
+        # comparison operators are vectorized by NumPy itself
+        if self.TRANSFORM is None and self.OP in OPERATOR_SYMBOLS:
+            result = numpy.asarray(self.OP(array, self.ref))
+            if result.shape == array.shape:
+                return result.astype(bool)
+        return super(OperatorMatcher, self)._match_array(array, numpy)
+
+    def _compile(self, compiler, arg):
+        if self.elementwise is not None:
+            return super(OperatorMatcher, self)._compile(compiler, arg)
+
+        if self.TRANSFORM is not None:
+            arg = "%s(%s)" % (compiler.bind(self.TRANSFORM), arg)
+        ref = compiler.bind(self.ref)
+
+        op = OPERATOR_SYMBOLS.get(self.OP)
+        if op is None:
+            return "%s(%s, %s)" % (compiler.bind(self.OP), arg, ref)
+        return "(%s %s %s)" % (arg, op, ref)
+
     def __repr__(self):
         """Provide an universal representation of the matcher."""
-        # Mapping from operator functions to their symbols in Python.
-        #
-        # There is no point in including ``operator.contains`` due to lack of
-        # equivalent ``operator.in_``.
-        # These are handled by membership matchers directly.
-        operator_symbols = {
-            operator.eq: '==',
-            operator.ge: '>=',
-            operator.gt: '>',
-            operator.le: '<=',
-            operator.lt: '<',
-        }
-
         # try to get the symbol for the operator, falling back to Haskell-esque
         # "infix function" representation
-        op = operator_symbols.get(self.OP)
+        op = OPERATOR_SYMBOLS.get(self.OP)
         if op is None:
             # TODO: convert CamelCase to either snake_case or kebab-case
             op = '`%s`' % (self.__class__.__name__.lower(),)
@@ -106,6 +167,8 @@ class OperatorMatcher(BaseMatcher):
         placeholder = '...'
         if self.TRANSFORM is not None:
             placeholder = '%s(%s)' % (self.TRANSFORM.__name__, placeholder)
+        if self.elementwise is not None:
+            placeholder = '%s(%s)' % (self.elementwise, placeholder)
         return placeholder
 
 
@@ -174,6 +237,10 @@ class LengthMatcher(OperatorMatcher):
         if not isinstance(self.ref, Number):
             self.ref = len(self.ref)
 
+        if self.elementwise is not None:
+            raise TypeError("%s doesn't accept the elementwise= argument" % (
+                self.__class__.__name__,))
+
 
 class Shorter(LengthMatcher):
     """Matches values that are shorter (as per ``<`` comparison on ``len``)
@@ -216,19 +283,71 @@ LongerOrEqualTo = LongerOrEqual
 class Contains(OperatorMatcher):
     """Matches values that contain (as per the ``in`` operator)
     given reference object.
+
+    If ``elementwise=`` argument is passed, the reference object is treated
+    as a collection of items. The value then has to contain either all
+    (``'all'``) or any (``'any'``) of those items.
+    For NumPy arrays, this is checked in a single vectorized operation.
     """
     OP = operator.contains
 
+    def match(self, value):
+        if self.elementwise is None:
+            return super(Contains, self).match(value)
+
+        items = self.ref
+        if isinstance(items, STRING_TYPES + (bytes,)) or \
+                not hasattr(items, '__iter__'):
+            items = [items]
+
+        numpy = numpy_for(value)
+        if numpy is not None:
+            found = numpy.isin(list(items), value)
+            return bool(getattr(found, self.elementwise)())
+
+        reduce_ = all if self.elementwise == 'all' else any
+        return reduce_(item in value for item in items)
+
+    def _compile(self, compiler, arg):
+        if self.elementwise is not None:
+            return super(Contains, self)._compile(compiler, arg)
+        if self.TRANSFORM is not None:
+            arg = "%s(%s)" % (compiler.bind(self.TRANSFORM), arg)
+        return "(%s in %s)" % (compiler.bind(self.ref), arg)
+
     def __repr__(self):
+        if self.elementwise is not None:
+            # the placeholder can't represent elementwise mode here,
+            # since it applies to the reference object rather than the value
+            return "<%s of %r in ...>" % (self.elementwise, self.ref)
         return "<%r in %s>" % (self.ref, self._get_placeholder_repr())
 
 
 class In(OperatorMatcher):
     """Matches values that are within the reference object
     (as per the ``in`` operator).
+
+    If ``elementwise=`` argument is passed, NumPy array values match
+    when all (``'all'``) or any (``'any'``) of their elements are within
+    the reference object.
     """
     # There is no ``operator.in_``, so we must define the function ourselves.
     OP = staticmethod(lambda value, ref: value in ref)
 
+    def _match_array(self, array, numpy):
+        # ``in`` means a substring check for string references,
+        # which doesn't correspond to element membership
+        if array.dtype.kind != 'O' and \
+                not isinstance(self.ref, STRING_TYPES + (bytes,)):
+            return numpy.isin(array, list(self.ref))
+        return super(In, self)._match_array(array, numpy)
+
+    def _compile(self, compiler, arg):
+        if self.elementwise is not None:
+            return super(In, self)._compile(compiler, arg)
+        if self.TRANSFORM is not None:
+            arg = "%s(%s)" % (compiler.bind(self.TRANSFORM), arg)
+        return "(%s in %s)" % (arg, compiler.bind(self.ref))
+
     def __repr__(self):
         return "<%s in %r>" % (self._get_placeholder_repr(), self.ref)
@@ -0,0 +1,347 @@
+"""
+Profiling of matchers.
+"""
+import functools
+import inspect
+import json
+import marshal
+import threading
+from timeit import default_timer
+
+from callee.base import BaseMatcher
+
+
+__all__ = ['instrument']
+
+
+def instrument():
+    """Collect statistics about matchers used within a ``with`` block.
+
+    Example::
+
+        with callee.instrument() as profile:
+            mock_foo.assert_called_with(...)
+
+        print(profile.as_dict())
+
+    While the block is executing, calls to the :meth:`match` method
+    (and thus also comparisons through ``==``) of all matcher classes
+    are measured. Outside of it, matchers run their original,
+    uninstrumented code, so that profiling costs nothing when disabled.
+
+    Note that only classes already defined when the block is entered
+    are instrumented, and compiled matchers (see
+    :meth:`~callee.base.BaseMatcher.compile`) are only measured
+    to the extent they are calling :meth:`match` methods.
+
+    :return: :class:`Profile` context manager
+
+    .. versionadded:: 0.4
+    """
+    return Profile()
+
+
+class Profile(object):
+    """Statistics about matchers collected during a profiling session.
+
+    This class shouldn't be used directly.
+    Call :func:`instrument` instead.
+    """
+    #: Profile that is currently collecting statistics, if any
+    _active = None
+
+    def __init__(self):
+        #: Statistics for matcher classes, keyed by the class
+        self.classes = {}
+        #: Statistics for matcher instances, keyed by their ``id()``.
+        #: Values are ``(matcher, stats)`` pairs.
+        self.instances = {}
+
+        self._patched = []
+        self._thread = ThreadState()
+        #: Guards the statistics, which matchers may update
+        #: from multiple threads (e.g. ``List(parallel=...)``)
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def start(self):
+        """Start collecting statistics.
+        :raise RuntimeError: If some other profile is already active
+        """
+        if Profile._active is not None:
+            raise RuntimeError("another matcher profile is already active")
+        Profile._active = self
+
+        for class_ in list_matcher_classes():
+            func = class_.__dict__.get('match')
+            if inspect.isfunction(func):
+                self._patched.append((class_, func))
+                setattr(class_, 'match', self._instrument(func))
+
+    def stop(self):
+        """Stop collecting statistics, restoring the original matchers."""
+        if Profile._active is not self:
+            return
+        for class_, func in reversed(self._patched):
+            setattr(class_, 'match', func)
+        self._patched = []
+        Profile._active = None
+
+    def _instrument(self, func):
+        """Wrap a matcher's :meth:`match` method so that it's measured."""
+        profile = self
+
+        @functools.wraps(func)
+        def match(matcher, value):
+            # bound methods of the wrapper may survive after the profiling,
+            # e.g. as part of compiled matchers, and those must not record
+            if Profile._active is not profile:
+                return func(matcher, value)
+
+            # calls through super() are counted as a part of the outer call
+            stack = profile._thread.stack
+            if stack and stack[-1].matcher is matcher:
+                return func(matcher, value)
+
+            profile._enter(matcher, func)
+            try:
+                result = func(matcher, value)
+            except BaseException:
+                profile._exit(None, error=True)
+                raise
+            profile._exit(result)
+            return result
+
+        return match
+
+    def _enter(self, matcher, func):
+        class_ = matcher.__class__
+        with self._lock:
+            if class_ not in self.classes:
+                self.classes[class_] = MatcherStats(
+                    code_location(class_, func))
+            if id(matcher) not in self.instances:
+                self.instances[id(matcher)] = (matcher, MatcherStats())
+
+        thread = self._thread
+        nesting = thread.active_classes.get(class_, 0)
+        thread.active_classes[class_] = nesting + 1
+        thread.stack.append(Frame(matcher, is_primitive=nesting == 0))
+
+    def _exit(self, result, error=False):
+        stack = self._thread.stack
+        frame = stack.pop()
+        elapsed = default_timer() - frame.start
+        own_time = elapsed - frame.child_time
+
+        class_ = frame.matcher.__class__
+        self._thread.active_classes[class_] -= 1
+
+        caller = stack[-1].matcher.__class__ if stack else None
+        if stack:
+            stack[-1].child_time += elapsed
+
+        with self._lock:
+            stats = (self.classes[class_],
+                     self.instances[id(frame.matcher)][1])
+            for s in stats:
+                s.record(result, error, elapsed, own_time, frame.is_primitive)
+            if caller is not None:
+                stats[0].record_caller(
+                    caller, elapsed, own_time, frame.is_primitive)
+
+    # Exporting
+
+    def as_dict(self):
+        """Return the statistics as a dictionary.
+
+        It has two keys: ``'classes'``, with statistics of matcher classes
+        keyed by their qualified names, and ``'instances'``, with statistics
+        of individual matchers keyed by their ``repr()``.
+        Matchers with identical representations are counted together.
+
+        Each of the statistics is a dictionary with the following keys:
+
+            * ``calls``: number of :meth:`match` calls
+            * ``matches``: how many times the matcher has matched
+            * ``mismatches``: how many times the matcher has failed to match
+            * ``errors``: number of exceptions raised
+            * ``total_time``: total time of the calls (in seconds),
+              including the time spent in any nested matchers
+            * ``own_time``: like ``total_time``, but excluding
+              the nested matchers
+            * ``max_time``: time taken by the longest call
+        """
+        instances = {}
+        for matcher, stats in self.instances.values():
+            key = repr(matcher)
+            if key in instances:
+                instances[key] = instances[key].merge(stats)
+            else:
+                instances[key] = stats
+
+        return {
+            'classes': dict(
+                ('%s.%s' % (class_.__module__, class_.__name__),
+                 stats.as_dict()) for class_, stats in self.classes.items()),
+            'instances': dict((key, stats.as_dict())
+                              for key, stats in instances.items()),
+        }
+
+    def dump_json(self, filename):
+        """Write the statistics to a JSON file.
+        See :meth:`as_dict` for the format.
+        """
+        with open(filename, 'w') as f:
+            json.dump(self.as_dict(), f, indent=2, sort_keys=True)
+
+    def dump_stats(self, filename):
+        """Write the statistics of matcher classes to a file
+        that can be read using :class:`pstats.Stats`.
+
+        This is analogous to :meth:`cProfile.Profile.dump_stats`,
+        except that every matcher class appears as a separate function.
+        """
+        with open(filename, 'wb') as f:
+            marshal.dump(self.pstats(), f)
+
+    def pstats(self):
+        """Return the statistics of matcher classes
+        in the internal format of :class:`pstats.Stats`.
+        """
+        result = {}
+        for class_, stats in self.classes.items():
+            callers = dict(
+                (self.classes[caller].code, tuple(caller_stats))
+                for caller, caller_stats in stats.callers.items())
+            result[stats.code] = (stats.primitive_calls, stats.calls,
+                                  stats.own_time, stats.total_time, callers)
+        return result
+
+    def __repr__(self):
+        return "<Profile (%s matcher classes)>" % (len(self.classes),)
+
+
+class MatcherStats(object):
+    """Statistics of a matcher class, or a single matcher.
+
+    This class shouldn't be used directly.
+    """
+    def __init__(self, code=None):
+        #: Location of the :meth:`match` method,
+        #: as ``(filename, line number, name)``
+        self.code = code
+
+        self.calls = 0
+        self.primitive_calls = 0
+        self.matches = 0
+        self.mismatches = 0
+        self.errors = 0
+        self.total_time = 0.0
+        self.own_time = 0.0
+        self.max_time = 0.0
+
+        #: Statistics of calls by other matcher classes, as mutable
+        #: [primitive calls, calls, own time, total time] lists
+        self.callers = {}
+
+    def record(self, result, error, elapsed, own_time, is_primitive):
+        self.calls += 1
+        if error:
+            self.errors += 1
+        elif result:
+            self.matches += 1
+        else:
+            self.mismatches += 1
+
+        # like in cProfile, the total time of recursive calls
+        # is only counted once, for the outermost call
+        if is_primitive:
+            self.primitive_calls += 1
+            self.total_time += elapsed
+        self.own_time += own_time
+        self.max_time = max(self.max_time, elapsed)
+
+    def record_caller(self, caller, elapsed, own_time, is_primitive):
+        stats = self.callers.setdefault(caller, [0, 0, 0.0, 0.0])
+        stats[1] += 1
+        stats[2] += own_time
+        if is_primitive:
+            stats[0] += 1
+            stats[3] += elapsed
+
+    def merge(self, other):
+        """Return the combined statistics of this and another object."""
+        result = MatcherStats(self.code)
+        for name in ('calls', 'primitive_calls', 'matches', 'mismatches',
+                     'errors', 'total_time', 'own_time'):
+            setattr(result, name, getattr(self, name) + getattr(other, name))
+        result.max_time = max(self.max_time, other.max_time)
+        return result
+
+    def as_dict(self):
+        return dict(calls=self.calls,
+                    matches=self.matches,
+                    mismatches=self.mismatches,
+                    errors=self.errors,
+                    total_time=self.total_time,
+                    own_time=self.own_time,
+                    max_time=self.max_time)
+
+
+class ThreadState(threading.local):
+    """Part of a profiling session that's specific to a single thread.
+    This class shouldn't be used directly.
+    """
+    def __init__(self):
+        #: :class:`Frame`\ s of the :meth:`match` calls in progress
+        self.stack = []
+        #: Numbers of the calls in progress, keyed by matcher class
+        self.active_classes = {}
+
+
+class Frame(object):
+    """A :meth:`match` call in progress.
+    This class shouldn't be used directly.
+    """
+    __slots__ = ('matcher', 'is_primitive', 'start', 'child_time')
+
+    def __init__(self, matcher, is_primitive):
+        self.matcher = matcher
+        self.is_primitive = is_primitive
+        self.child_time = 0.0
+        self.start = default_timer()
+
+
+# Utility functions
+
+def list_matcher_classes():
+    """Return all the classes of matchers defined so far,
+    including :class:`~callee.base.BaseMatcher` itself.
+    """
+    result = []
+    queue = [BaseMatcher]
+    seen = set(queue)
+    while queue:
+        class_ = queue.pop()
+        result.append(class_)
+        for subclass in type.__subclasses__(class_):
+            if subclass not in seen:
+                seen.add(subclass)
+                queue.append(subclass)
+    return result
+
+
+def code_location(class_, func):
+    """Return a :mod:`pstats`-compatible location of matcher's method."""
+    code = getattr(func, '__code__', None)
+    if code is None:
+        return ('~', 0, '%s.match' % class_.__name__)
+    return (code.co_filename, code.co_firstlineno,
+            '%s.match' % class_.__name__)
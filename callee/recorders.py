@@ -0,0 +1,331 @@
+"""
+Recorders of function calls.
+"""
+from __future__ import absolute_import
+
+try:
+    from collections.abc import Iterator
+except ImportError:
+    from collections import Iterator
+from types import GeneratorType
+
+from callee._compat import IS_PY3
+from callee.base import And, BaseMatcher, Eq, Is, Or
+from callee.collections import TeeProxy
+from callee.numbers import NumericMatcher
+from callee.operators import In
+from callee.strings import StringTypeMatcher
+from callee.types import InstanceOf
+
+
+__all__ = ['CallRecorder']
+
+
+class CallRecorder(object):
+    """Callable that records its calls, indexing them for fast searches.
+
+    A mock keeps its calls in a plain list, so ``assert_any_call``
+    has to compare every one of them against the expected call.
+    With many recorded calls and matchers in the expected call,
+    this can get very slow.
+
+    :class:`CallRecorder` also indexes the arguments of every call
+    by their position (or keyword), their value, and their type.
+    When looking for a call, the index is consulted first to find
+    the plausible candidates, and only those are then compared
+    with the expected arguments.
+
+    The index is used with the following kinds of expected arguments:
+
+        * plain, hashable values, as well as :class:`~callee.base.Eq`
+          and :class:`~callee.base.Is` matchers
+        * :class:`~callee.operators.In` matchers with hashable items
+        * type matchers: :class:`~callee.types.InstanceOf`, as well as
+          :class:`~callee.numbers.Integer`, :class:`~callee.strings.String`,
+          and other matchers for numbers & strings
+        * :class:`~callee.base.And` and :class:`~callee.base.Or` of the above
+
+    Other matchers are fully supported, but don't narrow down the search.
+
+    With ``tee_iterators=True``, arguments that are one-off iterators
+    (like generators) are replaced with proxies that remember their first
+    elements. The code under test still sees all the elements,
+    while matchers like :class:`~callee.collections.Iterable`\ ``(of=...)``
+    can check them afterwards.
+
+    Example::
+
+        recorder = CallRecorder()
+        mock_foo = mock.Mock(wraps=recorder)
+
+        # ... call mock_foo a lot ...
+
+        recorder.assert_any_call(InstanceOf(Request), timeout=Float())
+
+    .. versionadded:: 0.4
+    """
+    def __init__(self, wrapped=None, tee_iterators=False,
+                 max_items=TeeProxy.DEFAULT_MAX_ITEMS):
+        """
+        :param wrapped: Optional function that will be called
+                        (and have its result returned) on every recorded call
+        :param tee_iterators: Whether iterator arguments should be
+                              passed through proxies remembering
+                              their elements
+        :param max_items: Maximum number of elements of every iterator
+                          argument to remember (with ``tee_iterators``)
+        """
+        if not (wrapped is None or callable(wrapped)):
+            raise TypeError("expected a callable, got %r" % (wrapped,))
+        if not (isinstance(max_items, int) and max_items > 0):
+            raise ValueError(
+                "max_items must be a positive integer, got %r" % (max_items,))
+
+        self.wrapped = wrapped
+        self.tee_iterators = tee_iterators
+        self.max_items = max_items
+        self.reset()
+
+    def reset(self):
+        """Forget all the calls recorded so far."""
+        self._calls = []
+        self._signatures = {}
+        self._positional = []
+        self._keyword = {}
+
+    def __call__(self, *args, **kwargs):
+        if self.tee_iterators:
+            args = tuple(map(self._tee, args))
+            kwargs = dict((name, self._tee(arg))
+                          for name, arg in kwargs.items())
+        self._record(args, kwargs)
+        if self.wrapped is not None:
+            return self.wrapped(*args, **kwargs)
+
+    def _tee(self, arg):
+        """Wrap an argument in :class:`TeeProxy` if it's a one-off iterator.
+
+        Only generators and plain iterators are wrapped. Iterators with
+        an API of their own (like file objects, with ``read()``
+        that would bypass the proxy) are passed through unchanged.
+        """
+        if isinstance(arg, GeneratorType) or is_plain_iterator(arg):
+            return TeeProxy(arg, self.max_items)
+        return arg
+
+    def _record(self, args, kwargs):
+        """Add a call to the history and the index."""
+        call_index = len(self._calls)
+        self._calls.append((args, kwargs))
+
+        signature = (len(args), frozenset(kwargs))
+        self._signatures.setdefault(signature, set()).add(call_index)
+
+        for i, arg in enumerate(args):
+            if i == len(self._positional):
+                self._positional.append(ArgumentIndex())
+            self._positional[i].add(arg, call_index)
+        for name, arg in kwargs.items():
+            if name not in self._keyword:
+                self._keyword[name] = ArgumentIndex()
+            self._keyword[name].add(arg, call_index)
+
+    @property
+    def calls(self):
+        """List of recorded calls, as ``(args, kwargs)`` tuples."""
+        return list(self._calls)
+
+    @property
+    def call_count(self):
+        """Number of recorded calls."""
+        return len(self._calls)
+
+    def find_calls(self, *args, **kwargs):
+        """Find the recorded calls matching given arguments.
+
+        Arguments can be either values or matchers,
+        just like in ``assert_called_with`` of a mock.
+
+        :return: List of matching calls, as ``(args, kwargs)`` tuples
+        """
+        return [self._calls[i] for i in self._find(args, kwargs)]
+
+    def assert_any_call(self, *args, **kwargs):
+        """Assert that at least one of the recorded calls
+        matches given arguments.
+
+        :raise AssertionError: If no such call has been recorded
+        """
+        for _ in self._find(args, kwargs):
+            return
+        raise AssertionError("%s call not found" % (
+            format_call(args, kwargs),))
+
+    def _find(self, args, kwargs):
+        """Find indices of recorded calls that match given arguments.
+        :return: Iterable of call indices, in the order of calls
+        """
+        candidates = self._signatures.get((len(args), frozenset(kwargs)))
+        if not candidates:
+            return
+
+        slots = [(self._positional[i], arg) for i, arg in enumerate(args)]
+        slots.extend((self._keyword[name], arg)
+                     for name, arg in kwargs.items())
+        for index, arg in slots:
+            narrowed = index.lookup(arg)
+            if narrowed is not None:
+                candidates = candidates & narrowed
+                if not candidates:
+                    return
+
+        # note that the expected arguments are on the left side
+        # of the comparison, so that matchers are given priority
+        # over the arguments' own __eq__
+        for i in sorted(candidates):
+            call_args, call_kwargs = self._calls[i]
+            if args == call_args and kwargs == call_kwargs:
+                yield i
+
+    def __repr__(self):
+        return "<CallRecorder (%s calls)>" % (len(self._calls),)
+
+
+class ArgumentIndex(object):
+    """Index of values passed as a particular argument
+    (either positional or keyword) to a :class:`CallRecorder`.
+
+    This class shouldn't be used directly.
+    """
+    #: Types of values that can be looked up by their hash.
+    #:
+    #: Those are the types whose equality is known to be consistent with
+    #: their hashes. Arbitrary objects may define ``__eq__`` that doesn't
+    #: honor that (with ``mock.ANY`` being the most prominent example),
+    #: and then looking them up in a dictionary would give wrong results.
+    HASHABLE_TYPES = frozenset([
+        type(None), bool, int, float, complex, str, bytes,
+    ] + ([] if IS_PY3 else [long, unicode]))  # noqa
+
+    def __init__(self):
+        #: Mapping of argument values to sets of call indices.
+        #: Only values of :attr:`HASHABLE_TYPES` are included here.
+        self.values = {}
+        #: Set of indices of calls where the argument had some other type
+        self.others = set()
+        #: Mapping of argument types to sets of call indices.
+        #: Values that report a different ``__class__`` (like mocks
+        #: with ``spec=``) are indexed under both of their types.
+        self.types = {}
+
+    def add(self, value, call_index):
+        """Add an argument value from the call with given index."""
+        if type(value) in self.HASHABLE_TYPES:
+            self.values.setdefault(value, set()).add(call_index)
+        else:
+            self.others.add(call_index)
+        self.types.setdefault(type(value), set()).add(call_index)
+        class_ = getattr(value, '__class__', None)
+        if class_ is not type(value) and isinstance(class_, type):
+            self.types.setdefault(class_, set()).add(call_index)
+
+    def lookup(self, expected):
+        """Find the calls where the argument could match the expected one.
+
+        :param expected: Expected argument value or matcher
+        :return: Set of call indices,
+                 or ``None`` if the index cannot narrow down the search
+        """
+        if not isinstance(expected, BaseMatcher):
+            return self._lookup_values([expected])
+
+        if isinstance(expected, (Eq, Is)):
+            return self._lookup_values([expected.value])
+        if isinstance(expected, In) and expected.elementwise is None:
+            return self._lookup_membership(expected.ref)
+
+        if isinstance(expected, InstanceOf):
+            return self._lookup_types(expected.type_, expected.exact)
+        if isinstance(expected, (NumericMatcher, StringTypeMatcher)):
+            return self._lookup_types(expected.CLASS)
+
+        if isinstance(expected, And):
+            result = None
+            for matcher in expected._matchers:
+                narrowed = self.lookup(matcher)
+                if narrowed is not None:
+                    result = narrowed if result is None else result & narrowed
+            return result
+        if isinstance(expected, Or):
+            result = set()
+            for matcher in expected._matchers:
+                narrowed = self.lookup(matcher)
+                if narrowed is None:
+                    return None
+                result |= narrowed
+            return result
+
+        return None
+
+    def _lookup_values(self, values):
+        # arguments of other types may compare equal to anything,
+        # so they always have to be considered
+        result = set(self.others)
+        for value in values:
+            if type(value) not in self.HASHABLE_TYPES:
+                return None
+            result |= self.values.get(value, set())
+        return result
+
+    def _lookup_membership(self, container):
+        # other containers (including strings, where ``in`` means
+        # a substring check) could take arbitrarily long to search,
+        # or even be consumed in the process
+        if not isinstance(container, (dict, frozenset, list, set, tuple)):
+            return None
+
+        # look up the container's items if there is only a few of them,
+        # or check which of the indexed values are in the (hashed) container
+        is_hashed = isinstance(container, (dict, frozenset, set))
+        if not is_hashed or len(container) <= len(self.values):
+            return self._lookup_values(container)
+
+        result = set(self.others)
+        try:
+            for value, call_indices in self.values.items():
+                if value in container:
+                    result |= call_indices
+        except TypeError:  # unhashable value
+            return None
+        return result
+
+    def _lookup_types(self, type_, exact=False):
+        if exact:  # i.e. ``type(value) is type_``
+            return set(self.types.get(type_, ()))
+        # like with values, arguments of other types may have
+        # their own way of passing isinstance() (e.g. __instancecheck__)
+        result = set(self.others)
+        for arg_type, call_indices in self.types.items():
+            if issubclass(arg_type, type_):
+                result |= call_indices
+        return result
+
+
+# Utility functions
+
+def is_plain_iterator(obj):
+    """Check if the object is an iterator without any public methods
+    or attributes besides the iteration protocol
+    (like the iterators of built-in collections, or :func:`map` objects).
+    """
+    if not isinstance(obj, Iterator) or isinstance(obj, TeeProxy):
+        return False
+    return all(name.startswith('_') or name == 'next'  # Python 2
+               for name in dir(type(obj)))
+
+
+def format_call(args, kwargs):
+    """Format function call arguments in a way similar to ``mock.call``."""
+    params = list(map(repr, args))
+    params.extend("%s=%r" % item for item in sorted(kwargs.items()))
+    return "call(%s)" % ", ".join(params)
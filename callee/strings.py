@@ -2,11 +2,15 @@
 Matchers for strings.
 """
 import fnmatch
+import importlib
+import os
+import posixpath
 import re
 
-from callee._compat import IS_PY3, casefold
-from callee.base import BaseMatcher
+from callee._compat import IS_PY3, OrderedDict, STRING_TYPES, casefold
+from callee.base import BaseMatcher, Or, fingerprint_of
 from callee.objects import Bytes
+from callee.operators import Contains
 
 
 __all__ = [
@@ -14,6 +18,7 @@ __all__ = [
     'String', 'Unicode',
     'StartsWith', 'EndsWith',
     'Glob', 'Regex',
+    'AnyOf',
 ]
 
 
@@ -27,6 +32,8 @@ class StringTypeMatcher(BaseMatcher):
     #: Must be overridden in subclasses.
     CLASS = None
 
+    COST = 1
+
     # TODO: support of= param, so we can assert what characters
     # the string consists of (e.g. letters, digits as iterables of chars;
     # boolean predicate; or matcher)
@@ -36,6 +43,9 @@ class StringTypeMatcher(BaseMatcher):
     def match(self, value):
         return isinstance(value, self.CLASS)
 
+    def _compile(self, compiler, arg):
+        return "isinstance(%s, %s)" % (arg, compiler.bind(self.CLASS))
+
     def __repr__(self):
         return "<%s>" % (self.__class__.__name__,)
 
@@ -63,26 +73,92 @@ class Unicode(StringTypeMatcher):
 # TODO: generalize for all sequence/collection types
 
 class StartsWith(BaseMatcher):
-    """Matches a string starting with given prefix."""
+    """Matches a string starting with given prefix.
 
+    Besides strings, it also accepts objects supporting the buffer protocol
+    (like :class:`memoryview` or :class:`mmap.mmap`), whose contents
+    are compared with the prefix in place, without copying.
+    """
     def __init__(self, prefix):
         self.prefix = prefix
 
     def match(self, value):
-        return value.startswith(self.prefix)
+        try:
+            return value.startswith(self.prefix)
+        except AttributeError:
+            view = byte_view(value)
+            if view is None:
+                raise
+        with view:
+            for prefix in as_tuple(self.prefix):
+                if view[:len(prefix)] == prefix:
+                    return True
+        return False
+
+    def _match_many(self, values):
+        prefix = self.prefix
+        values = list(values)  # may have to be iterated again
+        try:
+            return [value.startswith(prefix) for value in values]
+        except AttributeError:
+            return list(map(self.match, values))
+
+    def _match_array(self, array, numpy):
+        if array.dtype.kind in 'SU':
+            # numpy.char.startswith() only accepts a single prefix
+            result = numpy.zeros(array.shape, dtype=bool)
+            for prefix in as_tuple(self.prefix):
+                result |= numpy.char.startswith(array, prefix)
+            return result
+        return super(StartsWith, self)._match_array(array, numpy)
+
+    def _compile(self, compiler, arg):
+        return "%s(%s)" % (compiler.bind(self.match), arg)
 
     def __repr__(self):
         return "<StartsWith %r>" % (self.prefix,)
 
 
 class EndsWith(BaseMatcher):
-    """Matches a string ending with given suffix."""
+    """Matches a string ending with given suffix.
 
+    Like with :class:`StartsWith`, buffer objects are also accepted.
+    """
     def __init__(self, suffix):
         self.suffix = suffix
 
     def match(self, value):
-        return value.endswith(self.suffix)
+        try:
+            return value.endswith(self.suffix)
+        except AttributeError:
+            view = byte_view(value)
+            if view is None:
+                raise
+        with view:
+            for suffix in as_tuple(self.suffix):
+                if buffer_endswith(view, suffix):
+                    return True
+        return False
+
+    def _match_many(self, values):
+        suffix = self.suffix
+        values = list(values)  # may have to be iterated again
+        try:
+            return [value.endswith(suffix) for value in values]
+        except AttributeError:
+            return list(map(self.match, values))
+
+    def _match_array(self, array, numpy):
+        if array.dtype.kind in 'SU':
+            # numpy.char.endswith() only accepts a single suffix
+            result = numpy.zeros(array.shape, dtype=bool)
+            for suffix in as_tuple(self.suffix):
+                result |= numpy.char.endswith(array, suffix)
+            return result
+        return super(EndsWith, self)._match_array(array, numpy)
+
+    def _compile(self, compiler, arg):
+        return "%s(%s)" % (compiler.bind(self.match), arg)
 
     def __repr__(self):
         return "<EndsWith %r>" % (self.suffix,)
@@ -90,19 +166,64 @@ class EndsWith(BaseMatcher):
 
 # Pattern matchers
 
+class PatternCache(object):
+    """Bounded cache of compiled patterns,
+    shared by all pattern matchers of some kind.
+
+    When it's full, the least recently used pattern is discarded.
+
+    This class shouldn't be used directly.
+    """
+    def __init__(self, maxsize):
+        """:param maxsize: Maximum number of patterns to keep"""
+        self.maxsize = maxsize
+        self._patterns = OrderedDict()
+
+    def get(self, key, compile_):
+        """Return the compiled pattern for given key,
+        calling ``compile_()`` to create it if it's not in the cache.
+        """
+        patterns = self._patterns
+        try:
+            pattern = patterns.pop(key)
+        except KeyError:
+            pattern = compile_()
+            while len(patterns) >= self.maxsize:
+                try:
+                    patterns.popitem(last=False)
+                except KeyError:  # emptied by another thread
+                    break
+        patterns[key] = pattern
+        return pattern
+
+    def clear(self):
+        """Remove all patterns from the cache."""
+        self._patterns.clear()
+
+    def __len__(self):
+        return len(self._patterns)
+
+
 class Glob(BaseMatcher):
     """Matches a string against a Unix shell wildcard pattern.
 
     See the :mod:`fnmatch` module for more details about those patterns.
+
+    The pattern is translated to a regular expression once,
+    when the matcher is created.
+
+    Patterns given as bytes can also be matched against buffer objects,
+    like :class:`memoryview`, without copying them
+    (except when the case sensitivity is system-dependent on Windows).
     """
     DEFAULT_CASE = 'system'
 
-    #: fnmatch functions that the matchers uses based on case= argument.
-    FNMATCH_FUNCTIONS = {
-        DEFAULT_CASE: fnmatch.fnmatch,
-        True: fnmatch.fnmatchcase,
-        False: lambda f, p: fnmatch.fnmatchcase(casefold(f), casefold(p)),
-    }
+    #: Possible values of the case= argument.
+    CASES = (DEFAULT_CASE, True, False)
+
+    #: Cache of regular expressions translated from glob patterns,
+    #: shared by all :class:`Glob` matchers.
+    PATTERN_CACHE = PatternCache(maxsize=256)
 
     def __init__(self, pattern, case=None):
         """
@@ -116,50 +237,580 @@ class Glob(BaseMatcher):
                 * ``True``: matching is case-sensitive
                 * ``False``: matching is case-insensitive
         """
-        self.pattern = pattern
-        try:
-            if case is None:
-                case = self.DEFAULT_CASE
-            self.fnmatch = self.FNMATCH_FUNCTIONS[case]
-        except KeyError:
+        if case is None:
+            case = self.DEFAULT_CASE
+        if not any(case is c for c in self.CASES):  # (1 == True, etc.)
             raise ValueError("invalid case= argument: %r" % (case,))
 
+        self.pattern = pattern
+        self.case = case
+
+        #: Function applied to both the pattern and matched values,
+        #: like :func:`fnmatch.fnmatch` does with :func:`os.path.normcase`
+        self._normalize = None
+        flags = 0
+        if case is False:
+            if isinstance(pattern, STRING_TYPES):
+                self._normalize = casefold
+            else:
+                # for bytes (and buffers), ignoring ASCII case in the regex
+                # is equivalent to lowercasing them, but without a copy
+                flags = re.IGNORECASE
+        elif case == self.DEFAULT_CASE \
+                and os.path.normcase is not posixpath.normcase:
+            self._normalize = os.path.normcase
+
+        normalized = pattern if self._normalize is None \
+            else self._normalize(pattern)
+        self._regex = self.PATTERN_CACHE.get(
+            (type(normalized), normalized, flags),
+            lambda: re.compile(translate_glob(normalized), flags))
+
     def match(self, value):
-        return self.fnmatch(value, self.pattern)
+        if self._normalize is not None:
+            value = self._normalize(value)
+        return self._regex.match(value) is not None
+
+    def _match_many(self, values):
+        match = self._regex.match
+        if self._normalize is not None:
+            values = map(self._normalize, values)
+        return [match(value) is not None for value in values]
+
+    def _compile(self, compiler, arg):
+        if self._normalize is not None:
+            arg = "%s(%s)" % (compiler.bind(self._normalize), arg)
+        return "(%s(%s) is not None)" % (compiler.bind(self._regex.match),
+                                         arg)
 
     def __repr__(self):
         return "<Glob %s>" % (self.pattern,)
 
 
 class Regex(BaseMatcher):
-    """Matches a string against a regular expression."""
+    """Matches a string against a regular expression.
+
+    Expressions given as bytes can also be matched against buffer objects,
+    like :class:`memoryview`, without copying them.
 
+    Compiled expressions are shared by all :class:`Regex` matchers
+    (through a bounded cache), so creating many matchers
+    with the same patterns is cheap.
+
+    .. versionchanged:: 0.4
+       Added the ``mode`` and ``engine`` parameters.
+    """
     REGEX_TYPE = type(re.compile(''))
 
-    def __init__(self, pattern, flags=0):
+    DEFAULT_MODE = 'match'
+
+    #: Possible values of the mode= argument,
+    #: named after the methods of regular expression objects.
+    MODES = (DEFAULT_MODE, 'search', 'fullmatch')
+
+    #: Engine used for patterns given as strings, if not specified otherwise.
+    #: This can be changed to use e.g. ``'re2'`` for all :class:`Regex`
+    #: matchers in the tests.
+    DEFAULT_ENGINE = 're'
+
+    #: Possible values of the engine= argument,
+    #: i.e. names of modules compatible with :mod:`re`.
+    ENGINES = (DEFAULT_ENGINE, 'regex', 're2')
+
+    #: Cache of compiled regular expressions,
+    #: shared by all :class:`Regex` matchers.
+    PATTERN_CACHE = PatternCache(maxsize=512)
+
+    #: The matching method is derived from the expression object,
+    #: so it's not a part of the matcher's state
+    CACHED_ATTRS = BaseMatcher.CACHED_ATTRS + ('_match',)
+
+    def __init__(self, pattern, flags=0, mode=None, engine=None):
         """
         :param pattern: Regular expression to match against.
                         It can be given as string,
                         or as a compiled regular expression object
         :param flags: Flags to use with a regular expression passed as string
+        :param mode:
+
+            How the expression is matched against the string:
+
+                * ``'match'`` or ``None``: at the beginning of the string
+                  (this is the default)
+                * ``'search'``: anywhere in the string
+                * ``'fullmatch'``: against the whole string
+
+        :param engine:
+
+            Name of the module compiling a regular expression passed as string:
+
+                * ``'re'`` (or ``None``, unless :attr:`DEFAULT_ENGINE`
+                  is changed): the standard :mod:`re` module
+                * ``'regex'``: the third-party `regex`_ module
+                * ``'re2'``: bindings to Google's `RE2`_ library,
+                  guaranteeing linear time matching even for large,
+                  untrusted strings (but supporting fewer features)
+
+            The third-party modules have to be installed separately.
+
+        .. _regex: https://pypi.org/project/regex/
+        .. _RE2: https://github.com/google/re2
         """
+        if mode is None:
+            mode = self.DEFAULT_MODE
+        if mode not in self.MODES:
+            raise ValueError("invalid mode= argument: %r" % (mode,))
+        if engine is None:
+            engine = self.DEFAULT_ENGINE
+        if engine not in self.ENGINES:
+            raise ValueError("invalid engine= argument: %r" % (engine,))
+
         if self._is_regex_object(pattern):
             if flags and flags != pattern.flags:
                 raise ValueError("conflicting regex flags: %s vs. %s" % (
                     bin(flags), bin(pattern.flags)))
         else:
-            pattern = re.compile(pattern, flags)
+            pattern = self._compile_pattern(engine, pattern, flags)
 
         self.pattern = pattern
+        self.mode = mode
+        self.engine = engine
+
+        #: Method of the expression object that performs the matching
+        self._match = getattr(pattern, mode, None)
+        if self._match is None:  # no fullmatch() in Python 2
+            self._match = self._compile_pattern(
+                engine, anchor_regex(pattern.pattern), pattern.flags).match
 
     def _is_regex_object(self, obj):
-        return isinstance(obj, self.REGEX_TYPE)
+        if isinstance(obj, self.REGEX_TYPE):
+            return True
+        # expression objects of other engines
+        return not isinstance(obj, STRING_TYPES + (bytes,)) \
+            and hasattr(obj, 'pattern') and hasattr(obj, self.DEFAULT_MODE)
+
+    @classmethod
+    def _compile_pattern(cls, engine, pattern, flags):
+        """Compile a regular expression using given engine,
+        or retrieve it from the :attr:`PATTERN_CACHE`.
+        """
+        def compile_():
+            module = import_regex_engine(engine)
+            # some engines (like RE2) take options of their own
+            # instead of the flags, so pass them only if necessary
+            return module.compile(pattern, flags) if flags \
+                else module.compile(pattern)
+
+        return cls.PATTERN_CACHE.get(
+            (engine, type(pattern), pattern, flags), compile_)
+
+    def match(self, value):
+        return self._match(value) is not None
+
+    def _match_many(self, values):
+        match = self._match
+        return [match(value) is not None for value in values]
+
+    def _compile(self, compiler, arg):
+        return "(%s(%s) is not None)" % (compiler.bind(self._match), arg)
+
+    def __repr__(self):
+        if self.mode == self.DEFAULT_MODE:
+            return "<Regex %s>" % (self.pattern.pattern,)
+        return "<Regex %s (%s)>" % (self.pattern.pattern, self.mode)
+
+
+class AnyOf(BaseMatcher):
+    """Matches a string that matches any of given string matchers.
+
+    This is equivalent to combining the matchers with ``|``
+    (i.e. :class:`~callee.base.Or`), but much faster
+    when there are many alternatives::
+
+        AnyOf(StartsWith('/api/'), Glob('/static/*.js'), Regex(r'/user/\\d+'))
+
+    Instead of checking every alternative separately,
+    :class:`StartsWith`, :class:`Glob`, :class:`Regex` (using
+    the standard :mod:`re` engine), and :class:`~callee.operators.Contains`
+    (with a string argument) matchers are merged into a single
+    regular expression, so that the string is scanned only once.
+    Literal prefixes & substrings are factored into a trie,
+    which keeps the expression fast even with hundreds of them.
+    Suffixes from :class:`EndsWith` are all checked with a single
+    :meth:`str.endswith` call.
+
+    Any other matchers, as well as regular expressions that cannot be merged
+    (like those with backreferences), are checked one by one, afterwards.
+
+    Unlike with :class:`~callee.base.Or`, string patterns don't raise errors
+    for values that aren't strings (or are strings of a different type,
+    like bytes vs. text); they simply don't match them.
+
+    .. versionadded:: 0.4
+    """
+    def __init__(self, *matchers):
+        """
+        :param matchers: Matchers of the alternatives.
+                         Nested :class:`AnyOf` and non-adaptive
+                         :class:`~callee.base.Or` matchers are flattened.
+        """
+        assert matchers, "AnyOf() expects at least one matcher"
+        assert all(isinstance(m, BaseMatcher)
+                   for m in matchers), "AnyOf() expects matchers"
+        self.matchers = list(matchers)
+
+        #: Merged alternatives, as a list of :class:`AnyOfGroup` objects
+        #: for the string types of the patterns
+        self._groups = []
+        self._bytes_group = None
+        #: :class:`~callee.operators.Contains` matchers merged into the groups
+        #: (which also work for values other than strings, like lists)
+        self._merged_contains = []
+        #: Matchers that are checked separately
+        self._others = []
+        self._initialize_groups(flatten_alternatives(matchers))
+
+    def _initialize_groups(self, matchers):
+        groups = OrderedDict()  # keyed by string type of the patterns
+
+        def group_for(pattern):
+            type_ = STRING_TYPES[0] if isinstance(pattern, STRING_TYPES) \
+                else bytes
+            if type_ not in groups:
+                groups[type_] = AnyOfGroup(type_)
+            group = groups[type_]
+            group.add_string_type(pattern)
+            return group
+
+        for matcher in matchers:
+            group = None
+            if type(matcher) is StartsWith:
+                prefixes = matcher.prefix
+                for prefix in prefixes if isinstance(prefixes, tuple) \
+                        else [prefixes]:
+                    group = group_for(prefix)
+                    group.prefixes.append(prefix)
+            elif type(matcher) is EndsWith:
+                suffixes = matcher.suffix
+                for suffix in suffixes if isinstance(suffixes, tuple) \
+                        else [suffixes]:
+                    group = group_for(suffix)
+                    group.suffixes.append(suffix)
+            elif type(matcher) is Contains and matcher.elementwise is None \
+                    and isinstance(matcher.ref, STRING_TYPES + (bytes,)):
+                group = group_for(matcher.ref)
+                group.substrings.append(matcher.ref)
+            elif type(matcher) is Glob:
+                pattern = matcher._regex
+                group = group_for(pattern.pattern)
+                group.add_pattern(matcher, pattern, matcher._normalize)
+            elif type(matcher) is Regex \
+                    and type(matcher.pattern) is Regex.REGEX_TYPE \
+                    and is_mergeable(matcher.pattern):
+                group = group_for(matcher.pattern.pattern)
+                group.add_pattern(matcher, matcher.pattern, mode=matcher.mode)
+
+            if group is None:
+                self._others.append(matcher)
+            elif type(matcher) is Contains:
+                self._merged_contains.append(matcher)
+
+        for group in groups.values():
+            self._others.extend(group.build())
+        self._groups = list(groups.values())
+        #: Group of patterns given as bytes, which can also match buffers
+        self._bytes_group = groups.get(bytes)
 
     def match(self, value):
-        return self.pattern.match(value)
+        for group in self._groups:
+            if isinstance(value, group.type_):
+                if group.match(value):
+                    return True
+                break
+        else:
+            view = None if self._bytes_group is None else byte_view(value)
+            if view is not None:
+                with view:
+                    if self._bytes_group.match_buffer(view):
+                        return True
+            # only Contains() can match values that aren't strings
+            # (of the same type as the patterns), e.g. lists,
+            # while it would raise TypeError for strings of other types
+            if not isinstance(value, STRING_LIKE_TYPES) and any(
+                    matcher.match(value) for matcher in self._merged_contains):
+                return True
+        return any(matcher.match(value) for matcher in self._others)
+
+    def _fingerprint_state(self):
+        return fingerprint_of(self.matchers)
+
+    def _is_immutable(self):
+        return all(m._is_immutable() for m in self.matchers)
 
     def __repr__(self):
-        return "<Regex %s>" % (self.pattern.pattern,)
+        return "<AnyOf %s>" % ", ".join(map(repr, self.matchers))
+
+
+#: Types of strings & buffers that :class:`AnyOf` only matches
+#: with the merged patterns of the same string type
+STRING_LIKE_TYPES = STRING_TYPES + (bytes, bytearray, memoryview)
+
+
+class AnyOfGroup(object):
+    """Alternatives of :class:`AnyOf`, merged for a single string type.
+    This class shouldn't be used directly.
+    """
+    #: Parts of the regular expressions surrounding the patterns,
+    #: so that they are matched like the :class:`Regex` modes dictate
+    ANCHORS = {
+        'match': (r'\A(?:', ')'),
+        'search': ('(?:', ')'),
+        'fullmatch': (r'\A(?:', r')\Z'),
+    }
+
+    def __init__(self, type_):
+        #: Type of values matched by the group (which may be abstract,
+        #: like :class:`basestring` on Python 2)
+        self.type_ = type_
+        #: Empty string of the concrete type of the patterns
+        self.empty = None
+        self.prefixes = []
+        self.suffixes = []
+        self.substrings = []
+        #: Regular expressions of :class:`Glob` & :class:`Regex` matchers,
+        #: as lists of (matcher, anchored source) pairs keyed by
+        #: the normalizing function for values and the regex flags
+        self.patterns = OrderedDict()
+
+        #: Suffixes as a tuple, for :meth:`str.endswith`
+        self._suffixes = None
+        #: List of (normalizing function, merged regex) pairs
+        self._regexes = []
+
+    def add_string_type(self, pattern):
+        """Take the type of a pattern into account when merging them.
+
+        On Python 2, patterns of :class:`str` and :class:`unicode`
+        can be mixed, and are merged into a :class:`unicode` regex.
+        """
+        if not isinstance(self.empty, Unicode.CLASS):
+            self.empty = pattern[:0]
+
+    def add_pattern(self, matcher, regex, normalize=None, mode='match'):
+        flags = regex.flags
+        if IS_PY3 and self.type_ is str:
+            flags &= ~re.UNICODE  # implied for str patterns
+        key = (normalize, flags)
+
+        empty = regex.pattern[:0]
+        start, end = self.ANCHORS[mode]
+        source = text(start, empty) + regex.pattern + text(end, empty)
+        self.patterns.setdefault(key, []).append((matcher, source))
+
+    def build(self):
+        """Merge the alternatives into regular expressions.
+        :return: List of matchers whose patterns couldn't be merged
+        """
+        unmerged = []
+        self._suffixes = tuple(self.suffixes) or None
+
+        empty = self.empty
+        literals = []
+        if self.prefixes:
+            literals.append(text(r'\A', empty) +
+                            literal_regex(self.prefixes, empty))
+        if self.substrings:
+            literals.append(literal_regex(self.substrings, empty))
+
+        key = (None, 0)
+        if literals and key not in self.patterns:
+            self.patterns[key] = []
+        for (normalize, flags), patterns in self.patterns.items():
+            sources = [source for _, source in patterns]
+            if (normalize, flags) == key:
+                sources = literals + sources
+            try:
+                regex = re.compile(text('|', empty).join(sources), flags)
+            except re.error:
+                # e.g. the same group names in different patterns
+                unmerged.extend(matcher for matcher, _ in patterns)
+                if (normalize, flags) != key or not literals:
+                    continue
+                regex = re.compile(text('|', empty).join(literals))
+            self._regexes.append((normalize, regex))
+        return unmerged
+
+    def match(self, value):
+        if self._suffixes is not None and value.endswith(self._suffixes):
+            return True
+        for normalize, regex in self._regexes:
+            if regex.search(value if normalize is None
+                            else normalize(value)) is not None:
+                return True
+        return False
+
+    def match_buffer(self, view):
+        """Match the contents of a :class:`memoryview` of bytes."""
+        if self._suffixes is not None and any(
+                buffer_endswith(view, suffix) for suffix in self._suffixes):
+            return True
+        for normalize, regex in self._regexes:
+            # only normalizing (on Windows) requires a copy
+            if regex.search(view if normalize is None
+                            else normalize(view.tobytes())) is not None:
+                return True
+        return False
+
+
+# Utility functions
+
+def translate_glob(pattern):
+    """Translate a glob pattern into a regular expression (as a string),
+    like :func:`fnmatch.translate` but also for patterns given as bytes.
+    """
+    if IS_PY3 and isinstance(pattern, bytes):
+        # same as fnmatch does
+        regex = fnmatch.translate(str(pattern, 'ISO-8859-1'))
+        return regex.encode('ISO-8859-1')
+    return fnmatch.translate(pattern)
+
+
+def byte_view(value):
+    """Return a one-dimensional :class:`memoryview` of the bytes
+    of a buffer object, to be used in a ``with`` block
+    (so that the buffer is released afterwards, and e.g.
+    a :class:`mmap.mmap` can be closed).
+
+    The contents are only copied if the buffer isn't contiguous in memory.
+
+    :return: :class:`memoryview`, or ``None`` if the value isn't a buffer
+             (or we're on Python 2, whose views can't be released)
+    """
+    if not IS_PY3:
+        return None
+    try:
+        view = memoryview(value)
+    except TypeError:
+        return None
+    if view.format != 'B' or view.ndim != 1:
+        with view:
+            try:
+                return view.cast('B')
+            except TypeError:  # not contiguous
+                return memoryview(view.tobytes())
+    return view
+
+
+def buffer_endswith(view, suffix):
+    """Check if the contents of a :class:`memoryview` end with given suffix.
+    """
+    start = len(view) - len(suffix)
+    return start >= 0 and view[start:] == suffix
+
+
+def as_tuple(value):
+    """Wrap a value in a tuple, unless it's a tuple already
+    (like e.g. the ``prefix`` argument of :meth:`str.startswith`).
+    """
+    return value if isinstance(value, tuple) else (value,)
+
+
+def anchor_regex(source):
+    """Change a regular expression (as a string)
+    so that it only matches whole strings.
+    """
+    empty = source[:0]
+    return text('(?:', empty) + source + text(r')\Z', empty)
+
+
+def import_regex_engine(name):
+    """Import the module of a regular expression engine.
+    :raise ImportError: If the engine is not installed
+    """
+    try:
+        return importlib.import_module(name)
+    except ImportError:
+        raise ImportError(
+            "regular expression engine %r is not installed" % (name,))
+
+
+def flatten_alternatives(matchers):
+    """Flatten nested :class:`AnyOf` and :class:`~callee.base.Or` matchers.
+    :return: List of matchers
+    """
+    result = []
+    stack = list(reversed(matchers))
+    while stack:
+        matcher = stack.pop()
+        if type(matcher) is AnyOf:
+            stack.extend(reversed(matcher.matchers))
+        elif type(matcher) is Or and matcher._adaptive is None:
+            stack.extend(reversed(matcher._matchers))
+        else:
+            result.append(matcher)
+    return result
+
+
+def is_mergeable(regex):
+    """Check if a compiled regular expression can be merged
+    with others into a single alternation.
+
+    That's not the case if it refers to its groups by number
+    (as those would change), or at all (to be on the safe side).
+    """
+    if not regex.groups:
+        return True
+    source = regex.pattern
+    if not isinstance(source, STRING_TYPES):
+        source = source.decode('latin-1')
+    return re.search(r'\\[1-9]|\(\?P=|\(\?\(', source) is None
+
+
+def literal_regex(literals, empty):
+    """Build a regular expression (as a string) that matches
+    any of given literal strings.
+
+    Common prefixes of the literals are factored out, like in a trie,
+    so that the regex engine can rule out many of them at once.
+
+    :param empty: Empty string of the literals' type
+    """
+    trie = {}
+    for literal in literals:
+        node = trie
+        for i in range(len(literal)):
+            node = node.setdefault(literal[i:i + 1], {})
+        node[None] = None  # marks the end of a literal
+    return trie_regex(trie, empty)
+
+
+def trie_regex(node, empty):
+    """Convert a trie of literals into a regular expression."""
+    alternatives = []
+    for char in sorted(key for key in node if key is not None):
+        child = node[char]
+        chars = [re.escape(char)]
+        # follow the chains of nodes with a single child
+        while len(child) == 1 and None not in child:
+            (char, child), = child.items()
+            chars.append(re.escape(char))
+        alternatives.append(empty.join(chars) + trie_regex(child, empty))
+
+    if not alternatives:
+        return empty
+    regex = text('|', empty).join(alternatives)
+    if None in node:
+        return text('(?:', empty) + regex + text(')?', empty)
+    if len(alternatives) > 1:
+        return text('(?:', empty) + regex + text(')', empty)
+    return regex
+
+
+def text(string, empty):
+    """Convert an ASCII string to the same type as ``empty``."""
+    if isinstance(empty, bytes) and not isinstance(string, bytes):
+        return string.encode('ascii')
+    return string
 
 
 # TODO: matchers for common string formats: Url, Email, IPv4, IPv6
@@ -15,6 +15,8 @@ class TypeMatcher(BaseMatcher):
     """Matches an object to a type.
     This class shouldn't be used directly.
     """
+    COST = 1
+
     def __init__(self, type_):
         """:param type\ _: Type to match against"""
         if not isinstance(type_, type):
@@ -49,6 +51,30 @@ class InstanceOf(TypeMatcher):
         else:
             return isinstance(value, self.type_)
 
+    def _match_many(self, values):
+        type_ = self.type_
+        if self.exact:
+            return [type(value) is type_ for value in values]
+        return [isinstance(value, type_) for value in values]
+
+    def _match_array(self, array, numpy):
+        if array.dtype.kind == 'O':
+            return super(InstanceOf, self)._match_array(array, numpy)
+
+        # all elements of a non-object array have the same (scalar) type
+        scalar_type = array.dtype.type
+        if self.exact:
+            is_match = scalar_type is self.type_
+        else:
+            is_match = issubclass(scalar_type, self.type_)
+        return numpy.full(array.shape, is_match, dtype=bool)
+
+    def _compile(self, compiler, arg):
+        type_ = compiler.bind(self.type_)
+        if self.exact:
+            return "(type(%s) is %s)" % (arg, type_)
+        return "isinstance(%s, %s)" % (arg, type_)
+
 IsA = InstanceOf
 
 
@@ -84,9 +110,14 @@ Inherits = SubclassOf
 class Type(BaseMatcher):
     """Matches any Python type object."""
 
+    COST = 1
+
     def match(self, value):
         return isinstance(value, type)
 
+    def _compile(self, compiler, arg):
+        return "isinstance(%s, type)" % (arg,)
+
     def __repr__(self):
         return "<Type>"
 
@@ -94,6 +125,8 @@ class Type(BaseMatcher):
 class Class(BaseMatcher):
     """Matches a class (but not any other type object)."""
 
+    COST = 1
+
     def match(self, value):
         return inspect.isclass(value)
 
@@ -108,7 +108,7 @@ setup(
     ],
 
     platforms='any',
-    packages=find_packages(exclude=['tests']),
+    packages=find_packages(exclude=['benchmarks', 'tests']),
 
     tests_require=tests_require,
 )
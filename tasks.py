@@ -32,10 +32,35 @@ def test(ctx, all=False, verbose=False):
     return ctx.run(cmd, pty=True).return_code
 
 
+@task(help={
+    'name': "Only run benchmarks whose names contain this string",
+    'output': "JSON file to write the results to",
+    'sizes': "Comma-separated sizes of the workloads",
+    'quick': "Whether to measure only once, and briefly",
+})
+def bench(ctx, name=None, output=None, sizes=None, quick=False):
+    """Run the benchmarks."""
+    cmd = 'python -m benchmarks'
+    if output:
+        # label the results with current commit,
+        # so that they can be told apart when comparing
+        git_rev = ctx.run('git rev-parse --short HEAD', hide=True, warn=True)
+        if git_rev.ok:
+            cmd += ' --label %s' % git_rev.stdout.strip()
+        cmd += ' --output %s' % output
+    if sizes:
+        cmd += ' --sizes %s' % sizes
+    if quick:
+        cmd += ' --quick'
+    if name:
+        cmd += ' %s' % name
+    return ctx.run(cmd, pty=True).return_code
+
+
 @task
 def lint(ctx):
     """Run the linter."""
-    return ctx.run('flake8 callee tests', pty=True).return_code
+    return ctx.run('flake8 callee tests benchmarks', pty=True).return_code
 
 
 @task(help={
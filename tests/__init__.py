@@ -8,6 +8,10 @@ try:
     import unittest.mock as mock
 except ImportError:
     import mock
+try:
+    import numpy
+except ImportError:
+    numpy = None  # optional; tests that need it will be skipped
 
 from taipan.testing import TestCase as _TestCase
 
@@ -16,6 +20,7 @@ from callee._compat import asyncio
 
 __all__ = [
     'IS_PY34', 'IS_PY35',
+    'numpy',
     'MatcherTestCase',
     'python_code'
 ]
@@ -51,6 +56,40 @@ class MatcherTestCase(TestCase):
             m.assert_called_with(matcher)
         return True
 
+    def assert_compiled(self, matcher, *values):
+        """Assert that the compiled version of a matcher
+        gives the same results as the matcher itself.
+
+        :param matcher: Matcher object
+        :return: The compiled matcher function
+        """
+        compiled = matcher.compile()
+        for value in values:
+            self.assertEquals(
+                bool(matcher.match(value)), compiled(value),
+                msg="compiled %r disagreed with the matcher on %r" % (
+                    matcher, value))
+        return compiled
+
+    def assert_match_many(self, matcher, values):
+        """Assert that matching multiple values at once gives the same results
+        as matching them one by one.
+
+        :param matcher: Matcher object
+        :param values: List of values, or a NumPy array
+        :return: Result of :meth:`match_many`
+        """
+        results = matcher.match_many(values)
+        if numpy is not None and isinstance(values, numpy.ndarray):
+            self.assertEquals(values.shape, results.shape)
+            expected = [bool(matcher.match(v)) for v in values.flat]
+            actual = [bool(r) for r in results.flat]
+        else:
+            expected = [bool(matcher.match(v)) for v in values]
+            actual = results
+        self.assertEquals(expected, actual)
+        return results
+
     def assert_repr(self, matcher, *args):
         """Assert on the representation of a matcher.
 
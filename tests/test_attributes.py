@@ -68,6 +68,15 @@ class Attrs(MatcherTestCase):
         self.assert_no_match(foo_bar_baz, 'qux', **attrs)
         self.assert_no_match(foo_bar_baz, 'foo', 'bar', baz='wrong value')
 
+    def test_match_many(self):
+        values = [self.Object(foo=self.VALUE),
+                  self.Object(foo=self.VALUE, bar=self.VALUE * 2),
+                  self.Object(bar=self.VALUE),
+                  None]
+        self.assert_match_many(__unit__.Attrs('foo'), values)
+        self.assert_match_many(__unit__.Attrs('bar', foo=self.VALUE), values)
+        self.assert_match_many(__unit__.Attrs(bar=self.VALUE), values)
+
     def test_repr__names_only__one(self):
         attrs = __unit__.Attrs('foo')
 
@@ -117,6 +126,16 @@ class Attrs(MatcherTestCase):
         self.assertNotIn("baz=", r)
         self.assertIn("%r" % self.VALUE, r)
 
+    def test_describe_mismatch(self):
+        attrs = __unit__.Attrs('bar', foo=self.VALUE)
+        self.assertEquals("missing attribute 'bar'",
+                          attrs.describe_mismatch(self.Object(foo=0)))
+        self.assertEquals(
+            "attribute 'foo': expected <... == 42>, got 0",
+            attrs.describe_mismatch(self.Object(foo=0, bar=0)))
+        self.assertIsNone(
+            attrs.describe_mismatch(self.Object(foo=self.VALUE, bar=0)))
+
     # Utility code
 
     class Object(object):
@@ -2,8 +2,12 @@
 """
 Tests for matcher base classes.
 """
+import gc
+
+from taipan.testing import skipIf
+
 import callee.base as __unit__
-from tests import MatcherTestCase, TestCase
+from tests import MatcherTestCase, TestCase, numpy
 
 
 class BaseMatcherMetaclass(TestCase):
@@ -256,6 +260,75 @@ class LogicalCombinators(MatcherTestCase):
         has_digits_or_short = self.HasDigits() | self.Short()
         self.assert_repr(has_digits_or_short)
 
+    def test_and__flattened(self):
+        a, b, c = self.Short(), self.AllDigits(), self.HasDigits()
+        for matcher in (a & b & c, a & (b & c), __unit__.And(a & b, c)):
+            self.assertEquals([a, b, c], matcher._matchers)
+
+    def test_or__flattened(self):
+        a, b, c = self.Short(), self.AllDigits(), self.HasDigits()
+        for matcher in (a | b | c, a | (b | c), __unit__.Or(a | b, c)):
+            self.assertEquals([a, b, c], matcher._matchers)
+
+    def test_or__long_chain(self):
+        matcher = __unit__.Eq(0)
+        intermediate = []
+        for i in range(1, 5000):
+            matcher = matcher | __unit__.Eq(i)
+            intermediate.append(matcher)
+
+        self.assertTrue(matcher.match(4999))
+        self.assertEquals(5000, len(matcher._matchers))
+        # operands are normalized once, for the outermost combinator only
+        self.assertIsNone(intermediate[-2]._normalized)
+
+    def test_and_or__not_flattened_together(self):
+        a, b, c = self.Short(), self.AllDigits(), self.HasDigits()
+        matcher = a & (b | c)
+        self.assertEquals(2, len(matcher._matchers))
+
+    def test_and__duplicates_removed(self):
+        a, b = self.Short(), self.AllDigits()
+        self.assertEquals([a, b], (a & b & a & b)._matchers)
+
+    def test_and__equivalent_removed(self):
+        a, b = __unit__.Eq('a'), self.AllDigits()
+        self.assertEquals([a, b], (a & b & __unit__.Eq('a'))._matchers)
+
+    def test_and__same_custom_removed(self):
+        a, b = self.Short(), self.AllDigits()
+        self.assertEquals([a, b], (a & b & a)._matchers)
+
+    def test_and__equivalent_custom_retained(self):
+        # user-defined matchers may be stateful, so they are kept apart
+        a, b = self.Short(), self.Short()
+        self.assertEquals([a, b], (a & b)._matchers)
+
+    def test_and__equivalent_mutable_retained(self):
+        a, b = __unit__.Eq(['a']), __unit__.Eq(['a'])
+        self.assertEquals([a, b], (a & b)._matchers)
+
+    def test_or__double_negation_removed(self):
+        a, b = self.Short(), self.AllDigits()
+        self.assertEquals([a, b], __unit__.Or(__unit__.Not(~a), b)._matchers)
+
+    def test_and__cheap_first(self):
+        expensive, cheap = self.Short(), self.Cheap()
+        matcher = expensive & cheap & ~expensive
+        self.assertEquals([cheap, expensive], matcher._matchers[:2])
+
+    def test_or__cheap_first(self):
+        expensive, cheap = self.Short(), self.Cheap()
+        not_cheap = ~cheap
+        matcher = expensive | (expensive & cheap) | not_cheap
+        self.assertIs(not_cheap, matcher._matchers[0])
+        self.assertIs(expensive, matcher._matchers[1])
+
+    def test_not__de_morgan(self):
+        a, b = self.Short(), self.AllDigits()
+        self.assertIsInstance(~a & ~b, __unit__.Not)
+        self.assertIsInstance(~a | ~b, __unit__.Not)
+
     def test_xor__impossible(self):
         test_strings = ['', 'a', '42', 'a13', '99b', '!', '22 ?']
         impossible = self.HasDigits() ^ self.HasDigits()  # a^a <=> ~a
@@ -317,3 +390,365 @@ class LogicalCombinators(MatcherTestCase):
     class LongOrHasDigits(__unit__.Matcher):
         def match(self, value):
             return len(value) >= 5 or any(c.isdigit() for c in value)
+
+    class Cheap(__unit__.Matcher):
+        COST = 1
+
+        def match(self, value):
+            return isinstance(value, str)
+
+
+class Adaptive(MatcherTestCase):
+    """Tests for the adaptive mode of And & Or combinators."""
+
+    def test_invalid_interval(self):
+        with self.assertRaises(ValueError):
+            __unit__.And(self.Never(), adaptive=-1)
+        with self.assertRaises(ValueError):
+            __unit__.Or(self.Never(), adaptive='foo')
+
+    def test_unexpected_kwarg(self):
+        with self.assertRaises(TypeError):
+            __unit__.And(self.Never(), foo=42)
+
+    def test_report__not_adaptive(self):
+        with self.assertRaises(ValueError):
+            __unit__.And(self.Never()).report()
+
+    def test_and__results(self):
+        matcher = __unit__.And(self.Always(), self.Never(), adaptive=1)
+        for _ in range(10):
+            self.assertFalse(matcher.match(None))
+        self.assert_no_match(matcher, None)
+
+        matcher = __unit__.And(self.Always(), self.Always(), adaptive=1)
+        for _ in range(10):
+            self.assertTrue(matcher.match(None))
+        self.assert_match(matcher, None)
+
+    def test_or__results(self):
+        matcher = __unit__.Or(self.Never(), self.Always(), adaptive=1)
+        for _ in range(10):
+            self.assertTrue(matcher.match(None))
+        self.assert_match(matcher, None)
+
+        matcher = __unit__.Or(self.Never(), self.Never(), adaptive=1)
+        for _ in range(10):
+            self.assertFalse(matcher.match(None))
+        self.assert_no_match(matcher, None)
+
+    def test_and__reorders(self):
+        always, never = self.Always(), self.Never()
+        matcher = __unit__.And(always, never, adaptive=10)
+        for _ in range(10):
+            matcher.match(None)
+        self.assertEquals([never, always], matcher._matchers)
+
+    def test_or__reorders(self):
+        always, never = self.Always(), self.Never()
+        matcher = __unit__.Or(never, always, adaptive=10)
+        for _ in range(10):
+            matcher.match(None)
+        self.assertEquals([always, never], matcher._matchers)
+
+    def test_reorder__list_replaced(self):
+        always, never = self.Always(), self.Never()
+        matcher = __unit__.And(always, never, adaptive=10)
+        operands = matcher._matchers
+        for _ in range(10):
+            matcher.match(None)
+        self.assertEquals([never, always], matcher._matchers)
+        self.assertEquals([always, never], operands)
+
+    def test_report(self):
+        always, never = self.Always(), self.Never()
+        matcher = __unit__.Or(never, always, adaptive=True)
+        for _ in range(5):
+            matcher.match(None)
+
+        report = matcher.report()
+        self.assertEquals([never, always], [s.matcher for s in report])
+        self.assertEquals([5, 5], [s.checks for s in report])
+        self.assertEquals([0, 5], [s.decisions for s in report])
+
+    def test_freeze(self):
+        always, never = self.Always(), self.Never()
+        matcher = __unit__.Or(never, always, adaptive=True)
+        for _ in range(5):
+            matcher.match(None)
+
+        self.assertIs(matcher, matcher.freeze())
+        self.assertEquals([always, never], matcher._matchers)
+        with self.assertRaises(ValueError):
+            matcher.report()
+
+    def test_not_flattened(self):
+        a, b, c = self.Always(), self.Never(), self.Always()
+        adaptive = __unit__.And(a, b, adaptive=True)
+        matcher = adaptive & c
+        self.assertEquals([adaptive, c], matcher._matchers)
+
+    # Utility code
+
+    class Always(__unit__.Matcher):
+        def match(self, value):
+            return True
+
+    class Never(__unit__.Matcher):
+        def match(self, value):
+            return False
+
+
+class MatchMany(MatcherTestCase):
+    """Tests for the BaseMatcher.match_many method."""
+
+    def test_empty(self):
+        self.assertEquals([], self.Even().match_many([]))
+
+    def test_list(self):
+        self.assertEquals([True, False, True],
+                          self.assert_match_many(self.Even(), [0, 1, 2]))
+
+    def test_generator(self):
+        results = self.Even().match_many(x for x in range(4))
+        self.assertEquals([True, False, True, False], results)
+
+    @skipIf(numpy is None, "requires NumPy")
+    def test_array(self):
+        array = numpy.arange(6).reshape((2, 3))
+        results = self.assert_match_many(self.Even(), array)
+        self.assertEquals(bool, results.dtype)
+
+    # Utility code
+
+    class Even(__unit__.Matcher):
+        def match(self, value):
+            return value % 2 == 0
+
+
+class Compile(MatcherTestCase):
+    """Tests for the BaseMatcher.compile method."""
+
+    STRINGS = ['', 'a', '42', 'a13', '99b', '!', '22 ?', 'abcdef']
+
+    def test_uncompilable(self):
+        """Test that matchers w/o _compile fall back to their match()."""
+        matcher = self.HasDigits()
+        compiled = self.assert_compiled(matcher, *self.STRINGS)
+        self.assertIn('(value)', compiled.source)
+
+    def test_result_is_bool(self):
+        class Truthy(__unit__.Matcher):
+            def match(self, value):
+                return value
+        compiled = Truthy().compile()
+        self.assertIs(True, compiled(42))
+        self.assertIs(False, compiled(''))
+
+    def test_eq(self):
+        self.assert_compiled(__unit__.Eq('a'), *self.STRINGS)
+
+    def test_is(self):
+        obj = object()
+        self.assert_compiled(__unit__.Is(obj), obj, object(), None)
+        self.assert_compiled(__unit__.IsNot(obj), obj, object(), None)
+
+    def test_not(self):
+        self.assert_compiled(~self.HasDigits(), *self.STRINGS)
+
+    def test_and(self):
+        self.assert_compiled(self.HasDigits() & self.Short(), *self.STRINGS)
+
+    def test_or(self):
+        self.assert_compiled(self.HasDigits() | self.Short(), *self.STRINGS)
+
+    def test_either(self):
+        self.assert_compiled(self.HasDigits() ^ self.Short(), *self.STRINGS)
+
+    def test_nested(self):
+        matcher = (self.HasDigits() & ~self.Short()) | __unit__.Eq('!')
+        self.assert_compiled(matcher, *self.STRINGS)
+
+    def test_shared_objects_bound_once(self):
+        """Test that objects used repeatedly are bound to a single name."""
+        value = 'a'
+        compiled = (__unit__.Eq(value) | __unit__.IsNot(value)).compile()
+        self.assertEquals(2, compiled.source.count('_0'))
+        self.assertNotIn('_1', compiled.source)
+
+    # Utility code
+
+    class HasDigits(__unit__.Matcher):
+        def match(self, value):
+            return any(c.isdigit() for c in value)
+
+    class Short(__unit__.Matcher):
+        def match(self, value):
+            return len(value) < 5
+
+
+class DescribeMismatch(TestCase):
+    """Tests for explanations of mismatches."""
+
+    def test_match(self):
+        self.assertIsNone(__unit__.Eq(1).describe_mismatch(1))
+
+    def test_default(self):
+        self.assertEquals("expected <... == 1>, got 2",
+                          __unit__.Eq(1).describe_mismatch(2))
+
+    def test_large_value(self):
+        description = __unit__.Eq(1).describe_mismatch(list(range(10000)))
+        self.assertLess(len(description), 100)
+
+    def test_not(self):
+        self.assertEquals("1 matches <... == 1>",
+                          (~__unit__.Eq(1)).describe_mismatch(1))
+
+    def test_and(self):
+        matcher = __unit__.Not(__unit__.Eq(2)) & __unit__.Eq(1)
+        self.assertEquals("2 matches <... == 2>", matcher.describe_mismatch(2))
+        self.assertEquals("expected <... == 1>, got 3",
+                          matcher.describe_mismatch(3))
+
+
+class CachedRepr(TestCase):
+    """Tests for caching of matchers' representations."""
+
+    def test_cached(self):
+        matcher = __unit__.Eq(1)
+        self.assertIs(repr(matcher), repr(matcher))
+
+    def test_mutable_value__not_cached(self):
+        ref = [1]
+        matcher = __unit__.Eq(ref)
+        self.assertEquals("<... == [1]>", repr(matcher))
+        ref.append(2)
+        self.assertEquals("<... == [1, 2]>", repr(matcher))
+
+    def test_mutable_operand__not_cached(self):
+        ref = [1]
+        matcher = __unit__.Eq(ref) | __unit__.Eq(2)
+        before = repr(matcher)
+        ref.append(2)
+        self.assertNotEqual(before, repr(matcher))
+
+    def test_fingerprint_unaffected(self):
+        matcher = __unit__.Eq(1)
+        fingerprint = matcher.fingerprint()
+        repr(matcher)
+        self.assertEquals(fingerprint, matcher.fingerprint())
+
+    def test_superclass_repr(self):
+        class Custom(__unit__.Eq):
+            def __repr__(self):
+                return "<Custom %s>" % super(Custom, self).__repr__()
+
+        matcher = Custom(1)
+        self.assertEquals("<Custom <... == 1>>", repr(matcher))
+        self.assertEquals("<Custom <... == 1>>", repr(matcher))
+
+    def test_custom_matcher__not_cached(self):
+        class Custom(__unit__.Matcher):
+            def __init__(self, value):
+                self.value = value
+
+            def match(self, value):
+                return value == self.value
+
+        matcher = Custom(1)
+        self.assertEquals("<Custom(value=1)>", repr(matcher))
+        matcher.value = 2
+        self.assertEquals("<Custom(value=2)>", repr(matcher))
+
+    def test_adaptive_combinator__reordered(self):
+        matcher = __unit__.And(__unit__.Not(__unit__.Eq(1)),
+                               __unit__.Not(__unit__.Eq(2)), adaptive=2)
+        before = repr(matcher)
+        for _ in range(4):
+            matcher.match(2)  # only the second operand decides this
+        self.assertNotEqual(before, repr(matcher))
+
+
+class Fingerprint(TestCase):
+    """Tests for structural identity of matchers."""
+
+    def test_equivalent_matchers(self):
+        self.assertEquals(self.positive_int().fingerprint(),
+                          self.positive_int().fingerprint())
+        self.assertEquals(hash(self.positive_int().fingerprint()),
+                          hash(self.positive_int().fingerprint()))
+
+    def test_different_classes(self):
+        self.assertNotEqual(__unit__.Eq(1).fingerprint(),
+                            __unit__.IsNot(1).fingerprint())
+
+    def test_different_values(self):
+        self.assertNotEqual(__unit__.Eq(1).fingerprint(),
+                            __unit__.Eq(2).fingerprint())
+        self.assertNotEqual(__unit__.Eq(1).fingerprint(),
+                            __unit__.Eq(True).fingerprint())
+
+    def test_unhashable_values(self):
+        self.assertEquals(__unit__.Eq([1, {'a': {2}}]).fingerprint(),
+                          __unit__.Eq([1, {'a': {2}}]).fingerprint())
+        self.assertNotEqual(__unit__.Eq([1, 2]).fingerprint(),
+                            __unit__.Eq((1, 2)).fingerprint())
+
+    def test_identity(self):
+        a, b = [], []
+        self.assertEquals(__unit__.Is(a).fingerprint(),
+                          __unit__.Is(a).fingerprint())
+        self.assertNotEqual(__unit__.Is(a).fingerprint(),
+                            __unit__.Is(b).fingerprint())
+
+    def test_adaptive(self):
+        matcher = self.positive_int(adaptive=True)
+        self.assertNotEqual(matcher.fingerprint(),
+                            self.positive_int(adaptive=True).fingerprint())
+        self.assertEquals(matcher.fingerprint(), matcher.fingerprint())
+
+    def test_immutable__remembered(self):
+        matcher = self.positive_int()
+        self.assertIs(matcher.fingerprint(), matcher.fingerprint())
+
+    def test_mutable__recomputed(self):
+        ref = [1]
+        matcher = __unit__.Eq(ref)
+        fingerprint = matcher.fingerprint()
+        ref.append(2)
+        self.assertNotEqual(fingerprint, matcher.fingerprint())
+
+    def test_intern(self):
+        matcher = self.positive_int()
+        self.assertIs(matcher, matcher.intern())
+        self.assertIs(matcher, self.positive_int().intern())
+
+    def test_intern__mutable(self):
+        matcher = __unit__.Eq([1])
+        self.assertIs(matcher, matcher.intern())
+        self.assertIsNot(matcher, __unit__.Eq([1]).intern())
+
+    def test_intern__custom(self):
+        class Custom(__unit__.Matcher):
+            def __init__(self, value):
+                self.value = value
+
+            def match(self, value):
+                return value == self.value
+
+        matcher = Custom(1)
+        self.assertIs(matcher, matcher.intern())
+        self.assertIsNot(matcher, Custom(1).intern())
+
+    def test_intern__released(self):
+        fingerprint = self.positive_int().intern().fingerprint()
+        gc.collect()
+        self.assertNotIn(fingerprint, __unit__._interned)
+
+    # Utility code
+
+    def positive_int(self, **kwargs):
+        from callee.operators import Greater
+        from callee.types import InstanceOf
+        return __unit__.And(InstanceOf(int), Greater(0), **kwargs)
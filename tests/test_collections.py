@@ -5,9 +5,15 @@ import collections
 
 from taipan.testing import skipIf
 
-from callee._compat import OrderedDict as _OrderedDict
+from callee._compat import OrderedDict as _OrderedDict, futures
 import callee.collections as __unit__
-from tests import MatcherTestCase
+from callee.attributes import Attrs
+from callee.base import Eq, Is
+from callee.general import Captor, Matching
+from callee.numbers import Integer
+from callee.operators import In
+from callee.strings import StartsWith, String
+from tests import MatcherTestCase, mock
 
 
 class Iterable(MatcherTestCase):
@@ -33,14 +39,90 @@ class Iterable(MatcherTestCase):
 
     test_repr = lambda self: self.assert_repr(__unit__.Iterable())
 
+    def test_invalid_max_items(self):
+        with self.assertRaises(ValueError):
+            __unit__.Iterable(of=int, max_items=0)
+
+    def test_of__list(self):
+        matcher = __unit__.Iterable(of=int)
+        self.assert_match([1, 2, 3], matcher)
+        self.assert_no_match([1, 'two', 3], matcher)
+
+    def test_of__max_items(self):
+        matcher = __unit__.Iterable(of=int, max_items=2)
+        self.assert_match([1, 2, 'three'], matcher)
+        self.assert_no_match(['one', 2, 3], matcher)
+
+    def test_of__one_off_iterator(self):
+        gen = (x for x in [1, 2, 5])
+        with self.assertRaises(ValueError):
+            __unit__.Iterable(of=int).match(gen)
+        self.assertEquals(1, next(gen))
+
+    def test_of__tee_proxy__before_consuming(self):
+        proxy = __unit__.TeeProxy(x for x in [1, 2, 5])
+        self.assert_match(proxy, __unit__.Iterable(of=int))
+        self.assertEquals([1, 2, 5], list(proxy))
+
+    def test_of__tee_proxy__after_consuming(self):
+        proxy = __unit__.TeeProxy(x for x in [1, 2, 5])
+        self.assertEquals([1, 2, 5], list(proxy))
+        self.assert_match(proxy, __unit__.Iterable(of=int))
+        self.assert_no_match(proxy, __unit__.Iterable(of=str))
+
+    def test_of__tee_proxy__partially_consumed(self):
+        proxy = __unit__.TeeProxy(x for x in [1, 2, 5])
+        self.assertEquals(1, next(proxy))
+        self.assert_match(proxy, __unit__.Iterable(of=int))
+        self.assertEquals([2, 5], list(proxy))
+
+    def test_of__tee_proxy__stops_at_mismatch(self):
+        source = iter([1, 'two', 3, 4])
+        proxy = __unit__.TeeProxy(source)
+        self.assert_no_match(proxy, __unit__.Iterable(of=int))
+        self.assertEquals(3, next(source))
+
+    def test_of__tee_proxy__bounded_buffer(self):
+        proxy = __unit__.TeeProxy(iter(range(100)), max_items=10)
+        self.assertEquals(list(range(100)), list(proxy))
+        self.assertEquals(list(range(10)), list(proxy.peek()))
+        self.assert_match(proxy, __unit__.Iterable(of=__unit__.Any()))
+
+    def test_tee_proxy__send(self):
+        def running_sum():
+            total = 0
+            while True:
+                total += (yield total) or 0
+
+        proxy = __unit__.TeeProxy(running_sum())
+        self.assertEquals(0, next(proxy))
+        self.assertEquals(5, proxy.send(5))
+        self.assertEquals(7, proxy.send(2))
+        self.assert_match(proxy, __unit__.Iterable(of=int))
+        proxy.close()
+        self.assertIsNone(proxy.gi_frame)  # forwarded to the generator
+
+    def test_tee_proxy__send__pending(self):
+        proxy = __unit__.TeeProxy(x for x in [1, 2, 5])
+        self.assert_match(proxy, __unit__.Iterable(of=int))
+        self.assertEquals(1, proxy.send(None))
+        with self.assertRaises(ValueError):
+            proxy.send(42)
+        with self.assertRaises(ValueError):
+            proxy.throw(KeyError)
+
+    def test_repr__of(self):
+        self.assert_repr(__unit__.Iterable(of=int, max_items=10))
+
     # Assertion functions
 
-    def assert_match(self, value):
-        return super(Iterable, self).assert_match(__unit__.Iterable(), value)
+    def assert_match(self, value, matcher=None):
+        return super(Iterable, self).assert_match(
+            matcher or __unit__.Iterable(), value)
 
-    def assert_no_match(self, value):
-        return super(Iterable, self) \
-            .assert_no_match(__unit__.Iterable(), value)
+    def assert_no_match(self, value, matcher=None):
+        return super(Iterable, self).assert_no_match(
+            matcher or __unit__.Iterable(), value)
 
 
 class Generator(MatcherTestCase):
@@ -64,6 +146,10 @@ class Generator(MatcherTestCase):
 
     test_some_object = lambda self: self.assert_no_match(object())
 
+    def test_tee_proxy(self):
+        self.assert_match(__unit__.TeeProxy(x for x in [1, 2, 5]))
+        self.assert_no_match(__unit__.TeeProxy(iter([1, 2, 5])))
+
     test_repr = lambda self: self.assert_repr(__unit__.Generator())
 
     # Assertion functions
@@ -158,9 +244,63 @@ class Set(MatcherTestCase):
     test_some_set = lambda self: self.assert_match(set([2, 4, 6, 8, 10]), int)
     test_some_tuple = lambda self: self.assert_no_match(('foo', -1, ['bar']))
     test_some_generator = lambda self: self.assert_no_match(x for x in [1, 2])
+    test_some_frozenset = lambda self: self.assert_match(frozenset([1, 2]))
     test_some_object = lambda self: self.assert_no_match(object())
 
+    def test_invalid_arg(self):
+        with self.assertRaises(TypeError):
+            __unit__.Set(contains_all=[[1, 2]])
+
+    def test_contains_all(self):
+        matcher = __unit__.Set(contains_all=[1, 2])
+        super(Set, self).assert_match(matcher, set([1, 2]))
+        super(Set, self).assert_match(matcher, set([1, 2, 3]))
+        super(Set, self).assert_no_match(matcher, set([1, 3]))
+
+    def test_contains_all__matchers(self):
+        matcher = __unit__.Set(contains_all=[1, String(), String()])
+        super(Set, self).assert_match(matcher, set([1, 'a', 'b']))
+        super(Set, self).assert_no_match(matcher, set([1, 'a']))
+        super(Set, self).assert_no_match(matcher, set(['a', 'b']))
+
+    def test_contains_all__matchers__distinct_elements(self):
+        # both matchers accept 1, but only one of them accepts 2
+        matcher = __unit__.Set(contains_all=[Integer(), Eq(1)])
+        super(Set, self).assert_match(matcher, set([1, 2]))
+        super(Set, self).assert_no_match(matcher, set([1, 'a']))
+
+    def test_contains_any(self):
+        matcher = __unit__.Set(contains_any=[1, 2])
+        super(Set, self).assert_match(matcher, set([2, 3]))
+        super(Set, self).assert_no_match(matcher, set([3, 4]))
+        super(Set, self).assert_no_match(matcher, set())
+
+    def test_contains_any__matchers(self):
+        matcher = __unit__.Set(contains_any=[1, String()])
+        super(Set, self).assert_match(matcher, set([1, 2]))
+        super(Set, self).assert_match(matcher, set([2, 'a']))
+        super(Set, self).assert_no_match(matcher, set([2, 3]))
+
+    def test_subset_of(self):
+        matcher = __unit__.Set(subset_of=[1, 2, 3])
+        super(Set, self).assert_match(matcher, set())
+        super(Set, self).assert_match(matcher, set([1, 3]))
+        super(Set, self).assert_no_match(matcher, set([1, 4]))
+
+    def test_subset_of__matchers(self):
+        matcher = __unit__.Set(subset_of=[1, String()])
+        super(Set, self).assert_match(matcher, set([1, 'a', 'b']))
+        super(Set, self).assert_no_match(matcher, set([1, 2]))
+
+    def test_keys_view(self):
+        matcher = __unit__.Set(contains_all=['a'], subset_of=['a', 'b'])
+        super(Set, self).assert_match(matcher, {'a': 1}.keys())
+        super(Set, self).assert_no_match(matcher, {'b': 1}.keys())
+
     test_repr = lambda self: self.assert_repr(__unit__.Set())
+    test_repr__conditions = lambda self: self.assert_repr(
+        __unit__.Set(contains_all=[1, String()], contains_any=[2],
+                     subset_of=[1, 2, String()]))
 
     # Assertion functions
 
@@ -171,6 +311,266 @@ class Set(MatcherTestCase):
         return super(Set, self).assert_no_match(__unit__.Set(of), value)
 
 
+class FrozenSet(MatcherTestCase):
+    test_none = lambda self: self.assert_no_match(None)
+    test_empty_set = lambda self: self.assert_no_match(set())
+    test_empty_frozenset = lambda self: self.assert_match(frozenset())
+    test_some_set = lambda self: self.assert_no_match(set([1, 2]))
+    test_some_frozenset = lambda self: self.assert_match(frozenset([1, 2]))
+
+    def test_contains_all(self):
+        matcher = __unit__.FrozenSet(contains_all=[1])
+        super(FrozenSet, self).assert_match(matcher, frozenset([1, 2]))
+        super(FrozenSet, self).assert_no_match(matcher, set([1, 2]))
+
+    test_repr = lambda self: self.assert_repr(__unit__.FrozenSet())
+
+    # Assertion functions
+
+    def assert_match(self, value, of=None):
+        return super(FrozenSet, self) \
+            .assert_match(__unit__.FrozenSet(of), value)
+
+    def assert_no_match(self, value, of=None):
+        return super(FrozenSet, self) \
+            .assert_no_match(__unit__.FrozenSet(of), value)
+
+
+class Tuple(MatcherTestCase):
+    test_none = lambda self: self.assert_no_match(None)
+    test_zero = lambda self: self.assert_no_match(0)
+    test_empty_string = lambda self: self.assert_no_match('')
+    test_empty_list = lambda self: self.assert_no_match([])
+    test_empty_set = lambda self: self.assert_no_match(set())
+    test_empty_tuple = lambda self: self.assert_match(())
+    test_empty_dict = lambda self: self.assert_no_match({})
+    test_empty_generator = lambda self: self.assert_no_match(x for x in ())
+    test_some_string = lambda self: self.assert_no_match("Alice has a cat")
+    test_some_number = lambda self: self.assert_no_match(42)
+    test_some_list = lambda self: self.assert_no_match([1, 2, 3, 5, 8, 13])
+    test_some_tuple = lambda self: self.assert_match(('foo', -1, ['bar']))
+    test_some_generator = lambda self: self.assert_no_match(x for x in [1, 2])
+    test_some_object = lambda self: self.assert_no_match(object())
+
+    def test_invalid_arg(self):
+        with self.assertRaises(TypeError):
+            __unit__.Tuple(of=(int, None))
+        with self.assertRaises(TypeError):
+            __unit__.Tuple(of=(int, 'not a matcher'))
+        with self.assertRaises(TypeError):
+            __unit__.Tuple(of=(int, str), sample=1)
+
+    def test_homogeneous(self):
+        self.assert_match((1, 2, 3), Integer())
+        self.assert_no_match((1, 2, 'foo'), Integer())
+
+    def test_homogeneous__type(self):
+        self.assert_match((1, 2, True), int)
+        self.assert_no_match((1, 2, 'foo'), int)
+        self.assert_no_match((1, 2, None), int)
+
+    def test_homogeneous__exact_type(self):
+        of = __unit__.InstanceOf(int, exact=True)
+        self.assert_match((1, 2, 3), of)
+        self.assert_no_match((1, 2, True), of)
+
+    def test_homogeneous__fake_class(self):
+        value = (1, mock.Mock(spec=int))
+        self.assert_match(value, int)
+        self.assert_no_match(value, __unit__.InstanceOf(int, exact=True))
+
+    def test_positional(self):
+        of = (str, Integer())
+        self.assert_match(('foo', 1), of)
+        self.assert_no_match((1, 'foo'), of)
+        self.assert_no_match(('foo',), of)
+        self.assert_no_match(('foo', 1, 2), of)
+
+    def test_positional__empty(self):
+        self.assert_match((), ())
+        self.assert_no_match((1,), ())
+
+    def test_positional__matchers_not_applied_to_none(self):
+        captor = Captor()
+        self.assert_match((1,), (captor,))
+        self.assertEquals(1, captor.value)
+
+    test_repr = lambda self: self.assert_repr(__unit__.Tuple())
+    test_repr__positional = lambda self: self.assert_repr(
+        __unit__.Tuple(of=(str, int)))
+
+    # Assertion functions
+
+    def assert_match(self, value, of=None):
+        return super(Tuple, self).assert_match(__unit__.Tuple(of), value)
+
+    def assert_no_match(self, value, of=None):
+        return super(Tuple, self).assert_no_match(__unit__.Tuple(of), value)
+
+
+class Unordered(MatcherTestCase):
+    test_none = lambda self: self.assert_no_match(None, [])
+    test_empty_list = lambda self: self.assert_match([], [])
+    test_empty_tuple = lambda self: self.assert_match((), [])
+    test_some_set = lambda self: self.assert_no_match(set([1, 2]), [1, 2])
+
+    def test_values(self):
+        self.assert_match([1, 2, 3], [3, 1, 2])
+        self.assert_match(['a', 'b', 'a'], ['a', 'a', 'b'])
+        self.assert_no_match([1, 2, 3], [1, 2])
+        self.assert_no_match([1, 2, 2], [1, 1, 2])
+
+    def test_values__equal_but_different_types(self):
+        self.assert_match([1, 2.0], [2, 1.0])
+
+    def test_values__unhashable(self):
+        self.assert_match([[1], [2]], [[2], [1]])
+        self.assert_no_match([[1], [2]], [[2], [2]])
+
+    def test_values__mock_any(self):
+        self.assert_match([1, 'foo'], [mock.ANY, 1])
+
+    def test_matchers(self):
+        self.assert_match([1, 'foo', 2], [String(), 1, Integer()])
+        self.assert_no_match([1, 'foo', 'bar'], [String(), 1, Integer()])
+
+    def test_matchers__distinct_elements(self):
+        # both matchers accept 1, but only one of them accepts 2
+        self.assert_match([2, 1], [Eq(1), Integer()])
+        self.assert_no_match([1, 'a'], [Eq(1), Integer()])
+
+    def test_matchers__type_of_values(self):
+        self.assert_match([True, 1], [1, __unit__.InstanceOf(bool)])
+
+    def test_matchers__identity_of_values(self):
+        a, b = int('1' * 10), int('1' * 10)
+        matcher = __unit__.Unordered([Is(a), a])
+        self.assertTrue(matcher.match([a, b]))
+        self.assertTrue(matcher.match([b, a]))
+        self.assertFalse(matcher.match([b, b]))
+
+    def test_matchers__objects(self):
+        Person = collections.namedtuple('Person', ['age', 'name'])
+        self.assert_match([Person(1, 'y'), Person(1, 'x')],
+                          [Person(1, 'x'), Attrs(name='y')])
+        self.assert_no_match([Person(1, 'y'), Person(1, 'y')],
+                             [Person(1, 'x'), Attrs(name='y')])
+
+    def test_large_permutation(self):
+        expected = list(range(10000))
+        self.assert_match(list(reversed(expected)), expected)
+
+    test_repr = lambda self: self.assert_repr(
+        __unit__.Unordered([1, String()]))
+
+    # Assertion functions
+
+    def assert_match(self, value, elements):
+        return super(Unordered, self) \
+            .assert_match(__unit__.Unordered(elements), value)
+
+    def assert_no_match(self, value, elements):
+        return super(Unordered, self) \
+            .assert_no_match(__unit__.Unordered(elements), value)
+
+
+class ContainsSequence(MatcherTestCase):
+    test_none = lambda self: self.assert_no_match(None, [1])
+    test_some_number = lambda self: self.assert_no_match(42, [1])
+    test_some_set = lambda self: self.assert_no_match(set([1, 2]), [1, 2])
+
+    def test_invalid_arg(self):
+        with self.assertRaises(TypeError):
+            __unit__.ContainsSequence(set([1, 2]))
+
+    def test_empty_pattern(self):
+        self.assert_match([], [])
+        self.assert_match([1, 2], [])
+
+    def test_values(self):
+        self.assert_match([0, 1, 2, 3, 4], [1, 2, 3])
+        self.assert_match([1, 2, 1, 2, 1, 2, 3], [1, 2, 1, 2, 3])
+        self.assert_no_match([1, 2, 4, 3], [1, 2, 3])
+        self.assert_no_match([1, 2], [1, 2, 3])
+
+    def test_values__generator_pattern(self):
+        self.assert_match([0, 1, 2], (x for x in [1, 2]))
+
+    def test_values__non_plain(self):
+        self.assert_match([1, 2, 3], [mock.ANY, 3])
+        self.assert_no_match([1, 2, 3], [mock.ANY, 1])
+
+    def test_bytes(self):
+        self.assert_match(b'foo\r\nbar', b'\r\n')
+        self.assert_match(bytearray(b'foo\r\nbar'), [13, 10])
+        self.assert_match([102, 13, 10], b'\r\n')
+        self.assert_no_match(b'foo\nbar', b'\r\n')
+
+    def test_memoryview(self):
+        self.assert_match(memoryview(b'foo\r\nbar'), b'\r\n')
+        self.assert_match(memoryview(bytearray(b'foo\r\n')), [13, 10])
+        self.assert_no_match(memoryview(b'foo\nbar'), b'\r\n')
+        # not contiguous
+        self.assert_match(memoryview(b'f\ro\no')[::2], b'fo')
+        self.assert_no_match(memoryview(b'f\ro\no')[::2], b'\r\n')
+
+    def test_strings(self):
+        self.assert_match("Alice has a cat", "has")
+        self.assert_match(['h', 'a', 's'], "has")
+        self.assert_no_match("Alice has a cat", "dog")
+
+    def test_matchers(self):
+        pattern = [Integer(), String()]
+        self.assert_match([1, 2, 'foo'], pattern)
+        self.assert_no_match(['foo', 1], pattern)
+
+    test_repr = lambda self: self.assert_repr(
+        __unit__.ContainsSequence([1, String()]))
+
+    # Assertion functions
+
+    def assert_match(self, value, pattern):
+        return super(ContainsSequence, self) \
+            .assert_match(__unit__.ContainsSequence(pattern), value)
+
+    def assert_no_match(self, value, pattern):
+        return super(ContainsSequence, self) \
+            .assert_no_match(__unit__.ContainsSequence(pattern), value)
+
+
+class ContainsSubsequence(MatcherTestCase):
+    test_none = lambda self: self.assert_no_match(None, [1])
+    test_some_set = lambda self: self.assert_no_match(set([1, 2]), [1, 2])
+
+    def test_empty_pattern(self):
+        self.assert_match([], [])
+        self.assert_match([1, 2], [])
+
+    def test_values(self):
+        self.assert_match([0, 1, 2, 3], [1, 3])
+        self.assert_match([1, 2, 3], [1, 2, 3])
+        self.assert_no_match([0, 1, 2, 3], [3, 1])
+        self.assert_no_match([1, 2], [1, 1])
+
+    def test_matchers(self):
+        pattern = [Integer(), String(), Integer()]
+        self.assert_match([1, 'foo', None, 2], pattern)
+        self.assert_no_match([1, 2, 'foo'], pattern)
+
+    test_repr = lambda self: self.assert_repr(
+        __unit__.ContainsSubsequence([1, String()]))
+
+    # Assertion functions
+
+    def assert_match(self, value, pattern):
+        return super(ContainsSubsequence, self) \
+            .assert_match(__unit__.ContainsSubsequence(pattern), value)
+
+    def assert_no_match(self, value, pattern):
+        return super(ContainsSubsequence, self) \
+            .assert_no_match(__unit__.ContainsSubsequence(pattern), value)
+
+
 # Mappings
 
 class CustomDict(collections.MutableMapping):
@@ -319,6 +719,77 @@ class Dict(MatcherTestCase):
 
     test_repr = lambda self: self.assert_repr(__unit__.Dict())
 
+    def test_required__invalid_args(self):
+        with self.assertRaises(TypeError):
+            __unit__.Dict(required=['id'])
+        with self.assertRaises(TypeError):
+            __unit__.Dict(str, int, required={'id': int})
+        with self.assertRaises(TypeError):
+            __unit__.Dict(keys=str, required={'id': int})
+        with self.assertRaises(TypeError):
+            __unit__.Dict(extra=__unit__.Any())
+        with self.assertRaises(TypeError):
+            __unit__.Dict(required={'id': int}, extra=(str, int, float))
+
+    def test_required(self):
+        required = {'id': Integer(), 'name': str}
+        self.assert_match({'id': 1, 'name': 'foo'}, required=required)
+        self.assert_no_match({'id': 1}, required=required)
+        self.assert_no_match({'id': '1', 'name': 'foo'}, required=required)
+        self.assert_no_match({'id': 1, 'name': 'foo', 'other': None},
+                             required=required)
+
+    def test_required__exact_values(self):
+        self.assert_match({'type': 'user'}, required={'type': 'user'})
+        self.assert_no_match({'type': 'group'}, required={'type': 'user'})
+
+    def test_required__missing_key__defaultdict(self):
+        d = collections.defaultdict(int)
+        self.assert_no_match(d, required={'count': 0})
+        self.assertNotIn('count', d)
+
+    def test_required__extra_values(self):
+        required = {'id': int}
+        self.assert_match({'id': 1, 'a': 'x', 'b': [2]},
+                          required=required, extra=__unit__.Any())
+        self.assert_match({'id': 1, 'a': 'x', 'b': 'y'},
+                          required=required, extra=str)
+        self.assert_no_match({'id': 1, 'a': 'x', 'b': [2]},
+                             required=required, extra=str)
+
+    def test_required__extra_items(self):
+        required = {'id': int}
+        extra = (StartsWith('x-'), str)
+        self.assert_match({'id': 1, 'x-foo': 'bar'},
+                          required=required, extra=extra)
+        self.assert_no_match({'id': 1, 'foo': 'bar'},
+                             required=required, extra=extra)
+        self.assert_no_match({'id': 1, 'x-foo': 2},
+                             required=required, extra=extra)
+
+    def test_required__repr(self):
+        matcher = __unit__.Dict(required={'id': int, 'name': 'foo'},
+                                extra=__unit__.Any())
+        self.assert_repr(matcher)
+        self.assertIn("'id' => ", repr(matcher))
+        self.assertIn("'foo'", repr(matcher))
+
+    def test_keys__eq(self):
+        keys = Eq('a')
+        self.assert_match({'a': 1}, keys=keys, values=object)
+        self.assert_no_match({'a': 1, 'b': 2}, keys=keys, values=object)
+
+    def test_keys__eq__mock_any(self):
+        keys = Eq(mock.ANY)
+        self.assert_match({'a': 1, 'b': 2}, keys=keys, values=Integer())
+
+    def test_keys__in(self):
+        keys = In(set(['a', 'b']))
+        self.assert_match({'a': 1, 'b': 2}, keys=keys, values=object)
+        self.assert_no_match({'a': 1, 'c': 2}, keys=keys, values=object)
+        self.assert_no_match({'a': 1, 'b': 2, 'c': 3},
+                             keys=keys, values=object)
+
     # Assertion functions
 
     def assert_match(self, value, *args, **kwargs):
@@ -385,3 +856,330 @@ class OrderedDict(MatcherTestCase):
     def assert_no_match(self, value, *args, **kwargs):
         return super(OrderedDict, self) \
             .assert_no_match(__unit__.OrderedDict(*args, **kwargs), value)
+
+
+# Sampling
+
+class Sampling(MatcherTestCase):
+    LIST = list(range(100)) + ['foo']
+
+    def test_invalid_sample(self):
+        with self.assertRaises(ValueError):
+            __unit__.List(int, sample=0)
+        with self.assertRaises(ValueError):
+            __unit__.Dict(str, int, sample=-1)
+
+    def test_invalid_sampling(self):
+        with self.assertRaises(ValueError):
+            __unit__.List(int, sample=10, sampling='middle')
+
+    def test_first(self):
+        self.assert_match(self.LIST, __unit__.List(
+            int, sample=100, sampling='first'))
+        self.assert_no_match(self.LIST, __unit__.List(
+            int, sample=101, sampling='first'))
+
+    def test_last(self):
+        self.assert_no_match(self.LIST, __unit__.List(
+            int, sample=1, sampling='last'))
+        self.assert_match(self.LIST[:-1], __unit__.List(
+            int, sample=1, sampling='last'))
+
+    def test_random__deterministic(self):
+        results = [self.checked_indices(sample=10, seed=42)
+                   for _ in range(3)]
+        self.assertEquals(10, len(results[0]))
+        self.assertEquals(results[0], results[1])
+        self.assertEquals(results[0], results[2])
+        self.assertNotEqual(results[0], self.checked_indices(sample=10,
+                                                             seed=43))
+
+    def test_sample_larger_than_collection(self):
+        self.assert_no_match(self.LIST, __unit__.List(int, sample=1000))
+        self.assertEquals(list(range(101)),
+                          self.checked_indices(sample=1000))
+
+    def test_sequence(self):
+        matcher = __unit__.Sequence(int, sample=10, sampling='last')
+        self.assert_match(tuple(range(100)), matcher)
+
+    def test_set(self):
+        matcher = __unit__.Set(int, sample=10, sampling='first')
+        self.assert_match(set(range(100)), matcher)
+
+    def test_dict(self):
+        value = dict((str(i), i) for i in range(100))
+        self.assert_match(value, __unit__.Dict(str, int, sample=10))
+        self.assert_match(value, __unit__.Dict(of=__unit__.Any(), sample=10))
+        value['foo'] = 'bar'
+        self.assert_no_match(value, __unit__.Dict(
+            keys=str, values=int, sample=101))
+
+    @skipIf(_OrderedDict is None,
+            "requires Python 2.6 or the ordereddict package")
+    def test_ordereddict(self):
+        value = _OrderedDict((str(i), i) for i in range(100))
+        value['foo'] = 'bar'
+        self.assert_match(value, __unit__.OrderedDict(
+            str, int, sample=100, sampling='first'))
+        self.assert_no_match(value, __unit__.OrderedDict(
+            str, int, sample=1, sampling='last'))
+
+    def test_repr(self):
+        self.assertIn("random sample of 10, seed=0",
+                      repr(__unit__.List(int, sample=10)))
+        self.assertIn("last 5", repr(__unit__.Dict(
+            str, int, sample=5, sampling='last')))
+        self.assertNotIn("sample", repr(__unit__.List(int)))
+
+    # Utility code
+
+    def checked_indices(self, **kwargs):
+        checked = []
+
+        def record(index):
+            checked.append(index)
+            return True
+
+        __unit__.List(Matching(record), **kwargs).match(list(range(101)))
+        return checked
+
+
+# Parallel checking
+
+@skipIf(futures is None, "requires concurrent.futures")
+class Parallel(MatcherTestCase):
+    SIZE = __unit__.CollectionMatcher.CHUNK_SIZE * 8
+
+    def test_invalid_parallel(self):
+        with self.assertRaises(ValueError):
+            __unit__.List(int, parallel=0)
+
+    def test_invalid_executor(self):
+        with self.assertRaises(TypeError):
+            __unit__.List(int, executor=object())
+
+    def test_parallel_and_executor(self):
+        with futures.ThreadPoolExecutor(1) as executor:
+            with self.assertRaises(ValueError):
+                __unit__.List(int, parallel=2, executor=executor)
+
+    def test_parallel(self):
+        matcher = __unit__.List(int, parallel=4)
+        self.assert_match(list(range(self.SIZE)), matcher)
+        self.assert_no_match(list(range(self.SIZE)) + ['foo'], matcher)
+
+    def test_parallel__small_collection(self):
+        matcher = __unit__.List(int, parallel=4)
+        self.assert_match([1, 2, 3], matcher)
+        self.assert_no_match([1, 'two', 3], matcher)
+
+    def test_parallel__exception(self):
+        matcher = __unit__.List(Matching(lambda v: 1 / v), parallel=2)
+        with self.assertRaises(ZeroDivisionError):
+            matcher.match(list(range(self.SIZE)))
+
+    def test_parallel__stops_at_first_failure(self):
+        checked = []
+
+        def record(value):
+            checked.append(value)
+            return value != 0
+
+        with futures.ThreadPoolExecutor(1) as executor:
+            matcher = __unit__.List(Matching(record), executor=executor)
+            self.assert_no_match(list(range(self.SIZE)), matcher)
+        # the executor may have started on the next chunk already,
+        # but the rest should have been cancelled
+        self.assertLess(len(checked), self.SIZE)
+
+    def test_mapping(self):
+        value = dict((str(i), i) for i in range(self.SIZE))
+        self.assert_match(value, __unit__.Dict(str, int, parallel=2))
+        self.assert_match(value, __unit__.Mapping(of=__unit__.Any(),
+                                                  parallel=2))
+        value['foo'] = 'bar'
+        self.assert_no_match(value, __unit__.Dict(str, int, parallel=2))
+
+    def test_process_pool(self):
+        values = list(range(self.SIZE))
+        with futures.ProcessPoolExecutor(2) as executor:
+            self.assert_match(values, __unit__.List(int, executor=executor))
+            self.assert_no_match(values + ['foo'],
+                                 __unit__.List(int, executor=executor))
+
+    def test_process_pool__unpicklable_matcher(self):
+        matcher = Matching(lambda v: isinstance(v, int))
+        with futures.ProcessPoolExecutor(1) as executor:
+            self.assert_match(list(range(self.SIZE)),
+                              __unit__.List(matcher, executor=executor))
+
+
+class Shape(MatcherTestCase):
+    TEMPLATE = {'user': {'id': Integer(), 'tags': [str]},
+                'point': (int, int),
+                'version': 1}
+
+    def test_invalid_template(self):
+        with self.assertRaises(TypeError):
+            __unit__.Shape([int, str])
+        with self.assertRaises(TypeError):
+            __unit__.Shape({'tags': []})
+
+    def test_match(self):
+        matcher = __unit__.Shape(self.TEMPLATE)
+        self.assert_match(self.value(), matcher)
+        self.assertIsNone(matcher.explain(self.value()))
+
+    def test_match__other_sequences(self):
+        value = self.value()
+        value['user']['tags'] = ('foo', 'bar')
+        value['point'] = [0, 0]
+        self.assert_match(value, __unit__.Shape(self.TEMPLATE))
+
+    def test_no_match__leaf(self):
+        value = self.value()
+        value['user']['tags'][1] = 42
+        self.assert_mismatch(
+            value, "['user']['tags'][1]: expected <InstanceOf ")
+
+    def test_no_match__exact_value(self):
+        value = self.value()
+        value['version'] = 2
+        self.assert_mismatch(value, "['version']: expected ")
+
+    def test_no_match__missing_key(self):
+        value = self.value()
+        del value['user']['id']
+        self.assert_mismatch(value, "['user']: missing key 'id'")
+
+    def test_no_match__unexpected_key(self):
+        value = self.value()
+        value['extra'] = None
+        self.assert_mismatch(value, "<root>: unexpected keys 'extra'")
+
+    def test_no_match__string_as_sequence(self):
+        value = self.value()
+        value['user']['tags'] = 'foo'
+        self.assert_mismatch(value, "['user']['tags']: expected a sequence")
+
+    def test_no_match__tuple_length(self):
+        value = self.value()
+        value['point'] = (0, 0, 0)
+        self.assert_mismatch(value, "['point']: expected 2 elements, got 3")
+
+    def test_no_match__not_a_mapping(self):
+        self.assert_mismatch(None, "<root>: expected a mapping, got None")
+
+    def test_no_match__long_value(self):
+        value = self.value()
+        value['point'] = list(range(1000))
+        self.assert_mismatch(value, "['point']: expected 2 elements")
+
+        value['point'] = 'x' * 1000
+        explanation = __unit__.Shape(self.TEMPLATE).explain(value)
+        self.assertLess(len(explanation), 200)
+
+    def test_inexact(self):
+        value = self.value()
+        value['extra'] = None
+        self.assert_match(value, __unit__.Shape(self.TEMPLATE, exact=False))
+
+    def test_deep_nesting(self):
+        depth = 10000
+        template = value = 42
+        for _ in range(depth):
+            template = {'child': template}
+            value = {'child': value}
+        self.assert_match(value, __unit__.Shape(template))
+
+    def test_stops_at_first_failure(self):
+        checked = []
+
+        def record(value):
+            checked.append(value)
+            return value > 0
+
+        matcher = __unit__.Shape([Matching(record)])
+        self.assert_no_match([1, 0, 2, 3], matcher)
+        self.assertEqual([1, 0], checked)
+
+    def test_fingerprint(self):
+        self.assertEqual(__unit__.Shape(self.TEMPLATE).fingerprint(),
+                         __unit__.Shape(self.TEMPLATE).fingerprint())
+        self.assertNotEqual(
+            __unit__.Shape(self.TEMPLATE).fingerprint(),
+            __unit__.Shape(self.TEMPLATE, exact=False).fingerprint())
+
+    def test_repr(self):
+        self.assert_repr(__unit__.Shape(self.TEMPLATE))
+
+    # Utility functions
+
+    def value(self):
+        return {'user': {'id': 1, 'tags': ['foo', 'bar']},
+                'point': (0, 0),
+                'version': 1}
+
+    def assert_mismatch(self, value, description):
+        matcher = __unit__.Shape(self.TEMPLATE)
+        self.assert_no_match(value, matcher)
+        explanation = matcher.explain(value)
+        self.assertTrue(explanation.startswith(description),
+                        msg=explanation)
+        self.assertEqual(explanation, matcher.describe_mismatch(value))
+
+
+class DescribeMismatch(MatcherTestCase):
+    """Tests for explanations of mismatches in collections."""
+
+    def test_element(self):
+        self.assertEquals(
+            "element [2]: expected <Integer>, got 'foo'",
+            __unit__.List(of=Integer()).describe_mismatch([1, 2, 'foo']))
+
+    def test_nested_element(self):
+        matcher = __unit__.List(of=__unit__.List(of=Integer()))
+        self.assertEquals("element [1]: element [0]: expected <Integer>, "
+                          "got 'foo'",
+                          matcher.describe_mismatch([[1], ['foo']]))
+
+    def test_sampled_element(self):
+        matcher = __unit__.List(of=Integer(), sample=2, sampling='last')
+        self.assertEquals("element [2]: expected <Integer>, got 'foo'",
+                          matcher.describe_mismatch([1, 2, 'foo']))
+
+    def test_wrong_type(self):
+        self.assertTrue(__unit__.List(of=Integer())
+                        .describe_mismatch((1, 2))
+                        .startswith("expected <List"))
+
+    def test_tuple(self):
+        matcher = __unit__.Tuple(of=(String(), Integer()))
+        self.assertEquals("expected 2 elements, got 1",
+                          matcher.describe_mismatch(('foo',)))
+        self.assertEquals("element [1]: expected <Integer>, got 'bar'",
+                          matcher.describe_mismatch(('foo', 'bar')))
+
+    def test_dict(self):
+        matcher = __unit__.Dict(String(), Integer())
+        self.assertEquals("value for key 'b': expected <Integer>, got 'x'",
+                          matcher.describe_mismatch({'a': 1, 'b': 'x'}))
+        self.assertTrue(matcher.describe_mismatch({1: 1})
+                        .startswith("key 1: expected <String>"))
+
+    def test_dict__required(self):
+        matcher = __unit__.Dict(required={'id': Integer()})
+        self.assertEquals("missing key 'id'", matcher.describe_mismatch({}))
+        self.assertEquals("value for key 'id': expected <Integer>, got 'x'",
+                          matcher.describe_mismatch({'id': 'x'}))
+        self.assertEquals("unexpected keys 'foo'",
+                          matcher.describe_mismatch({'id': 1, 'foo': 2}))
+
+    def test_shape(self):
+        matcher = __unit__.Shape({'tags': [String()]})
+        self.assertEquals("['tags'][1]: expected <String>, got 2",
+                          matcher.describe_mismatch({'tags': ['foo', 2]}))
+
+    def test_match(self):
+        self.assertIsNone(__unit__.List(of=Integer()).describe_mismatch([1]))
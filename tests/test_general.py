@@ -1,6 +1,7 @@
 """
 Tests for general matchers.
 """
+import gc
 import sys
 
 from taipan.testing import skipIf, skipUnless
@@ -241,6 +242,12 @@ class Captor(MatcherTestCase):
         with self.assertRaisesRegexp(TypeError, r'captor'):
             __unit__.Captor(captor)
 
+    def test_fingerprint(self):
+        captor = __unit__.Captor()
+        self.assertNotEqual(__unit__.Captor().fingerprint(),
+                            captor.fingerprint())
+        self.assertIs(captor, captor.intern())
+
     def test_has_value__initial(self):
         captor = __unit__.Captor()
         self.assertFalse(captor.has_value())
@@ -295,3 +302,120 @@ class Captor(MatcherTestCase):
         captor = __unit__.Captor()
         captor.match(self.ARG)
         self.assertIn("(*)", repr(captor))
+
+    def test_repr__captured_later(self):
+        captor = __unit__.Captor()
+        repr(captor)
+        captor.match(self.ARG)
+        self.assertIn("(*)", repr(captor))
+
+
+# Caching
+
+class Cached(MatcherTestCase):
+
+    def test_ctor__invalid_matcher(self):
+        with self.assertRaises(TypeError):
+            __unit__.Cached(lambda _: True)
+
+    def test_ctor__invalid_maxsize(self):
+        with self.assertRaises(ValueError):
+            __unit__.Cached(__unit__.Any(), maxsize=0)
+
+    def test_match(self):
+        cached = self.cached_short()
+        self.assert_match(cached, 'foo')
+        self.assert_no_match(cached, 'foobar')
+
+    def test_match__hashable(self):
+        cached = self.cached_short()
+        self.assertTrue(cached.match('foo'))
+        self.assertTrue(cached.match('foo'))
+        self.assertEquals((1, 1, 128, 1), cached.cache_info())
+        self.assertEquals(1, self.calls)
+
+    def test_match__equal_values_of_different_types(self):
+        cached = __unit__.Cached(__unit__.Matching(self.count(
+            lambda v: isinstance(v, bool))))
+        self.assertFalse(cached.match(1))
+        self.assertTrue(cached.match(True))
+        self.assertEquals(2, self.calls)
+
+    def test_match__unhashable(self):
+        cached = self.cached_short()
+        value = ['f', 'o', 'o']
+        self.assertTrue(cached.match(value))
+        self.assertTrue(cached.match(value))
+        self.assertTrue(cached.match(list(value)))
+        self.assertEquals(2, self.calls)
+        self.assertEquals(2, cached.cache_info().currsize)
+
+    def test_match__unhashable__garbage_collected(self):
+        cached = self.cached_short()
+        value = self.Unhashable()
+        cached.match(value)
+        self.assertEquals(1, cached.cache_info().currsize)
+        del value
+        gc.collect()
+        self.assertEquals(0, cached.cache_info().currsize)
+
+    def test_match__exception(self):
+        cached = self.cached_short()
+        with self.assertRaises(TypeError):
+            cached.match(42)
+        self.assertEquals(0, cached.cache_info().currsize)
+
+    def test_lru_eviction(self):
+        cached = self.cached_short(maxsize=2)
+        cached.match('a')
+        cached.match('b')
+        cached.match('a')
+        cached.match('c')  # evicts 'b'
+        cached.match('a')
+        cached.match('b')
+        self.assertEquals((2, 4, 2, 2), cached.cache_info())
+
+    def test_unbounded(self):
+        cached = self.cached_short(maxsize=None)
+        for i in range(1000):
+            cached.match(str(i))
+        self.assertEquals(1000, cached.cache_info().currsize)
+
+    def test_cache_clear(self):
+        cached = self.cached_short()
+        cached.match('foo')
+        cached.cache_clear()
+        self.assertEquals((0, 0, 128, 0), cached.cache_info())
+
+    def test_fingerprint(self):
+        matcher = __unit__.Matching(len)
+        cached = __unit__.Cached(matcher)
+        cached.match('foo')
+        self.assertEquals(__unit__.Cached(matcher).fingerprint(),
+                          cached.fingerprint())
+
+    def test_repr(self):
+        cached = self.cached_short()
+        self.assertEquals("<Cached %r>" % (cached.matcher,), repr(cached))
+
+    # Utility code
+
+    def setUp(self):
+        super(Cached, self).setUp()
+        self.calls = 0
+
+    def count(self, predicate):
+        def counted(value):
+            self.calls += 1
+            return predicate(value)
+        return counted
+
+    def cached_short(self, **kwargs):
+        return __unit__.Cached(
+            __unit__.Matching(self.count(lambda v: len(v) < 5)), **kwargs)
+
+    class Unhashable(object):
+        __hash__ = None
+
+        def __len__(self):
+            return 0
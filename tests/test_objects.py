@@ -2,16 +2,23 @@
 Tests for object matchers.
 """
 import io
+import os
+import shutil
 try:
     from StringIO import StringIO
 except ImportError:
     StringIO = io.StringIO
+import tempfile
 
 from taipan.testing import skipIf, skipUnless
 
 from callee._compat import IS_PY3, asyncio
 import callee.objects as __unit__
-from tests import IS_PY34, IS_PY35, MatcherTestCase, python_code
+from callee.base import Eq, Matcher
+from callee.numbers import Integer
+from callee.operators import Less
+from callee.strings import Regex, StartsWith
+from tests import IS_PY34, IS_PY35, MatcherTestCase, mock, python_code
 
 
 class Bytes(MatcherTestCase):
@@ -187,3 +194,191 @@ class FileLike(MatcherTestCase):
     def assert_no_match(self, value, *args, **kwargs):
         return super(FileLike, self) \
             .assert_no_match(__unit__.FileLike(*args, **kwargs), value)
+
+
+@skipUnless(IS_PY3, "requires Python 3.x")
+class FileContent(MatcherTestCase):
+    CONTENT = b'%PDF-1.4\nAlice has a cat\n'
+
+    def setUp(self):
+        super(FileContent, self).setUp()
+        self.dir = tempfile.mkdtemp()
+        self.path = self.write_file('test.pdf', self.CONTENT)
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+        super(FileContent, self).tearDown()
+
+    test_none = lambda self: self.assert_no_match(None, size=0)
+    test_bool = lambda self: self.assert_no_match(False, size=0)
+    test_some_object = lambda self: self.assert_no_match(object(), size=0)
+
+    def test_ctor(self):
+        with self.assertRaises(ValueError):
+            __unit__.FileContent()
+        with self.assertRaises(TypeError):
+            __unit__.FileContent(u'foo')
+        with self.assertRaises(TypeError):
+            __unit__.FileContent(size=-1)
+        with self.assertRaises(TypeError):
+            __unit__.FileContent(size=True)
+        with self.assertRaises(ValueError):
+            __unit__.FileContent(size=0, maxsize=0)
+
+    def test_path(self):
+        self.assert_match(self.path, StartsWith(b'%PDF-'))
+        self.assert_match(self.path.encode('utf-8'), StartsWith(b'%PDF-'))
+        self.assert_no_match(self.path, StartsWith(b'GIF'))
+
+    @skipIf(not hasattr(os, 'fspath'), "requires Python 3.6+")
+    def test_path__pathlib(self):
+        import pathlib
+        self.assert_match(pathlib.Path(self.path), StartsWith(b'%PDF-'))
+
+    def test_path__missing(self):
+        self.assert_no_match(os.path.join(self.dir, 'missing'), size=0)
+
+    def test_path__directory(self):
+        self.assert_no_match(self.dir, size=Integer())
+
+    def test_descriptor(self):
+        fd = os.open(self.path, os.O_RDONLY)
+        try:
+            self.assert_match(fd, StartsWith(b'%PDF-'))
+            self.assertEqual(0, os.lseek(fd, 0, os.SEEK_CUR))
+        finally:
+            os.close(fd)
+
+    def test_file_object(self):
+        with open(self.path, 'rb') as f:
+            f.read(4)
+            self.assert_match(f, StartsWith(b'%PDF-'))
+            self.assertEqual(4, f.tell())
+
+    def test_file_object__unflushed(self):
+        with open(self.path, 'ab') as f:
+            f.write(b'EOF')
+            self.assert_match(f, size=len(self.CONTENT) + 3)
+
+    def test_file_object__closed(self):
+        with open(self.path, 'rb') as f:
+            pass
+        self.assert_no_match(f, size=Integer())
+
+    def test_bytesio(self):
+        buf = io.BytesIO(self.CONTENT)
+        self.assert_match(buf, self.CONTENT)
+        self.assert_match(buf, size=len(self.CONTENT))
+        self.assert_no_match(buf, StartsWith(b'GIF'))
+        buf.write(b'more')  # the buffer must have been released
+
+    def test_content__bytes(self):
+        self.assert_match(self.path, self.CONTENT)
+        self.assert_no_match(self.path, self.CONTENT[:-1])
+        self.assert_no_match(self.path, self.CONTENT[:-1] + b'?')
+
+    def test_content__regex(self):
+        self.assert_match(self.path, Regex(b'has a (cat|dog)', mode='search'))
+        self.assert_no_match(self.path, Regex(b'has a dog', mode='search'))
+
+    def test_empty_file(self):
+        path = self.write_file('empty', b'')
+        self.assert_match(path, b'')
+        self.assert_match(path, StartsWith(b''), size=0)
+        self.assert_no_match(path, StartsWith(b'%PDF-'))
+
+    def test_size(self):
+        self.assert_match(self.path, size=len(self.CONTENT))
+        self.assert_match(self.path, size=Less(1024))
+        self.assert_no_match(self.path, size=1)
+        self.assert_no_match(self.path, StartsWith(b'%PDF-'), size=1)
+
+    def test_size__no_mapping(self):
+        with mock.patch.object(__unit__.mmap, 'mmap') as mock_mmap:
+            self.assert_match(self.path, size=len(self.CONTENT))
+            self.assert_no_match(self.path, b'foo')
+        self.assertFalse(mock_mmap.called)
+
+    def test_cache(self):
+        matcher = __unit__.FileContent(StartsWith(b'%PDF-'))
+        self.assertTrue(matcher.match(self.path))
+        with mock.patch.object(__unit__.mmap, 'mmap') as mock_mmap:
+            self.assertTrue(matcher.match(self.path))
+        self.assertFalse(mock_mmap.called)
+
+        self.write_file('test.pdf', b'GIF89a')
+        self.assertFalse(matcher.match(self.path))
+
+    def test_mapped__python2(self):
+        size = len(self.CONTENT)
+        for content, expected in [(StartsWith(b'%PDF-'), True),
+                                  (self.CONTENT, True),
+                                  (b'x' * size, False)]:
+            matcher = __unit__.FileContent(content)
+            mapped = __unit__.map_file(None, self.path)
+            with mock.patch.object(__unit__, 'IS_PY3', False):
+                result = matcher._check_mapped(mapped, size)
+            self.assertEqual(expected, result is None, msg=result)
+            self.assertTrue(mapped.closed)
+
+    def test_cache__mapping_error(self):
+        matcher = __unit__.FileContent(StartsWith(b'%PDF-'))
+        with mock.patch.object(__unit__.mmap, 'mmap',
+                               side_effect=OSError("no memory")):
+            self.assertIn("no memory", matcher.describe_mismatch(self.path))
+        self.assertTrue(matcher.match(self.path))
+
+    def test_content_error(self):
+        class Failing(Matcher):
+            def match(self, value):
+                raise OSError("matcher failed")
+
+        matcher = __unit__.FileContent(Failing())
+        for _ in range(2):
+            with self.assertRaises(OSError):
+                matcher.match(self.path)
+        self.assertEqual(0, len(matcher._cache))
+
+    def test_cache__maxsize(self):
+        matcher = __unit__.FileContent(size=Integer(), maxsize=2)
+        for i in range(5):
+            matcher.match(self.write_file('file%s' % i, b'x' * i))
+        self.assertEqual(2, len(matcher._cache))
+        matcher.cache_clear()
+        self.assertEqual(0, len(matcher._cache))
+
+    def test_describe_mismatch(self):
+        matcher = __unit__.FileContent(StartsWith(b'GIF'), size=Integer())
+        self.assertIsNone(
+            __unit__.FileContent(size=Integer()).describe_mismatch(self.path))
+        self.assertIn('StartsWith', matcher.describe_mismatch(self.path))
+        self.assertIn('size', __unit__.FileContent(size=1)
+                      .describe_mismatch(self.path))
+        self.assertIn('expected a file', matcher.describe_mismatch(42.0))
+
+    def test_fingerprint(self):
+        self.assertEqual(
+            __unit__.FileContent(Eq(b'foo'), size=3).fingerprint(),
+            __unit__.FileContent(Eq(b'foo'), size=3).fingerprint())
+
+    def test_repr(self):
+        self.assert_repr(__unit__.FileContent(StartsWith(b'%PDF-')))
+        self.assert_repr(__unit__.FileContent(b'foo', size=3))
+
+    # Assertion functions
+
+    def assert_match(self, value, *args, **kwargs):
+        return super(FileContent, self) \
+            .assert_match(__unit__.FileContent(*args, **kwargs), value)
+
+    def assert_no_match(self, value, *args, **kwargs):
+        return super(FileContent, self) \
+            .assert_no_match(__unit__.FileContent(*args, **kwargs), value)
+
+    # Utility functions
+
+    def write_file(self, name, content):
+        path = os.path.join(self.dir, name)
+        with open(path, 'wb') as f:
+            f.write(content)
+        return path
@@ -3,8 +3,10 @@ Tests for operators' matchers.
 """
 from itertools import chain, combinations
 
+from taipan.testing import skipIf
+
 import callee.operators as __unit__
-from tests import MatcherTestCase
+from tests import MatcherTestCase, numpy
 
 
 class OperatorTestCase(MatcherTestCase):
@@ -54,6 +56,55 @@ class Less(OperatorTestCase):
         self.assert_no_match(ref | set([7]), ref)
         self.assert_no_match(set([0]), ref)
 
+    def test_compile(self):
+        self.assert_compiled(__unit__.Less(42), 0, -42, 3.14, 42, 84)
+
+    def test_match_many(self):
+        self.assert_match_many(__unit__.Less(42), [0, -42, 3.14, 42, 84])
+
+    @skipIf(numpy is None, "requires NumPy")
+    def test_match_many__array(self):
+        array = numpy.arange(100).reshape((10, 10))
+        self.assert_match_many(__unit__.Less(42), array)
+
+    def test_elementwise__invalid(self):
+        with self.assertRaises(ValueError):
+            __unit__.Less(42, elementwise='some')
+        with self.assertRaises(TypeError):
+            __unit__.Less(elementwise='all')
+
+    def test_elementwise__keyword_ref(self):
+        matcher = __unit__.Less(than=42, elementwise='all')
+        self.assertEquals(42, matcher.ref)
+        self.assertEquals('all', matcher.elementwise)
+
+    def test_elementwise__scalar(self):
+        super(Less, self).assert_match(__unit__.Less(42, elementwise='all'), 0)
+        matcher = __unit__.Less(42, elementwise='any')
+        super(Less, self).assert_no_match(matcher, 42)
+
+    @skipIf(numpy is None, "requires NumPy")
+    def test_elementwise__array(self):
+        array = numpy.arange(10)
+        matcher = __unit__.Less(10, elementwise='all')
+        super(Less, self).assert_match(matcher, array)
+        matcher = __unit__.Less(9, elementwise='all')
+        super(Less, self).assert_no_match(matcher, array)
+        matcher = __unit__.Less(1, elementwise='any')
+        super(Less, self).assert_match(matcher, array)
+        matcher = __unit__.Less(0, elementwise='any')
+        super(Less, self).assert_no_match(matcher, array)
+
+    @skipIf(numpy is None, "requires NumPy")
+    def test_elementwise__compile(self):
+        matcher = __unit__.Less(10, elementwise='all')
+        self.assert_compiled(matcher, numpy.arange(10), numpy.arange(11))
+
+    def test_elementwise__repr(self):
+        matcher = __unit__.Less(42, elementwise='any')
+        self.assert_repr(matcher, 42)
+        self.assertIn('any', repr(matcher))
+
     test_repr = lambda self: self.assert_repr(__unit__.Less(42))
 
     # Assertion functions
@@ -201,6 +252,10 @@ class GreaterOrEqual(OperatorTestCase):
 
 class Shorter(OperatorTestCase):
 
+    def test_elementwise(self):
+        with self.assertRaises(TypeError):
+            __unit__.Shorter(42, elementwise='all')
+
     def test_length_value(self):
         ref = 12
 
@@ -331,6 +386,14 @@ class LongerOrEqual(OperatorTestCase):
         for s in self.subsets(ref, strict=True):
             self.assert_no_match(list(s), ref)
 
+    def test_compile(self):
+        values = ['', 'x' * 2, 'x' * 3, [1, 2, 3, 4]]
+        self.assert_compiled(__unit__.LongerOrEqual(3), *values)
+
+    def test_match_many(self):
+        values = ['', 'x' * 2, 'x' * 3, [1, 2, 3, 4]]
+        self.assert_match_many(__unit__.LongerOrEqual(3), values)
+
     test_repr = lambda self: self.assert_repr(__unit__.LongerOrEqual(42))
 
     # Assertion functions
@@ -376,6 +439,43 @@ class Contains(OperatorTestCase):
         self.assert_match(set([None, ref]), ref)
         self.assert_match(set(range(ref + 1)), ref)
 
+    def test_compile(self):
+        values = [[], [42], set([None, 42]), list(range(10))]
+        self.assert_compiled(__unit__.Contains(42), *values)
+
+    def test_elementwise__list(self):
+        ref = [1, 2, 3]
+        matcher = __unit__.Contains(ref, elementwise='all')
+        super(Contains, self).assert_match(matcher, list(range(5)))
+        matcher = __unit__.Contains(ref, elementwise='all')
+        super(Contains, self).assert_no_match(matcher, [1, 2])
+        matcher = __unit__.Contains(ref, elementwise='any')
+        super(Contains, self).assert_match(matcher, [3])
+        matcher = __unit__.Contains(ref, elementwise='any')
+        super(Contains, self).assert_no_match(matcher, [4])
+
+    def test_elementwise__single_item(self):
+        matcher = __unit__.Contains('foo', elementwise='all')
+        super(Contains, self).assert_match(matcher, ['foo', 'bar'])
+        matcher = __unit__.Contains(42, elementwise='any')
+        super(Contains, self).assert_match(matcher, [42])
+
+    @skipIf(numpy is None, "requires NumPy")
+    def test_elementwise__array(self):
+        array = numpy.arange(5)
+        ref = [1, 2, 3]
+        matcher = __unit__.Contains(ref, elementwise='all')
+        super(Contains, self).assert_match(matcher, array)
+        matcher = __unit__.Contains(ref + [5], elementwise='all')
+        super(Contains, self).assert_no_match(matcher, array)
+        matcher = __unit__.Contains([5, 4], elementwise='any')
+        super(Contains, self).assert_match(matcher, array)
+        matcher = __unit__.Contains([5, 6], elementwise='any')
+        super(Contains, self).assert_no_match(matcher, array)
+
+    def test_elementwise__repr(self):
+        self.assert_repr(__unit__.Contains([1, 2], elementwise='all'), [1, 2])
+
     test_repr = lambda self: self.assert_repr(__unit__.Contains(42))
 
     # Assertion functions
@@ -431,6 +531,30 @@ class In(OperatorTestCase):
         for num in ref:
             self.assert_match(num, ref)
 
+    def test_compile(self):
+        self.assert_compiled(__unit__.In([1, 2, 3]), 0, 1, 3, None)
+
+    @skipIf(numpy is None, "requires NumPy")
+    def test_match_many__array(self):
+        array = numpy.arange(10)
+        self.assert_match_many(__unit__.In([1, 2, 3]), array)
+        self.assert_match_many(__unit__.In(set([5, 8, 42])), array)
+
+        strings = numpy.array(['a', 'bc', 'abc'])
+        self.assert_match_many(__unit__.In('abc'), strings)
+
+    @skipIf(numpy is None, "requires NumPy")
+    def test_elementwise__array(self):
+        array = numpy.arange(3)
+        matcher = __unit__.In([0, 1, 2], elementwise='all')
+        super(In, self).assert_match(matcher, array)
+        matcher = __unit__.In([0, 1], elementwise='all')
+        super(In, self).assert_no_match(matcher, array)
+        matcher = __unit__.In([2, 3], elementwise='any')
+        super(In, self).assert_match(matcher, array)
+        matcher = __unit__.In([3, 4], elementwise='any')
+        super(In, self).assert_no_match(matcher, array)
+
     test_repr = lambda self: self.assert_repr(__unit__.In(()))
 
     # Assertion functions
@@ -0,0 +1,173 @@
+"""
+Tests for profiling of matchers.
+"""
+import json
+import os
+import pstats
+import shutil
+import tempfile
+
+from taipan.testing import skipIf
+
+from callee._compat import futures
+from callee.base import And, BaseMatcher, Eq
+from callee.collections import List
+from callee.general import Matching
+from callee.numbers import Integer
+from callee.operators import Greater
+import callee.profiling as __unit__
+from tests import TestCase
+
+
+class Instrument(TestCase):
+
+    def test_restores_original_methods(self):
+        match = Integer.match
+        with __unit__.instrument():
+            self.assertIsNot(match, Integer.match)
+        self.assertIs(match, Integer.match)
+
+    def test_nested__error(self):
+        with __unit__.instrument():
+            with self.assertRaises(RuntimeError):
+                with __unit__.instrument():
+                    pass
+
+    def test_class_stats(self):
+        with __unit__.instrument() as profile:
+            self.match_values()
+
+        stats = profile.as_dict()['classes']
+        self.assertEquals(
+            dict(calls=4, matches=2, mismatches=2, errors=0),
+            self.counts(stats['callee.base.And']))
+        self.assertEquals(
+            dict(calls=4, matches=3, mismatches=1, errors=0),
+            self.counts(stats['callee.numbers.Integer']))
+        self.assertEquals(
+            dict(calls=3, matches=2, mismatches=1, errors=0),
+            self.counts(stats['callee.operators.Greater']))
+
+    def test_instance_stats(self):
+        with __unit__.instrument() as profile:
+            Eq(1).match(1)
+            Eq(1).match(2)
+            Eq(2).match(2)
+
+        stats = profile.as_dict()['instances']
+        self.assertEquals(dict(calls=2, matches=1, mismatches=1, errors=0),
+                          self.counts(stats['<... == 1>']))
+        self.assertEquals(dict(calls=1, matches=1, mismatches=0, errors=0),
+                          self.counts(stats['<... == 2>']))
+
+    @skipIf(futures is None, "requires concurrent.futures")
+    def test_multiple_threads(self):
+        matcher = List(of=Matching(lambda x: x >= 0), parallel=4)
+        with __unit__.instrument() as profile:
+            for _ in range(3):
+                self.assertTrue(matcher.match(list(range(5000))))
+
+        stats = profile.as_dict()['classes']
+        self.assertEquals(
+            dict(calls=15000, matches=15000, mismatches=0, errors=0),
+            self.counts(stats['callee.general.Matching']))
+
+    def test_equality_comparisons(self):
+        with __unit__.instrument() as profile:
+            self.assertTrue(Integer() == 42)
+        stats = profile.as_dict()['classes']['callee.numbers.Integer']
+        self.assertEquals(1, stats['calls'])
+
+    def test_exceptions(self):
+        matcher = Matching(lambda v: 1 / v)
+        with __unit__.instrument() as profile:
+            with self.assertRaises(ZeroDivisionError):
+                matcher.match(0)
+            matcher.match(1)
+
+        stats = profile.as_dict()['classes']['callee.general.Matching']
+        self.assertEquals(dict(calls=2, matches=1, mismatches=0, errors=1),
+                          self.counts(stats))
+
+    def test_super_calls_counted_once(self):
+        class Positive(Greater):
+            def __init__(self):
+                super(Positive, self).__init__(0)
+
+            def match(self, value):
+                return super(Positive, self).match(value)
+
+        with __unit__.instrument() as profile:
+            Positive().match(1)
+
+        stats = profile.as_dict()['classes']
+        self.assertEquals(1, stats[self.qualname(Positive)]['calls'])
+        self.assertNotIn('callee.operators.Greater', stats)
+
+    def test_times(self):
+        with __unit__.instrument() as profile:
+            self.match_values()
+
+        stats = profile.as_dict()['classes']
+        and_stats = stats['callee.base.And']
+        self.assertGreater(and_stats['total_time'], and_stats['own_time'])
+        self.assertGreaterEqual(and_stats['total_time'],
+                                and_stats['max_time'])
+
+    def test_not_recording_after_stop(self):
+        matcher = Integer()
+        with __unit__.instrument() as profile:
+            match = matcher.match
+        match(42)
+        self.assertEmpty(profile.as_dict()['classes'])
+
+    def test_dump_json(self):
+        with __unit__.instrument() as profile:
+            self.match_values()
+
+        filename = os.path.join(self.tempdir, 'profile.json')
+        profile.dump_json(filename)
+        with open(filename) as f:
+            self.assertEquals(profile.as_dict(), json.load(f))
+
+    def test_dump_stats(self):
+        with __unit__.instrument() as profile:
+            self.match_values()
+
+        filename = os.path.join(self.tempdir, 'profile.prof')
+        profile.dump_stats(filename)
+        stats = pstats.Stats(filename)
+        self.assertEquals(11, stats.total_calls)
+
+        functions = dict((func[2], value)
+                         for func, value in stats.stats.items())
+        _, _, _, _, callers = functions['Integer.match']
+        self.assertEquals(['And.match'], [c[2] for c in callers])
+
+    def test_list_matcher_classes(self):
+        classes = __unit__.list_matcher_classes()
+        self.assertIn(BaseMatcher, classes)
+        self.assertIn(And, classes)
+        self.assertIn(Integer, classes)
+
+    # Utility code
+
+    def setUp(self):
+        super(Instrument, self).setUp()
+        self.tempdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tempdir)
+        super(Instrument, self).tearDown()
+
+    def match_values(self):
+        matcher = Integer() & Greater(0)
+        for value in (1, -1, 'foo', 3):
+            matcher.match(value)
+
+    def counts(self, stats):
+        return dict((key, stats[key])
+                    for key in ('calls', 'matches', 'mismatches', 'errors'))
+
+    def qualname(self, class_):
+        return '%s.%s' % (class_.__module__, class_.__name__)
@@ -0,0 +1,198 @@
+"""
+Tests for call recorders.
+"""
+import io
+try:
+    import unittest.mock as mock
+except ImportError:
+    import mock
+
+from callee.base import Eq, Is, Not
+from callee.collections import Iterable
+from callee.general import Any
+from callee.numbers import Integer
+from callee.operators import Greater, In
+import callee.recorders as __unit__
+from callee.strings import String
+from callee.types import InstanceOf
+from tests import TestCase
+
+
+class CallRecorder(TestCase):
+
+    def test_invalid_wrapped(self):
+        with self.assertRaises(TypeError):
+            __unit__.CallRecorder(42)
+
+    def test_call__no_wrapped(self):
+        recorder = __unit__.CallRecorder()
+        self.assertIsNone(recorder(1, foo='bar'))
+        self.assertEquals([((1,), {'foo': 'bar'})], recorder.calls)
+        self.assertEquals(1, recorder.call_count)
+
+    def test_call__wrapped(self):
+        recorder = __unit__.CallRecorder(lambda x, y=0: x + y)
+        self.assertEquals(42, recorder(40, y=2))
+        self.assertEquals([((40,), {'y': 2})], recorder.calls)
+
+    def test_mock_wraps(self):
+        recorder = __unit__.CallRecorder()
+        mock_foo = mock.Mock(wraps=recorder)
+        mock_foo(42)
+        recorder.assert_any_call(42)
+
+    def test_invalid_max_items(self):
+        with self.assertRaises(ValueError):
+            __unit__.CallRecorder(max_items=0)
+
+    def test_tee_iterators(self):
+        consumed = []
+
+        def consume(*args, **kwargs):
+            for iterable in args + tuple(kwargs.values()):
+                consumed.extend(iterable)
+
+        recorder = __unit__.CallRecorder(consume, tee_iterators=True)
+        recorder(x * 2 for x in range(3))
+        recorder(items=iter(['foo']))
+        self.assertEquals([0, 2, 4, 'foo'], consumed)
+
+        recorder.assert_any_call(Iterable(of=Integer()))
+        recorder.assert_any_call(items=Iterable(of=String()))
+        self.assertEmpty(recorder.find_calls(Iterable(of=String())))
+
+    def test_tee_iterators__generator_send(self):
+        def echo():
+            value = None
+            while True:
+                value = yield value
+
+        def talk(gen):
+            next(gen)
+            return [gen.send(x) for x in (1, 2)]
+
+        recorder = __unit__.CallRecorder(talk, tee_iterators=True)
+        self.assertEquals([1, 2], recorder(echo()))
+        recorder.assert_any_call(Iterable(of=Any()))
+
+    def test_tee_iterators__file(self):
+        recorder = __unit__.CallRecorder(lambda f: f.read(),
+                                         tee_iterators=True)
+        with io.StringIO(u'foo\nbar\n') as f:
+            self.assertEquals(u'foo\nbar\n', recorder(f))
+            recorder.assert_any_call(Is(f))
+
+    def test_tee_iterators__max_items(self):
+        recorder = __unit__.CallRecorder(list, tee_iterators=True,
+                                         max_items=2)
+        recorder(iter([1, 2, 'three']))
+        recorder.assert_any_call(Iterable(of=Integer()))
+
+    def test_tee_iterators__disabled(self):
+        recorder = __unit__.CallRecorder(list)
+        recorder(x for x in range(3))
+        with self.assertRaises(ValueError):
+            recorder.find_calls(Iterable(of=Integer()))
+
+    def test_reset(self):
+        recorder = self.recorder_with_calls()
+        recorder.reset()
+        self.assertEquals(0, recorder.call_count)
+        self.assertEmpty(recorder.find_calls(Any()))
+
+    def test_find_calls__no_calls(self):
+        recorder = __unit__.CallRecorder()
+        self.assertEquals([], recorder.find_calls(42))
+
+    def test_find_calls__values(self):
+        recorder = self.recorder_with_calls()
+        self.assertEquals([((42,), {})], recorder.find_calls(42))
+        self.assertEquals([((42,), {})], recorder.find_calls(42.0))
+        self.assertEquals([(('foo',), {})], recorder.find_calls('foo'))
+        self.assertEquals([], recorder.find_calls('qux'))
+
+    def test_find_calls__signature(self):
+        recorder = self.recorder_with_calls()
+        self.assertEquals([((1, 2), {'three': 3})],
+                          recorder.find_calls(Any(), Any(), three=Any()))
+        self.assertEquals([], recorder.find_calls(Any(), three=Any()))
+        self.assertEquals([], recorder.find_calls(Any(), Any(), four=Any()))
+
+    def test_find_calls__eq_is(self):
+        recorder = self.recorder_with_calls()
+        self.assertEquals([((42,), {})], recorder.find_calls(Eq(42)))
+        self.assertEquals([((None,), {})], recorder.find_calls(Is(None)))
+
+    def test_find_calls__in(self):
+        recorder = self.recorder_with_calls()
+        self.assertEquals([((42,), {}), (('foo',), {})],
+                          recorder.find_calls(In(['foo', 42, 'qux'])))
+        self.assertEquals([((42,), {})],
+                          recorder.find_calls(In(list(range(100)))))
+
+    def test_find_calls__types(self):
+        recorder = self.recorder_with_calls()
+        self.assertEquals([((42,), {})], recorder.find_calls(Integer()))
+        self.assertEquals([(('foo',), {})], recorder.find_calls(String()))
+        self.assertEquals([(([1, 2],), {})],
+                          recorder.find_calls(InstanceOf(list, exact=True)))
+
+    def test_find_calls__types__fake_class(self):
+        class Foo(object):
+            pass
+
+        recorder = __unit__.CallRecorder()
+        arg = mock.Mock(spec=Foo)
+        recorder(arg)
+        recorder(42)
+        self.assertEquals([((arg,), {})],
+                          recorder.find_calls(InstanceOf(Foo)))
+        recorder.assert_any_call(InstanceOf(Foo))
+
+    def test_find_calls__combinators(self):
+        recorder = self.recorder_with_calls()
+        self.assertEquals([((42,), {})],
+                          recorder.find_calls(Integer() & Greater(0)))
+        self.assertEquals([((42,), {}), (('foo',), {})],
+                          recorder.find_calls(Integer() | String()))
+        self.assertEquals(3, len(recorder.find_calls(~Is(None))))
+
+    def test_find_calls__unindexed_values(self):
+        recorder = self.recorder_with_calls()
+        self.assertEquals([(([1, 2],), {})], recorder.find_calls([1, 2]))
+        self.assertEquals(4, len(recorder.find_calls(mock.ANY)))
+        self.assertEquals(1, len(recorder.find_calls(mock.ANY, mock.ANY,
+                                                     three=3)))
+
+    def test_find_calls__custom_eq(self):
+        class EqualsEverything(object):
+            __hash__ = object.__hash__
+
+            def __eq__(self, other):
+                return True
+
+        recorder = __unit__.CallRecorder()
+        recorder(EqualsEverything())
+        self.assertEquals(1, len(recorder.find_calls(42)))
+
+    def test_assert_any_call(self):
+        recorder = self.recorder_with_calls()
+        recorder.assert_any_call(42)
+        recorder.assert_any_call(1, Integer(), three=Not(String()))
+        with self.assertRaises(AssertionError) as r:
+            recorder.assert_any_call(String(), foo=13)
+        self.assertIn("call(<String>, foo=13)", str(r.exception))
+
+    def test_repr(self):
+        self.assertIn('5', repr(self.recorder_with_calls()))
+
+    # Utility code
+
+    def recorder_with_calls(self):
+        recorder = __unit__.CallRecorder()
+        recorder(42)
+        recorder('foo')
+        recorder(None)
+        recorder([1, 2])
+        recorder(1, 2, three=3)
+        return recorder
@@ -1,15 +1,20 @@
 """
 Tests for string matchers.
 """
+import array
 import fnmatch
 from itertools import combinations
+import mmap
 import re
 
 from taipan.testing import skipIf, skipUnless
 
 from callee._compat import IS_PY3
+from callee.base import Or
+from callee.numbers import Integer
+from callee.operators import Contains
 import callee.strings as __unit__
-from tests import MatcherTestCase
+from tests import MatcherTestCase, mock, numpy
 
 
 # String type matchers
@@ -101,6 +106,39 @@ class StartsWith(MatcherTestCase):
         self.assert_no_match(u'foo', u'b')
         self.assert_no_match(u'', u'foo')
 
+    @skipUnless(IS_PY3, "requires Python 3.x")
+    def test_buffers(self):
+        self.assert_match(memoryview(b'foo'), b'fo')
+        self.assert_match(memoryview(b'foo'), (b'bar', b'fo'))
+        self.assert_match(memoryview(b'foo')[::2], b'fo')
+        self.assert_match(array.array('B', b'foo'), b'f')
+        self.assert_no_match(memoryview(b'foo'), b'foobar')
+        self.assert_no_match(memoryview(b'foo'), 'fo')
+        self.assert_no_match(array.array('H', [1]), b'\x00')
+
+    @skipUnless(IS_PY3, "requires Python 3.x")
+    def test_buffers__mmap(self):
+        buf = mmap.mmap(-1, 16)
+        buf.write(b'foo')
+        self.assert_match(buf, b'foo')
+        buf.close()  # would fail if the matcher kept a view of it
+
+    @skipUnless(IS_PY3, "requires Python 3.x")
+    def test_buffers__compile(self):
+        values = [b'foo', memoryview(b'foo'), bytearray(b'bar')]
+        self.assert_compiled(__unit__.StartsWith(b'fo'), *values)
+        self.assert_match_many(__unit__.StartsWith(b'fo'), values)
+
+    @skipUnless(IS_PY3, "requires Python 3.x")
+    def test_buffers__match_many__iterator(self):
+        values = iter([b'abc', memoryview(b'abc'), b'abd', b'x'])
+        self.assertEquals([True, True, True, False],
+                          __unit__.StartsWith(b'ab').match_many(values))
+
+    def test_non_string(self):
+        with self.assertRaises(AttributeError):
+            __unit__.StartsWith('foo').match(42)
+
     test_repr = lambda self: self.assert_repr(__unit__.StartsWith(''))
 
     # Assertion functions
@@ -145,6 +183,27 @@ class EndsWith(MatcherTestCase):
         self.assert_no_match(u'bar ', u'r')
         self.assert_no_match(u'', u'bar')
 
+    @skipUnless(IS_PY3, "requires Python 3.x")
+    def test_buffers(self):
+        self.assert_match(memoryview(b'foo'), b'oo')
+        self.assert_match(memoryview(b'foo'), b'')
+        self.assert_match(memoryview(b'foo'), (b'bar', b'o'))
+        self.assert_match(bytearray(b'foo'), b'foo')
+        self.assert_no_match(memoryview(b'foo'), b'xfoo')
+        self.assert_no_match(memoryview(b'foo'), b'f')
+
+    @skipUnless(IS_PY3, "requires Python 3.x")
+    def test_buffers__compile(self):
+        values = [b'foo', memoryview(b'foo'), bytearray(b'bar')]
+        self.assert_compiled(__unit__.EndsWith(b'oo'), *values)
+        self.assert_match_many(__unit__.EndsWith(b'oo'), values)
+
+    @skipUnless(IS_PY3, "requires Python 3.x")
+    def test_buffers__match_many__iterator(self):
+        values = iter([b'abc', memoryview(b'abc'), b'xbc', b'x'])
+        self.assertEquals([True, True, True, False],
+                          __unit__.EndsWith(b'bc').match_many(values))
+
     test_repr = lambda self: self.assert_repr(__unit__.EndsWith(''))
 
     # Assertion functions
@@ -215,12 +274,51 @@ class Glob(PatternTestCase):
         self.assert_match('FoO', 'fOo', case=False)
 
     def test_system_case(self):
-        # Just test that the fnmatch function is picked correctly,
-        # since the actual match result is system-dependent by definition.
-        self.assertIs(fnmatch.fnmatch, __unit__.Glob('').fnmatch)
-        self.assertIs(fnmatch.fnmatch,
-                      __unit__.Glob('', case='system').fnmatch)
-        self.assertIs(fnmatch.fnmatch, __unit__.Glob('', case=None).fnmatch)
+        # The actual match result is system-dependent by definition,
+        # so just test that it's the same as with fnmatch.
+        for case in ('system', None):
+            glob = __unit__.Glob('foo*', case=case)
+            self.assertEquals('system', glob.case)
+            for value in ('foo', 'Foo', 'FOOBAR', 'bar'):
+                self.assertEquals(fnmatch.fnmatch(value, 'foo*'),
+                                  glob.match(value))
+
+    def test_invalid_case(self):
+        with self.assertRaises(ValueError):
+            __unit__.Glob('', case='foo')
+        with self.assertRaises(ValueError):
+            __unit__.Glob('', case=1)
+
+    def test_bytes(self):
+        self.assert_match(b'foo.txt', b'*.txt')
+        self.assert_no_match(b'foo.py', b'*.txt')
+
+    @skipUnless(IS_PY3, "requires Python 3.x")
+    @skipUnless(IS_PY3, "requires Python 3.x")
+    def test_buffers(self):
+        self.assert_match(memoryview(b'foo.txt'), b'*.txt', case=True)
+        self.assert_match(memoryview(b'foo.TXT'), b'*.txt', case=False)
+        self.assert_match(bytearray(b'FOO.txt'), b'foo.*', case=False)
+        self.assert_no_match(memoryview(b'foo.txt'), b'*.TXT', case=True)
+
+    def test_case_insensitive__casefold(self):
+        self.assert_match('STRASSE', 'stra\u00dfe', case=False)
+
+    def test_pattern_cache(self):
+        cache = __unit__.Glob.PATTERN_CACHE
+        glob = __unit__.Glob('*.cached')
+        self.assertIs(glob._regex, __unit__.Glob('*.cached')._regex)
+        self.assertLessEqual(len(cache), cache.maxsize)
+
+    def test_compile(self):
+        values = ['', 'foo', 'foobar', 'Foo', 'bar']
+        self.assert_compiled(__unit__.Glob('foo*'), *values)
+        self.assert_compiled(__unit__.Glob('foo*', case=False), *values)
+
+    def test_match_many(self):
+        values = ['', 'foo', 'foobar', 'Foo', 'bar']
+        self.assert_match_many(__unit__.Glob('foo*'), values)
+        self.assert_match_many(__unit__.Glob('foo*', case=False), values)
 
     test_repr = lambda self: self.assert_repr(__unit__.Glob('*'))
 
@@ -263,13 +361,261 @@ class Regex(PatternTestCase):
             square_pattern = ''.join('[%s]' % char for char in suffix)
             self.assert_match(text + suffix, re.escape(text) + square_pattern)
 
+    def test_compile(self):
+        values = ['', 'foo', 'foobar', 'Foo', 'bar']
+        self.assert_compiled(__unit__.Regex('fo+'), *values)
+        self.assert_compiled(__unit__.StartsWith('fo'), *values)
+        self.assert_compiled(__unit__.EndsWith('ar'), *values)
+        self.assert_compiled(__unit__.String(), None, 42, *values)
+
+    def test_match_many(self):
+        values = ['', 'foo', 'foobar', 'Foo', 'bar']
+        self.assert_match_many(__unit__.Regex('fo+'), values)
+        self.assert_match_many(__unit__.StartsWith('fo'), values)
+        self.assert_match_many(__unit__.EndsWith('ar'), values)
+
+    @skipIf(numpy is None, "requires NumPy")
+    def test_match_many__array(self):
+        array = numpy.array(['', 'foo', 'foobar', 'Foo', 'bar'])
+        self.assert_match_many(__unit__.Regex('fo+'), array)
+        self.assert_match_many(__unit__.StartsWith('fo'), array)
+        self.assert_match_many(__unit__.EndsWith('ar'), array)
+
+    @skipIf(numpy is None, "requires NumPy")
+    def test_match_many__array__tuple(self):
+        array = numpy.array(['ab', 'cd', 'ef', 'bc'])
+        self.assertEquals(
+            [True, True, False, False],
+            list(__unit__.StartsWith(('a', 'c')).match_many(array)))
+        self.assertEquals(
+            [False, True, False, True],
+            list(__unit__.EndsWith(('c', 'd')).match_many(array)))
+        self.assert_match_many(__unit__.StartsWith(('a', 'c')), array)
+        self.assert_match_many(__unit__.EndsWith(()), array)
+
+    def test_mode__search(self):
+        self.assert_match('foo', 'o+', mode='search')
+        self.assert_match('o', 'o+', mode='search')
+        self.assert_no_match('bar', 'o+', mode='search')
+
+    def test_mode__fullmatch(self):
+        self.assert_match('fo', 'fo|foo', mode='fullmatch')
+        self.assert_match('foo', 'fo|foo', mode='fullmatch')
+        self.assert_no_match('fooo', 'fo|foo', mode='fullmatch')
+        self.assert_no_match('afo', 'fo|foo', mode='fullmatch')
+
+    def test_mode__compile(self):
+        values = ['', 'foo', 'foobar', 'bar', 'barfoo']
+        for mode in __unit__.Regex.MODES:
+            self.assert_compiled(__unit__.Regex('fo+', mode=mode), *values)
+            self.assert_match_many(__unit__.Regex('fo+', mode=mode), values)
+
+    def test_invalid_mode(self):
+        with self.assertRaises(ValueError):
+            __unit__.Regex('foo', mode='find')
+
+    def test_invalid_engine(self):
+        with self.assertRaises(ValueError):
+            __unit__.Regex('foo', engine='pcre')
+
+    def test_engine(self):
+        # pretend that re is a third-party module
+        with mock.patch.dict('sys.modules', {'re2': re}):
+            matcher = __unit__.Regex('fo+', mode='search', engine='re2')
+        self.assertEqual('re2', matcher.engine)
+        self.assertTrue(matcher.match('afoo'))
+        self.assertFalse(matcher.match('bar'))
+
+    def test_engine__not_installed(self):
+        with mock.patch.dict('sys.modules', {'re2': None}):
+            with self.assertRaises(ImportError):
+                __unit__.Regex('foo', engine='re2')
+
+    @skipUnless(IS_PY3, "requires Python 3.x")
+    def test_buffers(self):
+        for mode in __unit__.Regex.MODES:
+            self.assert_match(memoryview(b'foo'), b'fo+', mode=mode)
+            self.assert_match(bytearray(b'foo'), b'fo+', mode=mode)
+            self.assert_no_match(memoryview(b'bar'), b'fo+', mode=mode)
+
+    def test_pattern_cache(self):
+        pattern = 'test_pattern_cache'
+        self.assertIs(__unit__.Regex(pattern).pattern,
+                      __unit__.Regex(pattern).pattern)
+        self.assertIsNot(__unit__.Regex(pattern).pattern,
+                         __unit__.Regex(pattern, re.IGNORECASE).pattern)
+        self.assertIsNot(__unit__.Regex(pattern).pattern,
+                         __unit__.Regex(pattern.encode('ascii')).pattern)
+
     test_repr = lambda self: self.assert_repr(__unit__.Regex('.'))
 
+    def test_repr__mode(self):
+        matcher = __unit__.Regex('.', mode='search')
+        self.assert_repr(matcher)
+        self.assertIn('search', repr(matcher))
+
+    def test_repr__cached(self):
+        matcher = __unit__.Regex('fo+', mode='search')
+        self.assertIs(repr(matcher), repr(matcher))
+
+    def test_equivalent_removed(self):
+        a, b = __unit__.Regex('fo+'), __unit__.Regex('fo+')
+        self.assertEquals(a.fingerprint(), b.fingerprint())
+        self.assertEquals([a], (a | b)._matchers)
+
     # Assertion functions
 
-    def assert_match(self, value, pattern):
-        return super(Regex, self).assert_match(__unit__.Regex(pattern), value)
+    def assert_match(self, value, pattern, mode=None):
+        return super(Regex, self) \
+            .assert_match(__unit__.Regex(pattern, mode=mode), value)
 
-    def assert_no_match(self, value, pattern):
+    def assert_no_match(self, value, pattern, mode=None):
         return super(Regex, self) \
-            .assert_no_match(__unit__.Regex(pattern), value)
+            .assert_no_match(__unit__.Regex(pattern, mode=mode), value)
+
+
+class AnyOf(MatcherTestCase):
+    VALUES = ['', '/', '/api', '/api/', '/api/users/42', '/apix',
+              '/static/app.js', '/static/style.css', '/static/img/a.png',
+              '/user/1', '/user/x', '/USER/1', 'index.html', 'README',
+              'a token here', 'tok', 'aa', 'ab', 'abab']
+
+    def test_invalid(self):
+        with self.assertRaises(AssertionError):
+            __unit__.AnyOf()
+        with self.assertRaises(AssertionError):
+            __unit__.AnyOf('foo')
+
+    def test_same_as_or(self):
+        matchers = [
+            __unit__.StartsWith('/api/'),
+            __unit__.StartsWith(('/static/', '/user/')),
+            __unit__.EndsWith('.html'),
+            __unit__.EndsWith(('.js', '.png')),
+            Contains('token'),
+            __unit__.Glob('*/*.CSS', case=False),
+            __unit__.Glob('/static/*/?.png'),
+            __unit__.Regex(r'/user/\d+$'),
+            __unit__.Regex(r'readme', re.IGNORECASE),
+            __unit__.Regex(r'(a)b\1'),  # can't be merged
+            __unit__.Regex(r'tok|x', mode='fullmatch'),
+            __unit__.Regex(r'\.png|js', mode='search'),
+        ]
+        for i in range(len(matchers)):
+            subset = matchers[:i + 1]
+            self.assert_same_as_or(subset, self.VALUES)
+            self.assert_same_as_or(subset[::-1], self.VALUES)
+
+    def test_prefixes(self):
+        prefixes = ['/api/v%d/' % i for i in range(100)] + ['/', '/a']
+        self.assert_same_as_or(
+            [__unit__.StartsWith(p) for p in prefixes],
+            self.VALUES + ['/api/v42/users', '/api/v100/', 'api/v1/'])
+
+    def test_empty_patterns(self):
+        matcher = __unit__.AnyOf(__unit__.StartsWith('x'), Contains(''))
+        self.assert_match(matcher, '')
+        self.assert_match(matcher, 'foo')
+
+    def test_unicode_patterns(self):
+        matcher = __unit__.AnyOf(__unit__.StartsWith(u'/api/'),
+                                 __unit__.Regex(u'/user/\\d+'),
+                                 __unit__.Glob(u'*.js'))
+        group, = matcher._groups
+        self.assertIs(__unit__.Unicode.CLASS, type(group.empty))
+        self.assert_match(matcher, u'/api/users')
+        self.assert_match(matcher, u'/user/42')
+        self.assert_match(matcher, u'/static/app.js')
+        self.assert_no_match(matcher, u'/static/app.css')
+
+    def test_special_characters(self):
+        literals = ['a.b', '(x)', '[', '\\', '$', '|', '*+?']
+        matcher = __unit__.AnyOf(*map(__unit__.StartsWith, literals))
+        for literal in literals:
+            self.assert_match(matcher, literal + 'foo')
+        self.assert_no_match(matcher, 'axb')
+        self.assert_no_match(matcher, 'x')
+
+    def test_same_group_names(self):
+        matcher = __unit__.AnyOf(__unit__.Regex(r'(?P<n>\d+)$'),
+                                 __unit__.Regex(r'(?P<n>[a-z]+)$'),
+                                 __unit__.StartsWith('/'))
+        self.assert_match(matcher, '42')
+        self.assert_match(matcher, 'foo')
+        self.assert_match(matcher, '/foo')
+        self.assert_no_match(matcher, 'Foo')
+
+    def test_nested(self):
+        matcher = __unit__.AnyOf(
+            __unit__.AnyOf(__unit__.StartsWith('a'), __unit__.EndsWith('b')),
+            __unit__.StartsWith('c') | __unit__.Regex('d'))
+        self.assertEqual(4, sum(map(len, (
+            matcher._groups[0].prefixes, matcher._groups[0].suffixes,
+            matcher._groups[0].patterns[None, 0]))))
+        self.assertEqual([], matcher._others)
+        for value in ('ax', 'xb', 'cx', 'dx'):
+            self.assert_match(matcher, value)
+        self.assert_no_match(matcher, 'xd')
+
+    def test_other_matchers(self):
+        matcher = __unit__.AnyOf(__unit__.StartsWith('foo'), Integer())
+        self.assert_match(matcher, 'foobar')
+        self.assert_match(matcher, 42)
+        self.assert_no_match(matcher, 'bar')
+        self.assert_no_match(matcher, None)
+        self.assert_no_match(matcher, 3.14)
+
+    def test_contains__non_string(self):
+        matcher = __unit__.AnyOf(Contains('foo'), __unit__.StartsWith('x'))
+        self.assert_match(matcher, 'a foo')
+        self.assert_match(matcher, ['foo', 'bar'])
+        self.assert_no_match(matcher, ['bar'])
+
+    @skipUnless(IS_PY3, "requires Python 3.x")
+    def test_contains__other_string_type(self):
+        matcher = __unit__.AnyOf(Contains(b'x'), __unit__.StartsWith(b'q'))
+        self.assert_no_match(matcher, 'abc')
+        self.assert_no_match(matcher, 'x')
+        self.assert_match(matcher, b'axc')
+        self.assert_match(matcher, bytearray(b'axc'))
+        self.assert_match(matcher, [b'x'])
+
+    @skipUnless(IS_PY3, "requires Python 3.x")
+    def test_bytes(self):
+        matcher = __unit__.AnyOf(__unit__.StartsWith(b'GET '),
+                                 __unit__.Regex(b'^POST /api/'),
+                                 __unit__.StartsWith('text'))
+        self.assert_match(matcher, b'GET /')
+        self.assert_match(matcher, b'POST /api/users')
+        self.assert_match(matcher, 'text')
+        self.assert_no_match(matcher, b'POST /')
+        self.assert_no_match(matcher, b'text')
+        self.assert_no_match(matcher, 'GET /')
+
+    @skipUnless(IS_PY3, "requires Python 3.x")
+    def test_buffers(self):
+        matcher = __unit__.AnyOf(__unit__.StartsWith(b'GET '),
+                                 __unit__.EndsWith(b'\r\n'),
+                                 __unit__.Glob(b'*.PNG', case=False),
+                                 __unit__.Regex(b'POST', mode='search'),
+                                 Contains(b'HTTP/'))
+        for value in (b'GET /', b'foo\r\n', b'a.png', b'a POST', b'HTTP/2'):
+            self.assert_match(matcher, memoryview(value))
+            self.assert_match(matcher, bytearray(value))
+        self.assert_no_match(matcher, memoryview(b'PUT /'))
+        self.assert_no_match(matcher, bytearray(b'PUT /'))
+
+    def test_repr(self):
+        matcher = __unit__.AnyOf(__unit__.StartsWith('a'), Integer())
+        self.assert_repr(matcher)
+        self.assertIn('StartsWith', repr(matcher))
+        self.assertIn('Integer', repr(matcher))
+
+    # Assertion functions
+
+    def assert_same_as_or(self, matchers, values):
+        any_of = __unit__.AnyOf(*matchers)
+        or_ = Or(*matchers)
+        for value in values:
+            self.assertEqual(or_.match(value), any_of.match(value),
+                             msg="%r for %r" % (any_of, value))
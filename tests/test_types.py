@@ -1,8 +1,10 @@
 """
 Tests for type-related matchers.
 """
+from taipan.testing import skipIf
+
 import callee.types as __unit__
-from tests import MatcherTestCase
+from tests import MatcherTestCase, numpy
 
 
 class InstanceOf(MatcherTestCase):
@@ -38,6 +40,27 @@ class InstanceOf(MatcherTestCase):
         self.assert_match(type, type)
         self.assert_match(type, type, exact=True)
 
+    def test_compile(self):
+        values = [None, 0, "Alice has a cat", self.Class(), self.Class]
+        self.assert_compiled(__unit__.InstanceOf(self.Class), *values)
+        self.assert_compiled(__unit__.InstanceOf(object, exact=True), *values)
+
+    def test_match_many(self):
+        values = [None, 0, "Alice has a cat", self.Class(), self.Class]
+        self.assert_match_many(__unit__.InstanceOf(self.Class), values)
+        self.assert_match_many(__unit__.InstanceOf(object, exact=True), values)
+
+    @skipIf(numpy is None, "requires NumPy")
+    def test_match_many__array(self):
+        array = numpy.arange(4)
+        self.assert_match_many(__unit__.InstanceOf(numpy.integer), array)
+        self.assert_match_many(__unit__.InstanceOf(float), array)
+        self.assert_match_many(
+            __unit__.InstanceOf(array.dtype.type, exact=True), array)
+
+        objects = numpy.array([1, 'a', None], dtype=object)
+        self.assert_match_many(__unit__.InstanceOf(int), objects)
+
     test_repr = lambda self: self.assert_repr(__unit__.InstanceOf(object))
 
     # Utility code